@@ -0,0 +1,292 @@
+import argparse
+import os
+import sys
+import time
+
+from .client import default_socket_path, request
+
+# the documentation tools are imported by the commands that use them, so the
+# client command starts without loading any of them
+
+def report_invalid(results) -> int:
+    # prints every problem of every invalid file, returns how many files were invalid
+    invalid = 0
+    for source, errors in results:
+        if errors:
+            invalid += 1
+            for error in errors:
+                print(f'{source}: {error}', file=sys.stderr)
+    return invalid
+
+def build_command(args) -> int:
+    from .webserver.path import build
+    from .webserver.path.cache import default_cache_dir
+
+    if args.validate:
+        from .webserver.path.validate import validate_files
+
+        invalid = report_invalid(validate_files(build.discover(args.src), jobs=args.jobs))
+        if invalid:
+            print(f'Not building, {invalid} files are invalid', file=sys.stderr)
+            return 1
+
+    def report(result):
+        if result.skipped:
+            return
+        elif result.ok:
+            print(f'{result.seconds * 1000:9.1f} ms  {result.source} -> {result.output}')
+        else:
+            print(f'   FAILED     {result.source}: {result.error}', file=sys.stderr)
+
+    start = time.perf_counter()
+    cache_dir = None if args.no_cache else (args.cache_dir or default_cache_dir())
+    results = build.build(args.src, args.out, jobs=args.jobs, report=report, cache_dir=cache_dir, force=args.force, profile=args.profile)
+    total = time.perf_counter() - start
+
+    failed = [result for result in results if not result.ok]
+    skipped = [result for result in results if result.skipped]
+    built = len(results) - len(failed) - len(skipped)
+    print(f'Built {built} of {len(results)} files in {total:.3f} s ({len(skipped)} unchanged, {len(failed)} failed)')
+    if args.profile:
+        print()
+        print(build.profile_summary(results))
+    return 1 if failed else 0
+
+def validate_command(args) -> int:
+    from .webserver.path.build import discover
+    from .webserver.path.validate import validate_files
+
+    start = time.perf_counter()
+    results = validate_files(discover(args.src), jobs=args.jobs, strict=args.strict)
+    invalid = report_invalid(results)
+    print(f'Validated {len(results)} files in {time.perf_counter() - start:.3f} s ({invalid} invalid)')
+    return 1 if invalid else 0
+
+def check_requests_command(args) -> int:
+    from .webserver.path.contract import check_requests
+
+    start = time.perf_counter()
+    report = check_requests(args.src, args.logs, jobs=args.jobs)
+    violations = report.sorted()
+    for violation in violations[:args.limit]:
+        print(violation, file=sys.stderr)
+    if len(violations) > args.limit:
+        print(f'   ... and {len(violations) - args.limit} more', file=sys.stderr)
+    if report.invalid:
+        print(f'{report.invalid} lines are not recorded requests, the first is at {report.first_invalid}', file=sys.stderr)
+    print(f'Checked {report.requests} requests in {time.perf_counter() - start:.3f} s ({report.matched} documented, {len(violations)} violations)')
+    return 0 if report.ok else 1
+
+def bundle_command(args) -> int:
+    from .webserver.path import Section, build
+    from .webserver.path.bundle import Bundle
+
+    sources = build.discover(args.src)
+    with Bundle(args.bundle) as bundle:
+        # appended in batches so the bundle is not synced to disk once per file
+        for start in range(0, len(sources), 256):
+            bundle.append(*(Section.load_file(source) for source in sources[start:start + 256]))
+        print(f'Added {len(sources)} sections to {args.bundle} ({len(bundle)} in total)')
+    return 0
+
+def index_command(args) -> int:
+    from .webserver.path.index import write_index
+
+    def report(source, error):
+        print(f'   FAILED     {source}: {error}', file=sys.stderr)
+
+    start = time.perf_counter()
+    result = write_index(args.src, args.out, index=args.index, run_size=args.run_size, spill_dir=args.spill_dir, report=report)
+    print(f'Indexed {result.endpoints} endpoints in {result.sections} sections into {result.index} in {time.perf_counter() - start:.3f} s ({len(result.errors)} failed)')
+    return 0 if result.ok else 1
+
+def socket_path(args) -> str:
+    # resolved by the commands that use it and not as the default of --socket,
+    # default_socket_path needs os.getuid, which not every platform has
+    return args.socket if args.socket != None else default_socket_path()
+
+def daemon_command(args) -> int:
+    from .webserver.path import daemon
+
+    path = socket_path(args)
+    print(f'Listening on {path}')
+    daemon.serve(path, max_entries=args.max_entries)
+    return 0
+
+def client_command(args) -> int:
+    payload = {'command': args.request}
+    if args.request in ('render', 'save', 'validate', 'drop') and args.source != None:
+        payload['source'] = os.path.abspath(args.source)
+    if args.output != None:
+        payload['output'] = os.path.abspath(args.output)
+    if args.normalized:
+        payload['normalized'] = True
+
+    path = socket_path(args)
+    try:
+        response = request(path, payload)
+    except OSError as e:
+        print(f'Could not reach a daemon on {path}: {e}', file=sys.stderr)
+        return 1
+    if not response.get('ok'):
+        print(response.get('error'), file=sys.stderr)
+        for error in response.get('errors', []):
+            print(f'{error["path"]}: {error["message"]}', file=sys.stderr)
+        return 1
+    if 'markdown' in response:
+        sys.stdout.write(response['markdown'])
+    elif args.request == 'stats':
+        print(f'{response["entries"]} cached sections, {response["hits"]} hits, {response["misses"]} misses')
+    return 0
+
+def convert_command(args) -> int:
+    from .webserver.path import Section
+
+    start = time.perf_counter()
+    try:
+        Section.load_file(args.source).save(args.target, normalized=args.normalized)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f'{args.source} -> {args.target} in {time.perf_counter() - start:.3f} s')
+    return 0
+
+def diff_command(args) -> int:
+    from .webserver.path import Section
+    from .webserver.path.diff import changelog, diff
+
+    new = Section.load_file(args.new)
+    try:
+        changes = diff(Section.load_file(args.old), new)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    text = changelog(changes, new.title)
+    if args.output == None:
+        sys.stdout.write(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 0
+
+def import_openapi_command(args) -> int:
+    from .webserver.path.openapi import import_openapi
+
+    start = time.perf_counter()
+    result = import_openapi(args.spec, args.out, render=args.render, spill_dir=args.spill_dir)
+    for title, path in result.sections.items():
+        print(f'{title} -> {path}')
+    for skipped in result.skipped[:20]:
+        print(f'   SKIPPED    {skipped}', file=sys.stderr)
+    if len(result.skipped) > 20:
+        print(f'   ... and {len(result.skipped) - 20} more', file=sys.stderr)
+    print(f'Imported {result.operations} operations into {len(result.sections)} sections in {time.perf_counter() - start:.3f} s ({len(result.skipped)} skipped)')
+    return 0
+
+def watch_command(args) -> int:
+    from .webserver.path import watch
+
+    def ready(server):
+        host, port = server.server_address[:2]
+        print(f'Serving a preview of {args.src} on http://{host}:{port}/')
+
+    def report(source, page):
+        if page == None:
+            print(f'   REMOVED    {source}')
+        elif page.ok:
+            print(f'{page.seconds * 1000:9.1f} ms  {source} -> /{page.path}')
+        else:
+            print(f'   FAILED     {source}: {page.error}', file=sys.stderr)
+
+    try:
+        watch.watch(args.src, port=args.port, out=args.out, polling=args.poll, interval=args.interval, report=report, ready=ready)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='doccreator', description='Generate markdown documentation.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='render every Section JSON file in a directory')
+    build_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    build_parser.add_argument('out', help='the directory the markdown files are written to')
+    build_parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes (defaults to the number of CPUs)')
+    build_parser.add_argument('--cache-dir', default=None, help='where the build manifest is kept (defaults to ~/.cache/doccreator)')
+    build_parser.add_argument('--no-cache', action='store_true', help='render every file and do not use or update the build manifest')
+    build_parser.add_argument('--force', action='store_true', help='render every file but still update the build manifest')
+    build_parser.add_argument('--profile', action='store_true', help='print where the build spent its time, summed over all workers')
+    build_parser.add_argument('--validate', action='store_true', help='check every file against the Section schema first and build nothing if any is invalid')
+    build_parser.set_defaults(func=build_command)
+
+    validate_parser = subparsers.add_parser('validate', help='check Section JSON files against the Section schema')
+    validate_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    validate_parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes (defaults to the number of CPUs)')
+    validate_parser.add_argument('--strict', action='store_true', help='also report keys that loading would ignore')
+    validate_parser.set_defaults(func=validate_command)
+
+    check_parser = subparsers.add_parser('check-requests', help='check recorded requests against the parameters their endpoints document')
+    check_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    check_parser.add_argument('logs', nargs='+', help='JSONL files of recorded requests, one {"method", "url", "params", "status"} object per line')
+    check_parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes (defaults to the number of CPUs)')
+    check_parser.add_argument('--limit', type=int, default=50, help='how many violations to print, the most common first (defaults to %(default)s)')
+    check_parser.set_defaults(func=check_requests_command)
+
+    bundle_parser = subparsers.add_parser('bundle', help='append Section JSON files to a bundle')
+    bundle_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    bundle_parser.add_argument('bundle', help='the bundle file, created if it does not exist')
+    bundle_parser.set_defaults(func=bundle_command)
+
+    index_parser = subparsers.add_parser('index', help='write one page that lists and links every section and endpoint of a site')
+    index_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    index_parser.add_argument('out', help='the directory build renders the markdown files to, the links point there')
+    index_parser.add_argument('--index', default=None, help='where the index is written (defaults to index.md in out)')
+    index_parser.add_argument('--run-size', type=int, default=100000, help='how many entries are sorted in memory before they are spilled to disk')
+    index_parser.add_argument('--spill-dir', default=None, help='where the sorted runs are spilled to (defaults to the system temporary directory)')
+    index_parser.set_defaults(func=index_command)
+
+    convert_parser = subparsers.add_parser('convert', help='convert a Section between JSON and binary snapshots, the formats are picked from the extensions')
+    convert_parser.add_argument('source', help='a Section JSON file or snapshot (.dcsnap), it may be compressed')
+    convert_parser.add_argument('target', help='where the Section is saved, .dcsnap for a snapshot')
+    convert_parser.add_argument('--normalized', action='store_true', help='write JSON in the normalized format')
+    convert_parser.set_defaults(func=convert_command)
+
+    diff_parser = subparsers.add_parser('diff', help='write a changelog of what changed between two versions of a Section')
+    diff_parser.add_argument('old', help='the earlier Section JSON file')
+    diff_parser.add_argument('new', help='the later Section JSON file')
+    diff_parser.add_argument('-o', '--output', default=None, help='write the changelog here instead of to stdout')
+    diff_parser.set_defaults(func=diff_command)
+
+    import_parser = subparsers.add_parser('import-openapi', help='turn an OpenAPI JSON document into one Section JSON file per tag')
+    import_parser.add_argument('spec', help='the OpenAPI 3 JSON document, it may be compressed')
+    import_parser.add_argument('out', help='the directory the Section JSON files are written to')
+    import_parser.add_argument('--render', action='store_true', help='also render every Section to markdown')
+    import_parser.add_argument('--spill-dir', default=None, help='where the operations are kept while the document is read (defaults to the system temporary directory)')
+    import_parser.set_defaults(func=import_openapi_command)
+
+    watch_parser = subparsers.add_parser('watch', help='render Section JSON files again as they change and serve a preview on localhost')
+    watch_parser.add_argument('src', help='a Section JSON file or a directory that contains them')
+    watch_parser.add_argument('-p', '--port', type=int, default=8000, help='the port of the preview server (defaults to %(default)s, 0 picks a free one)')
+    watch_parser.add_argument('-o', '--out', default=None, help='also write every page that is rendered again to this directory')
+    watch_parser.add_argument('--poll', action='store_true', help='poll for changes even where inotify is available')
+    watch_parser.add_argument('--interval', type=float, default=0.1, help='seconds between polls (defaults to %(default)s)')
+    watch_parser.set_defaults(func=watch_command)
+
+    daemon_parser = subparsers.add_parser('daemon', help='keep Sections loaded and rendered in memory and serve requests over a unix socket')
+    daemon_parser.add_argument('--socket', default=None, help='the socket to listen on (defaults to doccreator-<uid>.sock in $XDG_RUNTIME_DIR or /tmp)')
+    daemon_parser.add_argument('--max-entries', type=int, default=1024, help='how many Sections to keep in memory')
+    daemon_parser.set_defaults(func=daemon_command)
+
+    client_parser = subparsers.add_parser('client', help='send a request to a running daemon')
+    client_parser.add_argument('request', choices=['render', 'save', 'validate', 'drop', 'stats', 'ping', 'shutdown'])
+    client_parser.add_argument('source', nargs='?', help='the Section JSON file the request is about')
+    client_parser.add_argument('-o', '--output', help='render: write the markdown here instead of to stdout, save: where to save the Section')
+    client_parser.add_argument('--normalized', action='store_true', help='save: use the normalized format')
+    client_parser.add_argument('--socket', default=None, help='the socket of the daemon (defaults to the one the daemon listens on by default)')
+    client_parser.set_defaults(func=client_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
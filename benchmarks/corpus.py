@@ -0,0 +1,66 @@
+import random
+
+from ..webserver.path import (
+    CriteriaList, CriteriaPreset, GETResponses, HTTPMethod, HTTPPath, Logic,
+    Parameter, Parameters, POSTResponses, Response, Section, Subsection
+)
+
+# small vocabularies so the generated docs repeat strings the way real docs do
+NAMES = ['id', 'name', 'score', 'team', 'page', 'limit', 'offset', 'sort', 'filter', 'query', 'token', 'user']
+VALUE_TYPES = ['str', 'int', 'bool', 'float', 'list[str]', 'dict']
+DESCRIPTIONS = [None, 'The id of the team.', 'The name of the team.', 'How many results to return.', 'Only return matching results.']
+STEPS = ['Check that all required parameters are present.', 'Validate the parameters.', 'Query the database.', 'Return the result.']
+MODIFICATIONS = ['add a team', 'remove a team', 'update a score', 'rename a team']
+
+def generate_parameter(rnd: random.Random, index: int) -> Parameter:
+    required = rnd.random() < 0.5
+    return Parameter(
+        name = f'{rnd.choice(NAMES)}_{index}',
+        value_type = rnd.choice(VALUE_TYPES),
+        required = required,
+        default = None if required else rnd.choice([None, '0', 'true', '""']),
+        description = rnd.choice(DESCRIPTIONS)
+    )
+
+def generate_responses(rnd: random.Random, method: HTTPMethod, count: int) -> list[Response]:
+    criteria = [CriteriaPreset.team_name, CriteriaPreset.team_id, CriteriaPreset.team_score]
+    responses = []
+    for _ in range(count):
+        choice = rnd.randrange(5)
+        if method == HTTPMethod.GET:
+            if choice == 0:
+                responses.append(GETResponses.REQUIRED_PARAMETERS_MISSING)
+            elif choice == 1:
+                responses.append(GETResponses.validation_failed(CriteriaList(rnd.choice(criteria)())))
+            elif choice == 2:
+                responses.append(GETResponses.DATABASE_ERROR)
+            else:
+                responses.append(GETResponses.REQUESTED_PAGE)
+        else:
+            if choice == 0:
+                responses.append(POSTResponses.REQUIRED_PARAMETERS_MISSING)
+            elif choice == 1:
+                responses.append(POSTResponses.validation_failed(CriteriaList(rnd.choice(criteria)())))
+            elif choice == 2:
+                responses.append(POSTResponses.database_error(rnd.choice(MODIFICATIONS)))
+            elif choice == 3:
+                responses.append(POSTResponses.failed_modification(rnd.choice(MODIFICATIONS), 'Failed'))
+            else:
+                responses.append(POSTResponses.ok('Normal operation'))
+    return responses
+
+def generate_subsection(rnd: random.Random, index: int, parameters: int, responses: int) -> Subsection:
+    method = HTTPMethod.GET if index % 2 == 0 else HTTPMethod.POST
+    path = HTTPPath(f'/teams/{index // 2}', method, rnd.random() < 0.5, rnd.random() < 0.2)
+    return Subsection(
+        path = path,
+        parameters = Parameters([generate_parameter(rnd, i) for i in range(parameters)]),
+        logic = Logic(rnd.sample(STEPS, rnd.randint(1, len(STEPS)))),
+        responses = generate_responses(rnd, method, responses),
+        description = f'Endpoint number {index}.'
+    )
+
+def generate_section(subsections: int = 10, parameters: int = 10, responses: int = 5, seed: int = 0, title: str = 'Teams') -> Section:
+    # the same arguments always generate the same Section
+    rnd = random.Random(seed)
+    return Section(title, [generate_subsection(rnd, i, parameters, responses) for i in range(subsections)])
@@ -0,0 +1,78 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from ..webserver.path import HTTPPath, Logic, Parameter, Parameters, Response, Section, Subsection
+from .corpus import generate_section
+
+def instance_size(obj) -> int:
+    # size of the instance itself plus its __dict__, if the class has one
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+def count_objects(section: Section) -> dict:
+    counts = {'Section': 1, 'Subsection': 0, 'HTTPPath': 0, 'Parameters': 0, 'Parameter': 0, 'Logic': 0, 'Response': 0}
+    for subsection in section.subsections:
+        counts['Subsection'] += 1
+        counts['HTTPPath'] += 1
+        if subsection.parameters != None:
+            counts['Parameters'] += 1
+            counts['Parameter'] += len(subsection.parameters)
+        if subsection.logic != None:
+            counts['Logic'] += 1
+        counts['Response'] += len(subsection.responses)
+    return counts
+
+def measure_load(path) -> tuple:
+    # (bytes still held by the loaded Section, peak bytes while loading, the Section)
+    gc.collect()
+    tracemalloc.start()
+    section = Section.load_file(path)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, section
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the memory used by a loaded Section.')
+    parser.add_argument('--subsections', type=int, default=500)
+    parser.add_argument('--parameters', type=int, default=100, help='parameters per subsection')
+    parser.add_argument('--responses', type=int, default=10, help='responses per subsection')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    section = generate_section(args.subsections, args.parameters, args.responses, args.seed)
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        section.save(path)
+        del section
+        current, peak, section = measure_load(path)
+    finally:
+        os.unlink(path)
+
+    counts = count_objects(section)
+    print(f'Loaded {counts["Parameter"]} parameters and {counts["Response"]} responses in {counts["Subsection"]} subsections')
+    print(f'Retained: {current / 1024 / 1024:.2f} MiB ({current / counts["Parameter"]:.0f} bytes per parameter)')
+    print(f'Peak while loading: {peak / 1024 / 1024:.2f} MiB')
+    print()
+    print('Instance sizes:')
+    samples = [
+        HTTPPath('/teams'),
+        Parameter('name', 'str'),
+        Parameters([]),
+        Response(200, 'ok', 'Normal operation'),
+        Logic(['step']),
+        Subsection(HTTPPath('/teams')),
+        Section('Teams', [])
+    ]
+    for sample in samples:
+        print(f'    {type(sample).__name__:<12} {instance_size(sample):>5} bytes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from ..webserver.path import Section
+from .corpus import generate_section
+
+# subsections x parameters per subsection x responses per subsection
+DEFAULT_SIZES = ['10x10x5', '100x50x10', '500x100x20']
+
+class Size:
+    subsections: int
+    parameters: int
+    responses: int
+
+    def __init__(self, subsections: int, parameters: int, responses: int):
+        self.subsections = subsections
+        self.parameters = parameters
+        self.responses = responses
+
+    @classmethod
+    def parse(cls, string):
+        # '100x50x10' -> Size(100, 50, 10)
+        subsections, parameters, responses = (int(part) for part in string.split('x'))
+        return cls(subsections, parameters, responses)
+
+    @property
+    def items(self) -> int:
+        # every parameter and response in the section
+        return self.subsections * (self.parameters + self.responses)
+
+    def __str__(self) -> str:
+        return f'{self.subsections}x{self.parameters}x{self.responses}'
+
+def time_operation(operation, setup, repeat: int) -> list[float]:
+    # setup is run before every repetition and its result passed to operation
+    # so only the operation itself is timed
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        operation(argument)
+        times.append(time.perf_counter() - start)
+    return times
+
+def peak_memory(operation, setup) -> int:
+    argument = setup()
+    tracemalloc.start()
+    try:
+        operation(argument)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_size(size: Size, seed: int, repeat: int, directory: str) -> list[dict]:
+    section = generate_section(size.subsections, size.parameters, size.responses, seed)
+    json_path = os.path.join(directory, f'{size}.json')
+    markdown_path = os.path.join(directory, f'{size}.md')
+    section.save(json_path)
+    file_size = os.path.getsize(json_path)
+
+    def loaded():
+        return Section.load_file(json_path)
+
+    def warm():
+        section.obj
+        return section
+
+    operations = [
+        # name, operation, setup
+        ('save', lambda s: s.save(json_path), lambda: section),
+        ('load_file', lambda _: Section.load_file(json_path), lambda: None),
+        ('obj (cold)', lambda s: s.obj, loaded),
+        ('obj (warm)', lambda s: s.obj, warm),
+        ('render', lambda s: s.render(markdown_path), lambda: section),
+    ]
+
+    results = []
+    for name, operation, setup in operations:
+        times = time_operation(operation, setup, repeat)
+        best = min(times)
+        results.append({
+            'size': str(size),
+            'operation': name,
+            'items': size.items,
+            'file_bytes': file_size,
+            'best_seconds': best,
+            'mean_seconds': sum(times) / len(times),
+            'items_per_second': size.items / best if best else None,
+            'peak_bytes': peak_memory(operation, setup)
+        })
+    return results
+
+def run(sizes: list[Size], seed: int = 0, repeat: int = 5) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            results.extend(run_size(size, seed, repeat, directory))
+    return {
+        'commit': git_commit(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results
+    }
+
+def print_results(report: dict, baseline: dict = None):
+    previous = {}
+    if baseline != None:
+        for result in baseline['results']:
+            previous[(result['size'], result['operation'])] = result
+
+    print(f'{"size":<14} {"operation":<12} {"best ms":>10} {"items/s":>12} {"peak KiB":>10}' + (f' {"vs baseline":>12}' if baseline != None else ''))
+    for result in report['results']:
+        line = f'{result["size"]:<14} {result["operation"]:<12} {result["best_seconds"] * 1000:>10.2f} {result["items_per_second"] or 0:>12.0f} {result["peak_bytes"] / 1024:>10.0f}'
+        old = previous.get((result['size'], result['operation']))
+        if old != None and result['best_seconds']:
+            # above 1.00x is faster than the baseline
+            line += f' {old["best_seconds"] / result["best_seconds"]:>11.2f}x'
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m doccreator.benchmarks', description='Time save, load_file, obj and render on generated Sections.')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='subsections x parameters x responses, e.g. 100x50x10 (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='a JSON file written by --output to compare against')
+    args = parser.parse_args(argv)
+
+    report = run([Size.parse(size) for size in args.sizes], args.seed, args.repeat)
+
+    baseline = None
+    if args.baseline != None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.loads(f.read())
+    print_results(report, baseline)
+
+    if args.output != None:
+        with open(args.output, 'w') as f:
+            f.write(json.dumps(report, indent=2))
@@ -0,0 +1,22 @@
+import json
+import os
+import socket
+
+# only the standard library is imported here, so asking a running daemon for
+# something costs no more than starting the interpreter
+
+def default_socket_path() -> str:
+    # unix sockets, and so the daemon, are only available where os.getuid is
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, f'doccreator-{os.getuid()}.sock')
+
+def request(socket_path: str, payload: dict) -> dict:
+    # sends one request to the daemon and waits for its response
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((json.dumps(payload) + '\n').encode('utf-8'))
+        with connection.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError('The daemon closed the connection without responding')
+    return json.loads(line)
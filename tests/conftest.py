@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from ..webserver.path import Section
+
+# fixtures over the files in tests/data:
+#     teams.json (3 endpoints) and health.json (1 endpoint) are the Sections,
+#     teams.md and health.md their rendered markdown
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+@pytest.fixture
+def data():
+    # data('teams.json') -> the path of a file in tests/data
+    return lambda name: os.path.join(DATA, name)
+
+@pytest.fixture
+def load():
+    # load('health', lazy=True) -> the Section of tests/data/health.json
+    def load(name = 'teams', lazy: bool = False) -> Section:
+        return Section.load_file(os.path.join(DATA, f'{name}.json'), lazy=lazy)
+    return load
+
+@pytest.fixture
+def raw():
+    # raw('health') -> the parsed JSON of tests/data/health.json
+    def raw(name = 'teams') -> dict:
+        with open(os.path.join(DATA, f'{name}.json'), encoding='utf-8') as f:
+            return json.loads(f.read())
+    return raw
+
+@pytest.fixture
+def baseline():
+    # baseline('health') -> the markdown of tests/data/health.md
+    def baseline(name = 'teams') -> str:
+        with open(os.path.join(DATA, f'{name}.md'), encoding='utf-8') as f:
+            return f.read()
+    return baseline
+
+@pytest.fixture
+def src(tmp_path):
+    # a directory of sources: teams.json and nested/health.json
+    src = tmp_path / 'src'
+    (src / 'nested').mkdir(parents=True)
+    shutil.copy(os.path.join(DATA, 'teams.json'), src / 'teams.json')
+    shutil.copy(os.path.join(DATA, 'health.json'), src / 'nested' / 'health.json')
+    return src
@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import inspect
+
+import pytest
+
+from ..webserver.path import Section, aio
+from ..webserver.path.aio import DocExecutor, gather
+
+def run(aw):
+    return asyncio.run(aw)
+
+@pytest.mark.parametrize('extension', ['.json', '.json.gz', '.dcsnap'])
+def test_load_save_and_render(tmp_path, extension, data, load, baseline):
+    path = str(tmp_path / f'teams{extension}')
+
+    async def roundtrip():
+        section = await Section.load_file_async(data('teams.json'))
+        await section.save_async(path)
+        loaded = await Section.load_file_async(path)
+        return loaded, await loaded.render_async(), await loaded.render_async(str(tmp_path / 'teams.md'))
+
+    loaded, markdown, written = run(roundtrip())
+    assert loaded.obj == load().obj and Section.load_file(path).obj == load().obj
+    assert markdown == baseline() and written == None
+    assert (tmp_path / 'teams.md').read_text(encoding='utf-8') == baseline()
+
+def test_normalized_and_lazy(tmp_path, load):
+    path = str(tmp_path / 'teams.json')
+    run(aio.save(load(), path, normalized=True))
+    with open(path, encoding='utf-8') as f:
+        assert '"responses"' in f.read(200)
+    section = run(aio.load_file(path, lazy=True))
+    assert not section.loaded and section.obj == load().obj
+
+def test_normalized_and_lazy_are_refused_for_snapshots(tmp_path, load):
+    path = str(tmp_path / 'teams.dcsnap')
+    with pytest.raises(ValueError, match='normalized='):
+        run(aio.save(load(), path, normalized=True))
+    run(aio.save(load(), path))
+    with pytest.raises(ValueError, match='lazy='):
+        run(aio.load_file(path, lazy=True))
+
+def test_gather_keeps_the_order_and_the_limit():
+    running = []
+    peak = []
+
+    async def work(number):
+        running.append(number)
+        peak.append(len(running))
+        await asyncio.sleep(0.001 * (number % 3))
+        running.remove(number)
+        return number
+
+    assert run(gather(*(work(number) for number in range(20)), limit=3)) == list(range(20))
+    assert max(peak) == 3
+
+def test_a_failure_cancels_the_rest():
+    cancelled = []
+    waiting = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError('failed')
+
+    async def main():
+        waiting.extend(slow() for _ in range(3))
+        await gather(slow(), fail(), *waiting, limit=2)
+
+    with pytest.raises(RuntimeError):
+        run(main())
+    # the running one, and the next one if it got the freed slot first
+    assert 1 <= len(cancelled) <= 2
+    # the ones that never got a turn are closed, not left unawaited
+    assert all(inspect.getcoroutinestate(aw) == inspect.CORO_CLOSED for aw in waiting)
+
+def test_return_exceptions():
+    async def fail():
+        raise ValueError('bad')
+
+    async def ok():
+        return 1
+
+    results = run(gather(ok(), fail(), return_exceptions=True))
+    assert results[0] == 1 and type(results[1]) == ValueError
+
+def test_cancelling_gather_cancels_what_it_runs():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        task = asyncio.ensure_future(gather(*(slow() for _ in range(4)), limit=2))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    run(main())
+    assert cancelled == [True, True]
+
+def test_executor_limit_pools_and_loops(tmp_path, data):
+    executor = DocExecutor(workers=1, io_workers=1, limit=1)
+    paths = [data(f'{name}.json') for name in ('teams', 'health', 'teams')]
+    # a new event loop gets its own semaphore
+    for _ in range(2):
+        sections = run(gather(*(aio.load_file(path, executor=executor) for path in paths)))
+        assert [section.title for section in sections] == ['Teams', 'Health', 'Teams']
+    assert executor._semaphore._value == 1
+    executor.close()
+    assert executor._io == None and executor._cpu == None
+
+def test_cpu_work_on_a_process_pool(data, load, baseline):
+    with ProcessPoolExecutor(1) as pool:
+        executor = DocExecutor(cpu=pool)
+
+        async def main():
+            async with executor:
+                section = await aio.load_file(data('health.json'), executor=executor)
+                return section, await aio.render(section, executor=executor)
+
+        section, markdown = run(main())
+        assert section.obj == load('health').obj and markdown == baseline('health')
+        # an executor that was passed in is left running
+        assert pool.submit(len, 'abc').result() == 3
@@ -0,0 +1,30 @@
+import json
+
+from ..benchmarks import suite
+from ..benchmarks.suite import Size
+
+def test_size_parse():
+    size = Size.parse('4x3x2')
+    assert (size.subsections, size.parameters, size.responses) == (4, 3, 2)
+    assert size.items == 20
+    assert str(size) == '4x3x2'
+
+def test_run_times_every_operation():
+    report = suite.run([Size.parse('3x2x2')], repeat=1)
+    assert [result['operation'] for result in report['results']] == ['save', 'load_file', 'obj (cold)', 'obj (warm)', 'render']
+    for result in report['results']:
+        assert result['size'] == '3x2x2' and result['items'] == 12
+        assert result['best_seconds'] <= result['mean_seconds']
+        assert result['file_bytes'] > 0 and result['peak_bytes'] >= 0
+
+def test_main_writes_and_compares_against_a_baseline(tmp_path, capsys):
+    output = str(tmp_path / 'results.json')
+    suite.main(['--sizes', '2x2x1', '--repeat', '1', '--output', output])
+    with open(output) as f:
+        report = json.loads(f.read())
+    assert len(report['results']) == 5 and report['seed'] == 0
+    capsys.readouterr()
+    suite.main(['--sizes', '2x2x1', '--repeat', '1', '--baseline', output])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[-2:] == ['vs', 'baseline']
+    assert all(line.endswith('x') for line in lines[1:])
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import build
+
+@pytest.fixture
+def src(src):
+    # and a file that is not a Section
+    (src / 'notes.txt').write_text('not a section')
+    return src
+
+def read(path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_discover_and_output_path(tmp_path, src):
+    sources = build.discover(str(src))
+    assert sources == [str(src / 'nested' / 'health.json'), str(src / 'teams.json')]
+    assert build.output_path(sources[0], str(src), 'out') == os.path.join('out', 'nested', 'health.md')
+    assert build.output_path(str(src / 'teams.json'), str(src / 'teams.json'), 'out') == os.path.join('out', 'teams.md')
+    assert build.output_path('src/teams.json.gz', 'src', 'out') == os.path.join('out', 'teams.md')
+
+def test_build_keeps_the_folder_layout(tmp_path, src, data):
+    out = tmp_path / 'out'
+    results = build.build(str(src), str(out), jobs=1)
+    assert [result.ok for result in results] == [True, True]
+    assert read(out / 'teams.md') == read(data('teams.md'))
+    assert read(out / 'nested' / 'health.md') == read(data('health.md'))
+
+def test_parallel_build_matches_serial_build(tmp_path, src):
+    build.build(str(src), str(tmp_path / 'serial'), jobs=1)
+    reported = []
+    results = build.build(str(src), str(tmp_path / 'parallel'), jobs=2, report=reported.append)
+    assert len(reported) == len(results) == 2
+    for name in ('teams.md', os.path.join('nested', 'health.md')):
+        assert read(tmp_path / 'parallel' / name) == read(tmp_path / 'serial' / name)
+
+def test_failures_are_reported_without_stopping_the_build(tmp_path, src):
+    (src / 'broken.json').write_text('{"title": "Broken"}')
+    results = {os.path.basename(result.source): result for result in build.build(str(src), str(tmp_path / 'out'), jobs=1)}
+    assert not results['broken.json'].ok
+    assert 'KeyError' in results['broken.json'].error
+    assert results['teams.json'].ok and results['health.json'].ok
+
+def test_build_command_exit_status(tmp_path, src, capsys):
+    assert main(['build', str(src), str(tmp_path / 'out'), '--jobs', '1', '--no-cache']) == 0
+    assert 'Built 2 of 2 files' in capsys.readouterr().out
+    (src / 'broken.json').write_text('[]')
+    assert main(['build', str(src), str(tmp_path / 'out'), '--jobs', '1', '--no-cache']) == 1
+    assert 'FAILED' in capsys.readouterr().err
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import HTTPMethod
+from ..webserver.path.bundle import Bundle
+
+@pytest.fixture
+def bundle_path(tmp_path, load) -> str:
+    path = str(tmp_path / 'api.jsonl')
+    with Bundle(path) as bundle:
+        bundle.append(load('teams'))
+        bundle.append(load('health'))
+    return path
+
+def read_lines(path) -> list[bytes]:
+    with open(path, 'rb') as f:
+        return f.readlines()
+
+def write_lines(path, lines):
+    with open(path, 'wb') as f:
+        f.write(b''.join(lines))
+
+def check(bundle: Bundle, load):
+    assert len(bundle) == 2
+    assert bundle.get('Teams').obj == load('teams').obj
+    assert bundle.get('Health').obj == load('health').obj
+
+def test_get_and_find(tmp_path, bundle_path, load):
+    with Bundle(bundle_path) as bundle:
+        check(bundle, load)
+        assert bundle.titles == ['Teams', 'Health']
+        assert bundle.find('/teams', 'POST').title == 'Teams'
+        assert not bundle.find('/teams', 'POST').loaded
+        assert bundle.find_subsection('/teams/scores').path.url == '/teams/scores'
+        assert [section.title for section in bundle] == ['Teams', 'Health']
+        with pytest.raises(KeyError):
+            bundle.get('Missing')
+        with pytest.raises(KeyError):
+            bundle.find('/teams/scores', HTTPMethod.POST)
+
+def test_append_after_reading(tmp_path, bundle_path, load):
+    with Bundle(bundle_path) as bundle:
+        bundle.get('Teams')
+        section = load('health')
+        section.title = 'Status'
+        bundle.append(section)
+        assert bundle.get('Status').title == 'Status'
+    with Bundle(tmp_path / 'api.jsonl') as bundle:
+        assert bundle.titles == ['Teams', 'Health', 'Status']
+
+def test_plain_bundles_store_the_obj(tmp_path, load):
+    path = str(tmp_path / 'plain.jsonl')
+    with Bundle(path, normalized=False) as bundle:
+        bundle.append(load('teams'))
+        assert bundle.get('Teams').obj == load('teams').obj
+    assert b'"responses": [{' in read_lines(path)[0]
+
+def test_missing_index_is_rebuilt(tmp_path, bundle_path, load):
+    path = bundle_path
+    index = read_lines(path + '.idx')
+    os.unlink(path + '.idx')
+    with Bundle(path) as bundle:
+        check(bundle, load)
+    assert read_lines(path + '.idx') == index
+
+def test_index_behind_the_bundle_is_caught_up(tmp_path, bundle_path, load):
+    # a crash after the bundle line was written but before its index line
+    path = bundle_path
+    index = read_lines(path + '.idx')
+    write_lines(path + '.idx', index[:1])
+    with Bundle(path) as bundle:
+        check(bundle, load)
+    assert read_lines(path + '.idx') == index
+
+def test_truncated_index_line_is_rebuilt(tmp_path, bundle_path, load):
+    path = bundle_path
+    index = read_lines(path + '.idx')
+    write_lines(path + '.idx', [index[0], index[1][:10]])
+    with Bundle(path) as bundle:
+        check(bundle, load)
+    assert read_lines(path + '.idx') == index
+
+def test_unfinished_bundle_line_is_ignored(tmp_path, bundle_path, load):
+    path = bundle_path
+    with open(path, 'ab') as f:
+        f.write(b'{"title": "Half')
+    os.unlink(path + '.idx')
+    with Bundle(path) as bundle:
+        check(bundle, load)
+
+def test_bundle_command(tmp_path, capsys, src):
+    assert main(['bundle', str(src), str(tmp_path / 'api.jsonl')]) == 0
+    assert 'Added 2 sections' in capsys.readouterr().out
+    with Bundle(tmp_path / 'api.jsonl') as bundle:
+        assert sorted(bundle.titles) == ['Health', 'Teams']
@@ -0,0 +1,64 @@
+import os
+
+from ..webserver.path import Section, build
+from ..webserver.path.cache import BuildManifest
+
+def run(tmp_path, **kwargs) -> dict:
+    results = build.build(str(tmp_path / 'src'), str(tmp_path / 'out'), jobs=1, cache_dir=str(tmp_path / 'cache'), **kwargs)
+    return {os.path.basename(result.source): result for result in results}
+
+def touch(path):
+    # a new mtime even on file systems with a coarse clock
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def test_the_recorded_hash_is_the_section_digest(tmp_path, src, load):
+    first = run(tmp_path)
+    assert first['teams.json'].hash == load().digest
+    assert first['health.json'].hash == load('health').digest
+
+def test_unchanged_sources_are_skipped(tmp_path, src):
+    first = run(tmp_path)
+    assert not any(result.skipped for result in first.values())
+    second = run(tmp_path)
+    assert all(result.skipped for result in second.values())
+    assert all(result.hash == None for result in second.values()) # skipped without reading the source
+
+def test_force_renders_everything(tmp_path, src):
+    run(tmp_path)
+    assert not any(result.skipped for result in run(tmp_path, force=True).values())
+
+def test_touched_source_with_the_same_section_is_not_rendered_again(tmp_path, src):
+    run(tmp_path)
+    output_mtime = os.stat(tmp_path / 'out' / 'teams.md').st_mtime_ns
+    # the same Section with a different key order and layout
+    Section.load_file(str(src / 'teams.json')).save(str(src / 'teams.json'), normalized=True)
+    touch(src / 'teams.json')
+    results = run(tmp_path)
+    assert results['teams.json'].skipped and results['teams.json'].hash != None
+    assert os.stat(tmp_path / 'out' / 'teams.md').st_mtime_ns == output_mtime
+    assert run(tmp_path)['teams.json'].hash == None # the new mtime was recorded
+
+def test_changed_section_is_rendered_again(tmp_path, src):
+    run(tmp_path)
+    section = Section.load_file(str(src / 'nested' / 'health.json'))
+    section[0].description = 'Changed.'
+    section.save(str(src / 'nested' / 'health.json'))
+    touch(src / 'nested' / 'health.json')
+    results = run(tmp_path)
+    assert not results['health.json'].skipped and results['teams.json'].skipped
+    assert 'Changed.' in (tmp_path / 'out' / 'nested' / 'health.md').read_text(encoding='utf-8')
+
+def test_changed_or_missing_outputs_are_rendered_again(tmp_path, src):
+    run(tmp_path)
+    os.remove(tmp_path / 'out' / 'teams.md')
+    touch(tmp_path / 'out' / 'nested' / 'health.md')
+    results = run(tmp_path)
+    assert not results['teams.json'].skipped and not results['health.json'].skipped
+
+def test_manifest_drops_removed_sources(tmp_path, src):
+    run(tmp_path)
+    os.remove(src / 'nested' / 'health.json')
+    run(tmp_path, force=True)
+    manifest = BuildManifest(str(tmp_path / 'cache'), str(tmp_path / 'out'))
+    assert [os.path.basename(entry['source']) for entry in manifest.entries.values()] == ['teams.json']
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import CriteriaList, CriteriaPreset, Criterion, CriterionPreset, POSTResponses
+from ..webserver.path.contract import ContractSet, check_requests, compile_criterion, documented_criteria, split_logs
+
+PRESETS = ['team_name', 'team_id', 'team_score']
+
+def write_log(path, records: list) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write((record if type(record) == str else json.dumps(record)) + '\n')
+    return str(path)
+
+def test_criteria_presets_are_the_documented_sentences():
+    assert CriteriaPreset.team_id() == ['`id` must be exactly 3 characters', '`id` must follow pattern `^[0-9]*$`']
+    assert CriteriaPreset.team_score('points')[0] == '`points` must be at least one character'
+    assert CriteriaPreset.team_name()[2] == '`name` must follow pattern `^[A-Za-z0-9 \\-_\\(\\):]+$`'
+    for name in PRESETS:
+        sentences = getattr(CriteriaPreset, name)()
+        assert all(type(sentence) == str for sentence in sentences)
+        assert sentences == [str(criterion) for criterion in getattr(CriterionPreset, name)()]
+
+@pytest.mark.parametrize('name', PRESETS)
+def test_sentences_are_read_back_into_criteria(name):
+    for criterion in getattr(CriterionPreset, name)():
+        parsed = Criterion.parse(str(criterion))
+        assert (parsed.kind, parsed.name, parsed.value) == (criterion.kind, criterion.name, criterion.value)
+        assert Criterion.load(criterion.obj) == criterion
+    assert Criterion.parse('`name` must be a palindrome') == None
+    with pytest.raises(ValueError):
+        Criterion('palindrome', 'name')
+
+def test_compiled_criteria():
+    name, identifier = CriterionPreset.team_name(), CriterionPreset.team_id()
+    checks = [compile_criterion(criterion) for criterion in name + identifier]
+    assert [check('Red Team') for check in checks[:3]] == [True, True, True]
+    assert [check('') for check in checks[:3]] == [False, True, False]
+    assert [check('x' * 41) for check in checks[:3]] == [True, False, True]
+    assert [check('012') for check in checks[3:]] == [True, True]
+    assert [check('12a') for check in checks[3:]] == [True, False]
+    assert compile_criterion(Criterion('integer', 'score'))('-4')
+    assert not compile_criterion(Criterion('integer', 'score'))(True)
+
+def test_criteria_of_responses_made_from_either_preset():
+    from_text = POSTResponses.validation_failed(CriteriaList(CriteriaPreset.team_id()))
+    from_criteria = POSTResponses.validation_failed(CriteriaList(CriterionPreset.team_id()))
+    assert from_text.context == from_criteria.context
+    assert [(c.kind, c.value) for c in documented_criteria([from_criteria])] == [('length', 3), ('pattern', '^[0-9]*$')]
+
+def test_endpoint_contracts(load):
+    contracts = ContractSet([load()])
+    assert len(contracts) == 3
+    contract, params = contracts.match('POST', '/teams/')
+    assert params == {} and contract.statuses == {201, 400, 409, 500}
+    assert contract.check({'name': 'Red', 'id': '012', 'score': '3'}, 201) == []
+    assert contract.check({'name': '', 'id': 'ab', 'score': 'x', 'extra': 1}, 418) == [
+        'parameter "score" is not int',
+        'undocumented parameter "extra"',
+        'parameter "name" breaks "`name` must be at least 1 character"',
+        'parameter "name" breaks "`name` must follow pattern `^[A-Za-z0-9 \\-_\\(\\):]+$`"',
+        'parameter "id" breaks "`id` must be exactly 3 characters"',
+        'parameter "id" breaks "`id` must follow pattern `^[0-9]*$`"',
+        'parameter "score" breaks "`score` must follow pattern `^\\-?[0-9]+$`"',
+        'parameter "score" breaks "`score` must be an integer"',
+        'undocumented status 418',
+    ]
+    assert contract.check({}) == ['missing required parameter "name"', 'missing required parameter "id"']
+    assert contracts.match('GET', '/players') == (None, None)
+
+def test_path_parameters(load):
+    section = load()
+    section.subsections[2].path.url = '/teams/{id}/scores'
+    contract, params = ContractSet([section]).match('GET', '/teams/012/scores')
+    assert params == {'id': '012'} and contract.names == ['id']
+    assert contract.check(params) == []
+
+def test_check_requests(tmp_path, data):
+    records = [
+        {'method': 'GET', 'url': '/teams?page=2&sort=name', 'status': 200},
+        {'method': 'GET', 'url': '/teams?page=two&sort=name', 'status': 200},
+        {'method': 'post', 'url': '/teams', 'params': {'name': 'Red', 'id': '1'}, 'status': 400},
+        {'method': 'GET', 'url': '/players'},
+        'not a request',
+    ]
+    log = write_log(tmp_path / 'requests.jsonl', records * 50)
+    source = data('teams.json')
+    single = check_requests(source, [log], jobs=1)
+    assert (single.requests, single.matched, single.invalid) == (200, 150, 50)
+    assert [(str(v.endpoint), v.message, v.count) for v in single.sorted()] == [
+        ("('GET', '/players')", 'undocumented endpoint', 50),
+        ("('GET', '/teams')", 'parameter "page" is not int', 50),
+        ("('POST', '/teams')", 'parameter "id" breaks "`id` must be exactly 3 characters"', 50),
+    ]
+    assert single.sorted()[0].example == f'{log}:{len(json.dumps(records[0])) + len(json.dumps(records[1])) + len(json.dumps(records[2])) + 3}'
+    assert len(split_logs([log], 512)) > 4
+    parallel = check_requests(source, [log], jobs=2, chunk_size=512)
+    assert [v.obj for v in parallel.sorted()] == [v.obj for v in single.sorted()]
+    assert (parallel.requests, parallel.invalid, parallel.first_invalid) == (200, 50, single.first_invalid)
+
+def test_check_requests_command(tmp_path, capsys, data):
+    source = data('teams.json')
+    good = write_log(tmp_path / 'good.jsonl', [{'method': 'GET', 'url': '/teams/scores', 'status': 200}])
+    assert main(['check-requests', source, good, '-j', '1']) == 0
+    bad = write_log(tmp_path / 'bad.jsonl', [{'method': 'GET', 'url': '/teams/scores', 'status': 404}])
+    assert main(['check-requests', source, bad, '-j', '1']) == 1
+    assert 'GET /teams/scores: undocumented status 404 (1 requests' in capsys.readouterr().err
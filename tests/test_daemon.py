@@ -0,0 +1,125 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from ..__main__ import main
+from ..client import request
+from ..webserver.path import Section, daemon
+from ..webserver.path.daemon import RenderDaemon
+
+@pytest.fixture
+def copy(tmp_path, data):
+    # copy('teams') -> the path of a copy of tests/data/teams.json
+    def copy(name) -> str:
+        path = str(tmp_path / f'{name}.json')
+        shutil.copy(data(f'{name}.json'), path)
+        return path
+    return copy
+
+def test_render_is_cached_until_the_source_changes(tmp_path, baseline, copy):
+    source = copy('teams')
+    renders = RenderDaemon()
+    assert renders.handle({'command': 'render', 'source': source}) == {'ok': True, 'markdown': baseline('teams')}
+    assert renders.entry(source) is renders.entry(source)
+    assert renders.handle({'command': 'stats'}) == {'ok': True, 'entries': 1, 'hits': 2, 'misses': 1}
+    section = Section.load_file(source)
+    section.title = 'Changed and longer'
+    section.save(source)
+    assert '## Changed and longer' in renders.handle({'command': 'render', 'source': source})['markdown']
+    assert renders.misses == 2
+
+def test_least_recently_used_entries_are_dropped(tmp_path, copy):
+    teams, health = copy('teams'), copy('health')
+    renders = RenderDaemon(max_entries=1)
+    renders.entry(teams)
+    renders.entry(health)
+    assert list(renders._entries) == [health]
+    renders.handle({'command': 'drop'})
+    assert renders.handle({'command': 'stats'})['entries'] == 0
+
+def test_render_to_output_save_and_validate(tmp_path, baseline, copy):
+    source = copy('health')
+    renders = RenderDaemon()
+    assert renders.handle({'command': 'render', 'source': source, 'output': str(tmp_path / 'health.md')}) == {'ok': True}
+    assert (tmp_path / 'health.md').read_text(encoding='utf-8') == baseline('health')
+    assert renders.handle({'command': 'save', 'source': source, 'output': str(tmp_path / 'health.json.gz'), 'normalized': True}) == {'ok': True}
+    assert Section.load_file(str(tmp_path / 'health.json.gz')).obj == Section.load_file(source).obj
+    assert renders.handle({'command': 'validate', 'source': source}) == {'ok': True}
+    (tmp_path / 'bad.json').write_text('{"title": 1}')
+    response = renders.handle({'command': 'validate', 'source': str(tmp_path / 'bad.json')})
+    assert not response['ok'] and response['errors']
+
+def test_errors_are_responses(tmp_path):
+    renders = RenderDaemon()
+    response = renders.handle({'command': 'render', 'source': str(tmp_path / 'missing.json')})
+    assert response['ok'] == False and response['error'].startswith('FileNotFoundError')
+    assert renders.handle({'command': 'fly'}) == {'ok': False, 'error': 'Unknown command: fly'}
+
+def test_slow_load_does_not_block_cache_hits(tmp_path, monkeypatch, baseline, copy):
+    slow, fast = copy('teams'), copy('health')
+    renders = RenderDaemon()
+    renders.entry(fast)
+    started, release = threading.Event(), threading.Event()
+    load_file = Section.load_file
+
+    def blocking_load(path):
+        if path == slow:
+            started.set()
+            assert release.wait(10)
+        return load_file(path)
+
+    monkeypatch.setattr(daemon.Section, 'load_file', blocking_load)
+    thread = threading.Thread(target=renders.entry, args=(slow,))
+    thread.start()
+    responses = []
+    try:
+        assert started.wait(10)
+        # would wait for the slow load if it held the lock
+        hit = threading.Thread(target=lambda: responses.append(renders.handle({'command': 'render', 'source': fast})))
+        hit.start()
+        hit.join(5)
+        assert responses and responses[0]['markdown'] == baseline('health')
+    finally:
+        release.set()
+        thread.join(10)
+    assert renders.entry(slow).section.title == 'Teams'
+
+def test_concurrent_loads_of_one_file_share_the_entry(tmp_path, copy):
+    source = copy('teams')
+    renders = RenderDaemon()
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(renders.entry(source))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(entries) == 8 and all(entry is entries[0] for entry in entries)
+
+def test_socket_roundtrip(tmp_path, baseline, copy):
+    if not hasattr(os, 'getuid'):
+        pytest.skip('unix sockets are not available')
+    socket_path = str(tmp_path / 'd.sock')
+    server = threading.Thread(target=daemon.serve, args=(socket_path,), daemon=True)
+    server.start()
+    for _ in range(200):
+        if os.path.exists(socket_path):
+            break
+        threading.Event().wait(0.01)
+    try:
+        assert request(socket_path, {'command': 'ping'}) == {'ok': True}
+        assert request(socket_path, {'command': 'render', 'source': copy('health')})['markdown'] == baseline('health')
+        with pytest.raises(RuntimeError):
+            daemon.remove_stale_socket(socket_path)
+    finally:
+        assert request(socket_path, {'command': 'shutdown'}) == {'ok': True}
+        server.join(10)
+    assert not os.path.exists(socket_path)
+
+def test_commands_run_without_getuid(tmp_path, monkeypatch, capsys, copy):
+    # the default socket path is only resolved by the daemon and client commands
+    monkeypatch.delattr(os, 'getuid', raising=False)
+    assert main(['validate', copy('health'), '-j', '1']) == 0
+    assert main(['client', 'ping', '--socket', str(tmp_path / 'missing.sock')]) == 1
+    assert 'Could not reach a daemon on' in capsys.readouterr().err
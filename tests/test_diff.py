@@ -0,0 +1,81 @@
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import HTTPMethod, Section
+from ..webserver.path.diff import changelog, diff
+
+def summary(changes) -> list[tuple]:
+    return [(change.kind, change.subject, change.endpoint, change.name) for change in changes]
+
+def test_identical_sections_return_before_looking_inside(monkeypatch, load):
+    old, new = load(), load()
+    assert diff(old, new) == []
+    monkeypatch.setattr(Section, 'subsections', property(lambda self: pytest.fail('looked inside')))
+    assert diff(old, new) == []
+
+def test_changes_inside_an_endpoint(load):
+    old, new = load(), load()
+    get, post = new.subsections[0], new.subsections[1]
+    get.description = 'Lists teams.'
+    get.parameters['page'].required = True
+    get.parameters.parameters.pop()
+    get.logic = None
+    post.path.requireMasterAuth = False
+    post.responses[0].content = '`created`'
+    changes = diff(old, new)
+    endpoint, post_endpoint = ('/teams', HTTPMethod.GET), ('/teams', HTTPMethod.POST)
+    assert summary(changes) == [
+        ('changed', 'description', endpoint, None),
+        ('changed', 'parameter', endpoint, 'page'),
+        ('removed', 'parameter', endpoint, 'sort'),
+        ('removed', 'logic', endpoint, None),
+        ('changed', 'authentication', post_endpoint, None),
+        ('changed', 'response', post_endpoint, '201 CREATED'),
+    ]
+    assert changes[1].details[0] == 'required: False -> True'
+    assert changes[4].details == ['requireMasterAuth: True -> False']
+
+def test_added_and_removed_endpoints(load):
+    old, new = load(), load()
+    del new.subsections[2]
+    new.subsections.append(load('health').subsections[0])
+    assert summary(diff(old, new)) == [
+        ('removed', 'endpoint', ('/teams/scores', HTTPMethod.GET), None),
+        ('added', 'endpoint', ('/health', HTTPMethod.GET), None),
+    ]
+
+def test_digests_follow_changes(load):
+    old, new = load(), load()
+    assert diff(old, new) == []
+    new.subsections[2].responses[0].context = 'Every team'
+    assert summary(diff(old, new)) == [('changed', 'response', ('/teams/scores', HTTPMethod.GET), '200 OK')]
+    new.subsections[2].responses[0].context = None
+    assert diff(old, new) == []
+
+def test_duplicate_endpoints_are_refused(load):
+    old, new = load(), load()
+    new.subsections[2].path.url = '/teams'
+    with pytest.raises(ValueError, match='GET /teams more than once'):
+        diff(old, new)
+    with pytest.raises(ValueError):
+        diff(new, old)
+
+def test_changelog(load):
+    old, new = load(), load()
+    del new.subsections[2]
+    new.subsections[0].description = 'Lists teams.'
+    assert changelog(diff(old, new), 'Teams') == (
+        '## Changelog: Teams\n\n'
+        '### Removed endpoints\n- `GET /teams/scores`\n\n'
+        '### Changed endpoints\n#### `GET /teams`\n- Changed description\n\n'
+    )
+    assert changelog([]) == '## Changelog\n\nNo changes.\n'
+
+def test_diff_command(tmp_path, capsys, data, load):
+    new = load()
+    new.subsections[2].path.url = '/teams'
+    new.save(str(tmp_path / 'new.json'))
+    assert main(['diff', data('teams.json'), str(tmp_path / 'new.json')]) == 1
+    assert 'more than once' in capsys.readouterr().err
+    assert main(['diff', data('teams.json'), data('teams.json'), '-o', str(tmp_path / 'log.md')]) == 0
+    assert (tmp_path / 'log.md').read_text(encoding='utf-8') == '## Changelog: Teams\n\nNo changes.\n'
@@ -0,0 +1,53 @@
+import pytest
+
+from ..webserver.path import HTTPMethod
+from ..webserver.path.document import HTMLBackend, MarkdownBackend, TextBackend, backend_for, iter_document, render
+from ..webserver.path.render import RenderEngine
+
+@pytest.mark.parametrize('name', ['teams', 'health'])
+def test_markdown_backend_matches_section_render(name, load, baseline):
+    section = load(name)
+    assert render(section, MarkdownBackend())[0] == baseline(name) == section.render_to_string()
+
+def test_markdown_backend_follows_the_engine(monkeypatch, load):
+    # there is one markdown renderer, a change to the engine shows up in both
+    monkeypatch.setattr(RenderEngine, 'DEFAULT_DESCRIPTION', 'Nothing yet.')
+    section = load('teams')
+    section.subsections[2].description = None
+    markdown = render(section, MarkdownBackend(RenderEngine()))[0]
+    assert 'Nothing yet.' in markdown
+    assert markdown == RenderEngine().render_to_string(section)
+
+def test_blocks(load):
+    section = load('teams')
+    header, *blocks = list(iter_document(section))
+    assert header.title == 'Teams' and not hasattr(header, 'section')
+    assert [row[0] for row in header.rows] == ['/teams', '/teams', '/teams/scores']
+    assert [block.method for block in blocks] == [HTTPMethod.GET, HTTPMethod.POST, HTTPMethod.GET]
+    assert [block.description for block in blocks] == [s.description for s in section]
+    assert all(block.multiple for block in blocks)
+    statuses = [status.value for status, _, _ in blocks[1].responses]
+    assert statuses == sorted(statuses)
+    assert blocks[2].parameters == None
+
+def test_html_and_text(load):
+    section = load('teams')
+    markdown, page, text = render(section, MarkdownBackend(), HTMLBackend(), TextBackend())
+    assert page.startswith('<!DOCTYPE html>') and page.endswith('</html>\n')
+    assert '<h2>Teams</h2>' in page and '<code>/teams/scores</code>' in page
+    assert '`' not in page.split('<body>')[1].replace('<code>', '').replace('</code>', '')
+    assert text.startswith('Teams\n=====\n')
+    assert 'Possible responses:' in text and '|' not in text
+
+def test_render_files_picks_backends_from_extensions(tmp_path, load, baseline):
+    section = load('health')
+    paths = [str(tmp_path / name) for name in ('health.md', 'health.html', 'health.txt.gz')]
+    section.render_files(*paths)
+    assert (tmp_path / 'health.md').read_text(encoding='utf-8') == baseline('health')
+    assert (tmp_path / 'health.html').read_text(encoding='utf-8') == render(section, HTMLBackend())[0]
+    assert isinstance(backend_for('health.txt.gz'), TextBackend)
+    with pytest.raises(ValueError):
+        backend_for('health.pdf')
+    with pytest.raises(ValueError):
+        section.render_files(str(tmp_path / 'other.md'), str(tmp_path / 'other.pdf'))
+    assert not (tmp_path / 'other.md').exists()
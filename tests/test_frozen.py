@@ -0,0 +1,92 @@
+import copy
+import pickle
+
+import pytest
+
+from ..webserver.path import FrozenSection, HTTPMethod, POSTResponses
+
+def test_freeze_keeps_the_obj_and_the_markdown(load, baseline):
+    section = load()
+    obj, digest = section.obj, section.digest
+    assert section.freeze() is section and type(section) == FrozenSection
+    assert section.frozen and all(subsection.frozen for subsection in section)
+    assert section.obj == obj and section.digest == digest
+    assert section.render_to_string() == baseline()
+
+@pytest.mark.parametrize('change', [
+    lambda section: setattr(section, 'title', 'Changed'),
+    lambda section: setattr(section[0], 'description', 'Changed'),
+    lambda section: setattr(section[0].path, 'requireAuth', True),
+    lambda section: setattr(section[0].parameters['page'], 'required', True),
+    lambda section: section[0].parameters.add(section[1].parameters['name']),
+    lambda section: setattr(section[0].logic, 'notes', 'Changed'),
+    lambda section: setattr(section[0].responses[0], 'context', 'Changed'),
+    lambda section: section.subsections.append(section[0]),
+    lambda section: section[0].responses.append(section[0].responses[0]),
+], ids=['title', 'description', 'path', 'parameter', 'parameters', 'logic', 'response', 'subsections', 'responses'])
+def test_frozen_nodes_can_not_be_changed(change, load, baseline):
+    section = load().freeze()
+    with pytest.raises(AttributeError):
+        change(section)
+    assert section.render_to_string() == baseline()
+
+def test_evolve_shares_what_did_not_change(load):
+    base = load().freeze()
+    base.render_to_string()
+    rendered = base[1]._rendered
+    variant = base.evolve_subsection(('/teams', 'GET'), description='Version 2.')
+    assert variant.frozen and variant[0].frozen
+    assert variant[0] is not base[0] and variant[0].parameters is base[0].parameters
+    assert variant[1] is base[1] and variant[2] is base[2]
+    assert base[0].description != 'Version 2.'
+    markdown = variant.render_to_string()
+    assert 'Version 2.' in markdown and 'Version 2.' not in base.render_to_string()
+    assert base[1]._rendered is rendered
+    assert variant.obj['subsections'][1] is base.obj['subsections'][1]
+
+def test_evolve_a_parameter(load):
+    base = load().freeze()
+    parameters = base[1].parameters.evolve_parameter('id', required=False)
+    variant = base.evolve_subsection(('/teams', HTTPMethod.POST), parameters=parameters)
+    assert variant[1].parameters['id'].required == False and base[1].parameters['id'].required == True
+    assert variant[1].parameters['name'] is base[1].parameters['name']
+    assert variant.digest != base.digest
+    with pytest.raises(TypeError):
+        base.evolve(name='Teams')
+
+@pytest.mark.parametrize('evolve', [
+    lambda section: section.evolve(title='Variant'),
+    lambda section: section.evolve_subsection(('/teams', 'POST'), description='Version 2.'),
+    lambda section: section.evolve_subsection(('/teams', 'POST'), parameters=section[1].parameters.evolve_parameter('id', required=False)),
+], ids=['evolve', 'evolve_subsection', 'evolve_parameter'])
+def test_evolve_a_mutable_section(evolve, load):
+    section = load()
+    variant = evolve(section)
+    assert not variant.frozen and variant[0] is not section[0]
+    obj = variant.obj
+    section[0].description = 'Changed in the base.'
+    section[0].parameters['page'].required = True
+    section[1].parameters['name'].description = 'Changed in the base.'
+    section[2].responses.pop()
+    section[2].path.url = '/scores'
+    assert variant.obj == obj
+    variant[0].logic.notes = 'Changed in the variant.'
+    assert section[0].logic.notes != 'Changed in the variant.'
+    variant.subsections.pop()
+    assert len(section) == 3 and len(variant) == 2
+
+def test_evolve_a_mutable_section_keeps_its_shared_responses(load):
+    section = load()
+    section[1].responses.append(POSTResponses.REQUIRED_PARAMETERS_MISSING)
+    variant = section.evolve(title='Variant')
+    assert variant[1].responses[-1] is POSTResponses.REQUIRED_PARAMETERS_MISSING
+    assert variant[1].responses[0] is not section[1].responses[0]
+
+@pytest.mark.parametrize('copy_section', [copy.deepcopy, lambda section: pickle.loads(pickle.dumps(section))], ids=['deepcopy', 'pickle'])
+def test_copies_stay_frozen(copy_section, load):
+    section = load().freeze()
+    copied = copy_section(section)
+    assert type(copied) == FrozenSection and copied[0].frozen and copied[0].parameters['page'].frozen
+    assert copied.obj == section.obj
+    with pytest.raises(AttributeError):
+        copied.title = 'Changed'
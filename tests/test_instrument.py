@@ -0,0 +1,69 @@
+import pytest
+
+from ..webserver.path import build
+from ..webserver.path.instrument import NULL_STAGE, Instrumentation, instrumentation
+
+@pytest.fixture
+def clean():
+    # the tests change the instrumentation every module shares
+    instrumentation.disable()
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_disabled_stages_record_nothing():
+    recorder = Instrumentation()
+    assert recorder.stage('load') is NULL_STAGE
+    with recorder.stage('load'):
+        pass
+    assert recorder.timers == {}
+
+def test_stages_counters_and_observers():
+    recorder = Instrumentation()
+    events = []
+    recorder.add_observer(lambda *event: events.append(event[:2]))
+    recorder.enable()
+    with recorder.stage('load'):
+        pass
+    with recorder.stage('load'):
+        pass
+    recorder.count('sections')
+    recorder.count('subsections', 3)
+    assert recorder.timers['load'][0] == 2
+    assert recorder.counters == {'sections': 1, 'subsections': 3}
+    assert events == [('time', 'load'), ('time', 'load'), ('count', 'sections'), ('count', 'subsections')]
+
+def test_snapshots_merge():
+    first, second = Instrumentation(), Instrumentation()
+    first.record_time('render', 0.5)
+    first.count('sections')
+    second.record_time('render', 0.25)
+    second.count('sections', 2)
+    second.merge(first.snapshot())
+    assert second.timers == {'render': [2, 0.75]}
+    assert second.counters == {'sections': 3}
+    assert 'render' in second.summary() and 'sections' in second.summary()
+
+def test_loading_and_rendering_are_instrumented(clean, load):
+    clean.enable()
+    load().render_to_string()
+    assert clean.counters['sections'] == 1
+    assert clean.counters['subsections'] == 3
+    assert clean.timers
+
+def test_profiled_build_leaves_a_disabled_instrumentation_alone(clean, tmp_path, data):
+    results = build.build(data('teams.json'), str(tmp_path), jobs=1, profile=True)
+    assert results[0].profile['counters']['sections'] == 1
+    assert not clean.enabled
+    assert clean.timers == {} and clean.counters == {}
+
+def test_profiled_build_keeps_the_callers_numbers(clean, tmp_path, data):
+    clean.enable()
+    clean.count('mine', 5)
+    results = build.build(data('teams.json'), str(tmp_path), jobs=1, profile=True)
+    assert clean.enabled
+    assert clean.counters['mine'] == 5
+    assert clean.counters['sections'] == 1
+    assert 'mine' not in results[0].profile['counters']
+    assert 'sections' in build.profile_summary(results)
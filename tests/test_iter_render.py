@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from ..webserver.path import Section
+from ..webserver.path.render import engine
+
+def write_jsonl(path, section: Section, normalized: bool = False):
+    obj = section.normalized_obj if normalized else section.obj
+    with open(path, 'w', encoding='utf-8') as f:
+        title = {'title': obj['title']}
+        if normalized:
+            title['responses'] = obj['responses']
+        f.write(json.dumps(title) + '\n')
+        for subsection in obj['subsections']:
+            f.write(json.dumps(subsection) + '\n\n')
+
+def test_iter_render_yields_header_then_one_chunk_per_subsection(load, baseline):
+    section = load('teams')
+    chunks = list(section.iter_render())
+    assert len(chunks) == len(section) + 1
+    assert chunks[0].startswith('## Teams\n')
+    assert ''.join(chunks) == baseline('teams')
+
+def test_iter_render_file_json(data, baseline):
+    assert ''.join(Section.iter_render_file(data('teams.json'))) == baseline('teams')
+    assert ''.join(Section.iter_render_file(data('health.json'))) == baseline('health')
+
+def test_iter_render_file_normalized(tmp_path, load, baseline):
+    load('teams').save(tmp_path / 'teams.json', normalized=True)
+    assert ''.join(Section.iter_render_file(str(tmp_path / 'teams.json'))) == baseline('teams')
+
+def test_iter_render_file_jsonl(tmp_path, load, baseline):
+    write_jsonl(tmp_path / 'teams.jsonl', load('teams'))
+    write_jsonl(tmp_path / 'normalized.jsonl', load('teams'), normalized=True)
+    assert ''.join(Section.iter_render_file(str(tmp_path / 'teams.jsonl'))) == baseline('teams')
+    assert ''.join(Section.iter_render_file(str(tmp_path / 'normalized.jsonl'))) == baseline('teams')
+
+def test_iter_render_source_splits_large_summary_tables(data, load, baseline):
+    chunks = list(engine.iter_render_source(data('teams.json'), rows_per_chunk=2))
+    assert ''.join(chunks) == baseline('teams')
+    assert len(chunks) > len(load('teams')) + 1
+
+def test_iter_render_file_needs_the_title_first(tmp_path):
+    path = tmp_path / 'late.json'
+    path.write_text('{"subsections": [], "title": "Late"}')
+    with pytest.raises(ValueError, match='before "title"'):
+        list(Section.iter_render_file(str(path)))
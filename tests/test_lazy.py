@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from ..webserver.path import HTTPMethod, Section, Subsection
+
+def test_lazy_section_builds_nothing_up_front(load):
+    section = load(lazy=True)
+    assert not section.loaded
+    assert section.title == load().title
+    assert len(section) == 3
+    assert section.paths == [('/teams', HTTPMethod.GET), ('/teams', HTTPMethod.POST), ('/teams/scores', HTTPMethod.GET)]
+    assert not section.loaded
+
+def test_subsections_are_built_on_first_access(load):
+    section = load(lazy=True)
+    first = section[1]
+    assert isinstance(first, Subsection)
+    assert section[1] is first
+    assert not section.loaded
+    section[0], section[2]
+    assert section.loaded
+
+@pytest.mark.parametrize('use', [
+    lambda section: section.obj,
+    lambda section: list(section),
+    lambda section: section.subsections,
+    lambda section: section.render_to_string(),
+    lambda section: pickle.loads(pickle.dumps(section)),
+], ids=['obj', 'iter', 'subsections', 'render', 'pickle'])
+def test_whole_section_uses_build_everything(use, load):
+    section = load(lazy=True)
+    use(section)
+    assert section.loaded
+
+def test_lazy_section_is_the_same_section(load, baseline):
+    lazy, eager = load(lazy=True), load()
+    assert lazy.render_to_string() == baseline()
+    assert lazy.obj == eager.obj
+    assert pickle.loads(pickle.dumps(load(lazy=True))).obj == eager.obj
+
+def test_lazy_normalized_section_shares_responses(tmp_path, load):
+    path = str(tmp_path / 'normalized.json')
+    section = load()
+    section.subsections[2].responses.append(section.subsections[0].responses[0])
+    section.save(path, normalized=True)
+    lazy = Section.load_file(path, lazy=True)
+    assert lazy[2].responses[-1] is lazy[0].responses[0]
+    assert lazy.obj == section.obj
+
+def test_replacing_an_unbuilt_subsection(load):
+    section = load(lazy=True)
+    section[0] = load()[2]
+    assert section[0].path.url == '/teams/scores'
+    section[1], section[2]
+    assert section.loaded
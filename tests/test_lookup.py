@@ -0,0 +1,92 @@
+import pytest
+
+from ..webserver.path import HTTPMethod, HTTPPath, Parameter, Parameters, Subsection
+
+def parameters() -> Parameters:
+    ps = Parameters([Parameter('a'), Parameter('b'), Parameter('c')])
+    ps.reindex()
+    return ps
+
+def test_parameter_lookup():
+    ps = parameters()
+    assert ps.get('b') is ps.parameters[1]
+    assert ps['c'] is ps.parameters[2]
+    assert ps.get('missing') == None
+    assert ps.get_many(['c', 'missing']) == [ps.parameters[2], None]
+    with pytest.raises(KeyError):
+        ps['missing']
+
+def test_parameter_lookup_after_item_assignment():
+    ps = parameters()
+    ps.parameters[0] = Parameter('z')
+    assert ps.get('z') is ps.parameters[0]
+    assert ps.get('a') == None
+    ps[1] = Parameter('y')
+    assert ps.get('y') is ps.parameters[1] and ps.get('b') == None
+
+@pytest.mark.parametrize('change', [
+    lambda ps: ps.parameters.insert(0, Parameter('z')),
+    lambda ps: ps.parameters.reverse(),
+    lambda ps: ps.parameters.pop(0),
+    lambda ps: ps.parameters.__delitem__(slice(0, 2)),
+    lambda ps: ps.parameters.extend([Parameter('z')]),
+    lambda ps: ps.parameters.sort(key=lambda parameter: parameter.name, reverse=True),
+    lambda ps: setattr(ps, 'parameters', [Parameter('c'), Parameter('z')]),
+], ids=['insert', 'reverse', 'pop', 'del slice', 'extend', 'sort', 'replace list'])
+def test_parameter_lookup_after_list_changes(change):
+    ps = parameters()
+    change(ps)
+    for name in ['a', 'b', 'c', 'z']:
+        expected = next((parameter for parameter in ps.parameters if parameter.name == name), None)
+        assert ps.get(name) is expected
+
+def test_parameter_lookup_after_rename():
+    ps = parameters()
+    ps.parameters[0].name = 'z'
+    assert ps.get('z') is ps.parameters[0]
+    assert ps.get('a') == None
+
+def test_first_parameter_with_a_name_wins():
+    ps = parameters()
+    ps.parameters.append(Parameter('a'))
+    assert ps.get('a') is ps.parameters[0]
+    del ps.parameters[0]
+    assert ps.get('a') is ps.parameters[-1]
+
+def test_subsection_lookup(load):
+    section = load()
+    assert section.get(('/teams', 'POST')) is section.subsections[1]
+    assert section[('/teams', HTTPMethod.GET)] is section.subsections[0]
+    assert section.get(('/teams/scores', 'POST')) == None
+    with pytest.raises(KeyError):
+        section[('/nowhere', 'GET')]
+
+def test_subsection_lookup_after_replacing_a_subsection(load):
+    section = load()
+    section.reindex()
+    section.subsections[0] = Subsection(HTTPPath('/players'))
+    assert section.get(('/players', 'GET')) is section.subsections[0]
+    assert section.get(('/teams', 'GET')) == None
+    section[1] = Subsection(HTTPPath('/players', HTTPMethod.POST))
+    assert section.get(('/players', 'POST')) is section.subsections[1]
+    assert section.get(('/teams', 'POST')) == None
+
+def test_subsection_lookup_after_path_changes(load):
+    section = load()
+    section.reindex()
+    section.subsections[0].path.url = '/players'
+    assert section.get(('/players', 'GET')) is section.subsections[0]
+    assert section.get(('/teams', 'GET')) == None
+    section.subsections[1].path = HTTPPath('/scores', HTTPMethod.GET)
+    assert section.get(('/scores', 'GET')) is section.subsections[1]
+    assert section.get(('/teams', 'POST')) == None
+    section.subsections[1].path.method = HTTPMethod.POST
+    assert section.get(('/scores', 'POST')) is section.subsections[1]
+
+def test_lazy_section_lookup_builds_only_what_it_finds(load):
+    section = load(lazy=True)
+    subsection = section.get(('/teams/scores', 'GET'))
+    assert subsection.path.url == '/teams/scores'
+    assert not section.loaded
+    subsection.path.url = '/scores'
+    assert section.get(('/scores', 'GET')) is subsection
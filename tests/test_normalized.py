@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+from ..webserver.path import Response, Section
+
+@pytest.fixture
+def section(load) -> Section:
+    section = load()
+    # the same response in two subsections, stored once in the table
+    shared = Response(404, '`missing`', 'No such team.')
+    section.subsections[0].responses.append(shared)
+    section.subsections[2].responses.append(Response(404, '`missing`', 'No such team.'))
+    return section
+
+def test_every_distinct_response_is_stored_once(section):
+    normalized = section.normalized_obj
+    table = normalized['responses']
+    assert len(table) == len({json.dumps(response, sort_keys=True) for response in table})
+    for subsection, original in zip(normalized['subsections'], section.obj['subsections']):
+        assert all(type(index) == int for index in subsection['responses'])
+        assert [table[index] for index in subsection['responses']] == original['responses']
+    assert normalized['subsections'][0]['responses'][-1] == normalized['subsections'][2]['responses'][-1]
+
+def test_normalized_file_loads_the_same_section(tmp_path, section):
+    section.save(str(tmp_path / 'plain.json'))
+    section.save(str(tmp_path / 'normalized.json'), normalized=True)
+    assert os.path.getsize(tmp_path / 'normalized.json') < os.path.getsize(tmp_path / 'plain.json')
+    plain = Section.load_file(str(tmp_path / 'plain.json'))
+    normalized = Section.load_file(str(tmp_path / 'normalized.json'))
+    assert normalized.obj == plain.obj == section.obj
+    assert normalized.render_to_string() == section.render_to_string()
+
+def test_loaded_table_responses_are_shared(tmp_path, section):
+    section.save(str(tmp_path / 'normalized.json'), normalized=True)
+    loaded = Section.load_file(str(tmp_path / 'normalized.json'))
+    assert loaded.subsections[0].responses[-1] is loaded.subsections[2].responses[-1]
+
+def test_normalized_roundtrip_is_stable(section):
+    normalized = section.normalized_obj
+    again = Section.load(json.loads(json.dumps(normalized)))
+    assert again.normalized_obj == normalized
+    assert Section.load(again.obj).normalized_obj == normalized
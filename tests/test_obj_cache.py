@@ -0,0 +1,120 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+from ..webserver.path import Logic, Parameter, Parameters, Response, Section
+
+def fresh_obj(section: Section) -> dict:
+    # the obj of a Section built again from its obj, so nothing is cached
+    return Section.load(copy.deepcopy(section.obj)).obj
+
+def test_warm_obj_is_the_cached_one(load):
+    section = load()
+    assert section.obj is section.obj
+    assert section.subsections[0].obj is section.obj['subsections'][0]
+
+def test_field_change_reaches_every_parent(load):
+    section = load()
+    section.obj
+    parameter = section.subsections[0].parameters.parameters[0]
+    parameter.description = 'changed'
+    assert section.obj['subsections'][0]['parameters']['parameters'][0]['description'] == 'changed'
+    assert section.obj == fresh_obj(section)
+
+def test_list_changes_reach_the_owner(load):
+    section = load()
+    section.obj
+    parameters = section.subsections[0].parameters
+    parameters.parameters.append(Parameter('extra'))
+    assert section.obj['subsections'][0]['parameters']['parameters'][-1]['name'] == 'extra'
+    del parameters.parameters[-1]
+    section.subsections[0].logic.steps[0] = 'first'
+    assert section.obj == fresh_obj(section)
+    assert section.obj['subsections'][0]['logic']['steps'][0] == 'first'
+    section.subsections.pop()
+    assert len(section.obj['subsections']) == 2
+
+def test_replaced_child_and_list_are_tracked(load):
+    section = load()
+    section.obj
+    subsection = section.subsections[0]
+    old = subsection.parameters
+    subsection.parameters = Parameters([Parameter('only')])
+    assert section.obj['subsections'][0]['parameters']['parameters'][0]['name'] == 'only'
+    # the old child no longer belongs to the subsection
+    old.parameters[0].name = 'gone'
+    assert section.obj == fresh_obj(section)
+    subsection.logic = Logic(['a', 'b'])
+    subsection.logic.steps.append('c')
+    assert section.obj['subsections'][0]['logic']['steps'] == ['a', 'b', 'c']
+
+def test_shared_child_changes_every_parent(load):
+    section = load()
+    response = Response(404, '`missing`')
+    section.subsections[0].responses.append(response)
+    section.subsections[1].responses.append(response)
+    section.obj
+    response.content = '`not here`'
+    for subsection in section.obj['subsections'][:2]:
+        assert subsection['responses'][-1]['content'] == '`not here`'
+    section.subsections[0].responses.remove(response)
+    response.content = '`again`'
+    assert section.obj['subsections'][1]['responses'][-1]['content'] == '`again`'
+    assert section.obj == fresh_obj(section)
+
+def test_digest_follows_changes(load):
+    section = load()
+    before = section.digest
+    assert section.digest is before
+    section.subsections[2].path.url = '/teams/points'
+    assert section.digest != before
+    section.subsections[2].path.url = '/teams/scores'
+    assert section.digest == before
+
+def test_obj_is_read_only(load):
+    section = load()
+    obj = section.obj
+    with pytest.raises(TypeError):
+        obj['title'] = 'changed'
+    with pytest.raises(TypeError):
+        obj['subsections'].append({})
+    with pytest.raises(TypeError):
+        obj['subsections'][0]['path'].update(url='/')
+    assert section.obj is obj
+
+def test_copies_of_obj_can_be_changed(load):
+    section = load()
+    copied = copy.deepcopy(section.obj)
+    assert type(copied) == dict and type(copied['subsections']) == list
+    copied['title'] = 'changed'
+    copied['subsections'].clear()
+    assert pickle.loads(pickle.dumps(section.obj)) == section.obj
+    assert type(pickle.loads(pickle.dumps(section.obj))) == dict
+    assert json.loads(json.dumps(section.obj)) == json.loads(json.dumps(fresh_obj(section)))
+    assert section.obj['title'] != 'changed'
+
+def test_pickled_section_keeps_tracking(load):
+    section = pickle.loads(pickle.dumps(load()))
+    section.obj
+    section.subsections[0].parameters.parameters[0].name = 'renamed'
+    assert section.obj['subsections'][0]['parameters']['parameters'][0]['name'] == 'renamed'
+
+class NamedParameter(Parameter):
+    __slots__ = ()
+
+@pytest.mark.parametrize('build', [
+    lambda section: section,
+    copy.deepcopy,
+    lambda section: pickle.loads(pickle.dumps(section)),
+], ids=['built', 'deepcopy', 'pickle'])
+def test_every_built_node_is_tracked(build, load):
+    section = build(load())
+    assert not any(node._building for node in (section, section[0], section[0].path, section[0].parameters['page']))
+    assert section[0]._rendered == None
+    section.obj
+    section[0].parameters.add(NamedParameter('extra'))
+    section[0].parameters['extra'].required = True
+    assert section.obj['subsections'][0]['parameters']['parameters'][-1]['required'] == True
+    assert section.obj == fresh_obj(section)
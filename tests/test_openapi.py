@@ -0,0 +1,31 @@
+import json
+
+from ..webserver.path import Section
+from ..webserver.path.openapi import import_openapi
+
+def test_import_openapi_reports_skipped_parameters(tmp_path):
+    spec = {
+        'openapi': '3.0.0',
+        'paths': {'/teams': {
+            'parameters': [{'name': 'X-Request-Id', 'in': 'header'}],
+            'get': {
+                'tags': ['Teams'],
+                'parameters': [
+                    {'name': 'page', 'in': 'query', 'schema': {'type': 'integer'}},
+                    {'name': 'session', 'in': 'cookie'}
+                ],
+                'responses': {'200': {'description': 'The teams'}, 'default': {'description': 'Error'}}
+            },
+            'delete': {'responses': {'204': {'description': 'Deleted'}}}
+        }}
+    }
+    (tmp_path / 'spec.json').write_text(json.dumps(spec))
+    result = import_openapi(str(tmp_path / 'spec.json'), str(tmp_path / 'out'))
+    assert result.operations == 1
+    assert result.skipped == [
+        'header parameter X-Request-Id of GET /teams',
+        'cookie parameter session of GET /teams',
+        'response default of GET /teams',
+        'DELETE /teams',
+    ]
+    assert [parameter.name for parameter in Section.load_file(result.sections['Teams'])[0].parameters] == ['page']
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from ..webserver.path import CriteriaList, GETResponses, POSTResponses, PresetCache, Response, SharedResponse, presets
+
+def test_same_arguments_give_the_same_response():
+    presets.clear()
+    assert POSTResponses.ok('Added.') is POSTResponses.ok('Added.')
+    assert POSTResponses.ok('Added.') is not POSTResponses.ok('Added.', status=201)
+    assert POSTResponses.ok('Added.', status=201) is POSTResponses.ok('Added.', status=201)
+    assert presets.stats() == {'entries': 2, 'max_entries': 1024, 'hits': 4, 'misses': 2}
+
+def test_criteria_are_compared_by_their_items():
+    first = GETResponses.validation_failed(CriteriaList(['`a` must be set']))
+    assert GETResponses.validation_failed(CriteriaList(['`a` must be set'])) is first
+    assert GETResponses.validation_failed(CriteriaList(['`b` must be set'])) is not first
+    assert POSTResponses.validation_failed(CriteriaList(['`a` must be set'])) is not first
+    assert '<li>`a` must be set</li>' in first.context
+
+def test_shared_responses_are_frozen():
+    response = POSTResponses.database_error('add a team')
+    assert type(response) == SharedResponse and response.frozen
+    with pytest.raises(AttributeError):
+        response.context = 'Changed'
+    copy = response.copy()
+    assert type(copy) == Response
+    copy.context = 'Changed'
+    assert POSTResponses.database_error('add a team').context == 'A fatal error occurred when attempting to add a team.'
+
+def test_least_recently_used_entries_are_dropped():
+    cache = PresetCache(max_entries=2)
+
+    @cache.cached
+    def preset(name):
+        return SharedResponse(200, name)
+
+    a = preset('a')
+    preset('b')
+    assert preset('a') is a # now b is the least recently used
+    preset('c')
+    assert list(key[1] for key in cache._entries) == [('a',), ('c',)]
+    assert preset('a') is a and preset('b') is not None
+    assert cache.stats() == {'entries': 2, 'max_entries': 2, 'hits': 2, 'misses': 4}
+    cache.clear()
+    assert cache.stats() == {'entries': 0, 'max_entries': 2, 'hits': 0, 'misses': 0}
+
+def test_unhashable_arguments_are_not_kept():
+    cache = PresetCache()
+
+    @cache.cached
+    def preset(content):
+        return SharedResponse(200, str(content))
+
+    assert preset({'a': 1}) is not preset({'a': 1})
+    assert cache.stats()['entries'] == 0 and cache.stats()['misses'] == 2
+
+def test_bookkeeping_is_consistent_across_threads():
+    cache = PresetCache(max_entries=8)
+
+    @cache.cached
+    def preset(number):
+        return SharedResponse(200, str(number))
+
+    def work(seed):
+        for index in range(2000):
+            preset((seed * 7 + index) % 12)
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 8 * 2000
+    assert stats['entries'] == 8
+
+def test_threads_that_miss_at_once_get_the_same_response():
+    cache = PresetCache()
+    barrier = threading.Barrier(4)
+
+    @cache.cached
+    def preset(name):
+        barrier.wait(10) # every thread has missed before any stores its Response
+        return SharedResponse(200, name)
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(preset('a'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert len(responses) == 4 and all(response is responses[0] for response in responses)
+    assert cache.stats() == {'entries': 1, 'max_entries': 1024, 'hits': 0, 'misses': 4}
@@ -0,0 +1,34 @@
+import io
+
+import pytest
+
+from ..webserver.path.render import RenderEngine, engine
+
+# teams.md and health.md were rendered by Section.render before the render
+# engine existed, the engine has to produce exactly the same bytes
+@pytest.mark.parametrize('name', ['teams', 'health'])
+def test_render_matches_baseline(name, tmp_path, data, load):
+    load(name).render(tmp_path / f'{name}.md')
+    with open(data(f'{name}.md'), 'rb') as f:
+        assert (tmp_path / f'{name}.md').read_bytes() == f.read()
+
+@pytest.mark.parametrize('name', ['teams', 'health'])
+def test_render_to_string_and_into(name, load, baseline):
+    section = load(name)
+    buffer = io.StringIO()
+    section.render_into(buffer)
+    assert section.render_to_string() == baseline(name)
+    assert buffer.getvalue() == baseline(name)
+
+def test_separate_engines_render_the_same(load):
+    section = load()
+    assert RenderEngine().render_to_string(section) == engine.render_to_string(section)
+
+def test_render_follows_changes(load):
+    section = load('health')
+    section.render_to_string()
+    section[0].path.url = '/status'
+    section[0].responses[0].context = 'Changed'
+    markdown = section.render_to_string()
+    assert '`/status`' in markdown
+    assert '| GET | 200 | OK | `ok` | Changed |' in markdown
@@ -0,0 +1,65 @@
+import json
+import os
+import stat
+
+import pytest
+
+from ..webserver.path import Section
+from ..webserver.path.files import atomic_write, strip_compression
+from ..webserver.path.stream import iter_encode
+
+@pytest.mark.parametrize('value', [
+    {'a': [1, 2.5, None, True], 'b': {'c': 'd "e"\n'}, 'f': []},
+    {'list': [{}, [], '', 0], 'text': 'üñí'},
+    {},
+])
+def test_iter_encode_matches_json_dumps(value):
+    assert ''.join(iter_encode(value)) == json.dumps(value)
+
+def test_saved_json_is_json_dumps_of_the_obj(tmp_path, load):
+    section = load()
+    section.save(str(tmp_path / 'teams.json'))
+    assert (tmp_path / 'teams.json').read_text(encoding='utf-8') == json.dumps(section.obj)
+
+@pytest.mark.parametrize('extension', ['.gz', '.xz', '.lzma', '.bz2'])
+def test_compressed_roundtrip(tmp_path, extension, load):
+    section = load()
+    path = str(tmp_path / f'teams.json{extension}')
+    section.save(path)
+    assert os.path.getsize(path) < len(json.dumps(section.obj))
+    assert Section.load_file(path).obj == section.obj
+    assert strip_compression(path) == str(tmp_path / 'teams.json')
+
+def test_gzip_output_is_reproducible(tmp_path, load):
+    load().save(str(tmp_path / 'a.json.gz'))
+    load().save(str(tmp_path / 'b.json.gz'))
+    assert (tmp_path / 'a.json.gz').read_bytes() == (tmp_path / 'b.json.gz').read_bytes()
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'teams.json'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write('new')
+            raise RuntimeError('stopped half way')
+    assert path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['teams.json']
+
+def test_failed_save_keeps_the_old_file(tmp_path, load):
+    path = str(tmp_path / 'teams.json')
+    load().save(path)
+    before = (tmp_path / 'teams.json').read_bytes()
+    section = load()
+    section.subsections[0].responses[0].content = object() # cannot be encoded
+    with pytest.raises(TypeError):
+        section.save(path)
+    assert (tmp_path / 'teams.json').read_bytes() == before
+    assert os.listdir(tmp_path) == ['teams.json']
+
+def test_written_files_get_the_usual_permissions(tmp_path, load):
+    umask = os.umask(0o022)
+    os.umask(umask)
+    plain = tmp_path / 'plain.json'
+    plain.write_text('{}')
+    load().save(str(tmp_path / 'teams.json'))
+    assert stat.S_IMODE(os.stat(tmp_path / 'teams.json').st_mode) == stat.S_IMODE(os.stat(plain).st_mode)
@@ -0,0 +1,73 @@
+import json
+import os
+import random
+
+from ..__main__ import main
+from ..webserver.path.index import ExternalSorter, heading_anchor, write_index
+
+def endpoint_rows(index) -> list[str]:
+    lines = index.read_text(encoding='utf-8').split('## Endpoints\n')[1].splitlines()
+    return [line for line in lines[3:] if line]
+
+def test_external_sort_spills_and_merges(tmp_path):
+    items = [(random.Random(seed).randrange(1000), str(seed)) for seed in range(500)]
+    with ExternalSorter(run_size=7, fan_in=3, directory=str(tmp_path)) as sorter:
+        for item in items:
+            sorter.add(item)
+        assert sorter.count == 500
+        assert list(sorter) == sorted(items)
+    assert os.listdir(tmp_path) == []
+
+def test_external_sort_in_memory():
+    with ExternalSorter() as sorter:
+        for item in [(2, 'b'), (1, 'a')]:
+            sorter.add(item)
+        assert list(sorter) == [(1, 'a'), (2, 'b')]
+
+def test_heading_anchor():
+    assert [heading_anchor('GET', n) for n in range(3)] == ['get', 'get-1', 'get-2']
+
+def test_index_lists_sections_and_endpoints(tmp_path, src):
+    result = write_index(str(src), str(tmp_path / 'out'), run_size=2)
+    assert result.ok and (result.sections, result.endpoints) == (2, 4)
+    text = (tmp_path / 'out' / 'index.md').read_text(encoding='utf-8')
+    assert text.startswith('## Contents\n\n- [Health](nested/health.md)\n- [Teams](teams.md)\n')
+    assert endpoint_rows(tmp_path / 'out' / 'index.md') == [
+        '| `/health` | [GET](nested/health.md) | Health | ❌ | ❌ |',
+        '| `/teams` | [GET](teams.md#get) | Teams | ❌ | ❌ |',
+        '| `/teams` | [POST](teams.md#post) | Teams | ✅ | ✅ |',
+        '| `/teams/scores` | [GET](teams.md#get-1) | Teams | ✅ | ❌ |',
+    ]
+
+def test_sections_without_subsections_are_listed(tmp_path, src):
+    (src / 'empty.json').write_text(json.dumps({'title': 'Empty', 'subsections': []}))
+    result = write_index(str(src), str(tmp_path / 'out'))
+    assert result.ok and (result.sections, result.endpoints) == (3, 4)
+    assert '- [Empty](empty.md)\n' in (tmp_path / 'out' / 'index.md').read_text(encoding='utf-8')
+
+def test_endpoints_read_before_a_source_failed_stay(tmp_path, raw, src):
+    teams = raw('teams')
+    first = json.dumps(teams['subsections'][0])
+    (src / 'broken.json').write_text('{"title": "Broken", "subsections": [' + first + ', {"path": ')
+    failed = []
+    result = write_index(str(src), str(tmp_path / 'out'), report=lambda source, error: failed.append(source))
+    assert failed == [str(src / 'broken.json')]
+    assert [source for source, _ in result.errors] == failed
+    assert (result.sections, result.endpoints) == (3, 5)
+    assert '| `/teams` | [GET](broken.md#get) | Broken | ❌ | ❌ |' in endpoint_rows(tmp_path / 'out' / 'index.md')
+
+def test_subsections_before_the_title_are_read_in_one_go(tmp_path, raw):
+    src = tmp_path / 'src'
+    src.mkdir()
+    health = raw('health')
+    (src / 'health.json').write_text(json.dumps({'subsections': health['subsections'], 'title': 'Late'}))
+    result = write_index(str(src), str(tmp_path / 'out'))
+    assert result.ok and result.endpoints == 1
+    assert endpoint_rows(tmp_path / 'out' / 'index.md')[0].endswith('| Late | ❌ | ❌ |')
+
+def test_index_command(tmp_path, capsys, src):
+    (src / 'bad.json').write_text('{')
+    assert main(['index', str(src), str(tmp_path / 'out'), '--index', str(tmp_path / 'site.md')]) == 1
+    captured = capsys.readouterr()
+    assert 'Indexed 4 endpoints in 2 sections' in captured.out and 'bad.json' in captured.err
+    assert '(out/teams.md#post)' in (tmp_path / 'site.md').read_text(encoding='utf-8')
@@ -0,0 +1,48 @@
+import pytest
+
+from ..benchmarks.corpus import generate_section
+from ..benchmarks.memory import count_objects, measure_load
+from ..webserver.path import CriteriaList, HTTPPath, Logic, Parameter, Parameters, Response, Section, Subsection
+
+@pytest.mark.parametrize('node', [
+    HTTPPath('/teams'),
+    Parameter('name', 'str'),
+    Parameters([Parameter('name')]),
+    Response(200, 'ok', 'Normal operation'),
+    Logic(['step']),
+    CriteriaList(['must be short']),
+    Subsection(HTTPPath('/teams')),
+    Section('Teams', [])
+], ids=lambda node: type(node).__name__)
+def test_model_classes_have_no_dict(node):
+    assert not hasattr(node, '__dict__')
+    with pytest.raises(AttributeError):
+        node.misspelled = True
+
+def test_loaded_strings_are_interned(data):
+    path = data('teams.json')
+    first, second = Section.load_file(path), Section.load_file(path)
+    for a, b in zip(first.subsections, second.subsections):
+        assert a.path.url is b.path.url
+        for response_a, response_b in zip(a.responses, b.responses):
+            assert response_a.content is response_b.content
+            assert response_a.context is response_b.context
+        if a.parameters != None:
+            for parameter_a, parameter_b in zip(a.parameters.parameters, b.parameters.parameters):
+                assert parameter_a.name is parameter_b.name
+                assert parameter_a.value_type is parameter_b.value_type
+        if a.logic != None:
+            assert all(step_a is step_b for step_a, step_b in zip(a.logic.steps, b.logic.steps))
+
+def test_generated_corpus_is_reproducible():
+    assert generate_section(4, 3, 2, seed=1).obj == generate_section(4, 3, 2, seed=1).obj
+    assert generate_section(4, 3, 2, seed=1).obj != generate_section(4, 3, 2, seed=2).obj
+
+def test_memory_benchmark_counts_the_loaded_section(tmp_path):
+    path = str(tmp_path / 'corpus.json')
+    generate_section(4, 3, 2).save(path)
+    current, peak, section = measure_load(path)
+    assert 0 < current <= peak
+    assert count_objects(section) == {
+        'Section': 1, 'Subsection': 4, 'HTTPPath': 4, 'Parameters': 4, 'Parameter': 12, 'Logic': 4, 'Response': 8
+    }
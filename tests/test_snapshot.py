@@ -0,0 +1,98 @@
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import HTTPMethod, HTTPPath, Logic, Parameter, Parameters, Response, Section, Subsection
+from ..webserver.path.snapshot import HEADER, SnapshotError, dumps, is_snapshot, json_to_snapshot, loads, snapshot_to_json
+
+def unusual() -> Section:
+    # fields a snapshot stores as JSON values, empty nodes and text outside ASCII
+    return Section('Ünusual ✅', [
+        Subsection(
+            path = HTTPPath('/a', HTTPMethod.POST, True, False),
+            parameters = Parameters([
+                Parameter('count', 'int', False, 3),
+                Parameter('tags', 'list[str]', False, ['a', 'b']),
+                Parameter('filter', 'dict', False, {'x': [1, None]}),
+                Parameter('flag', 'bool', False, False)
+            ], notes = 'Notes\nover two lines'),
+            logic = Logic([], None),
+            responses = [Response(200, {'ok': True}), Response(404), Response(200, {'ok': True})],
+            description = ''
+        ),
+        Subsection(path = HTTPPath('/b', HTTPMethod.GET, False, False), parameters = Parameters([]), responses = [])
+    ])
+
+@pytest.mark.parametrize('name', ['teams', 'health'])
+def test_json_snapshot_json_roundtrip(tmp_path, name, data, raw, baseline):
+    json_to_snapshot(data(f'{name}.json'), str(tmp_path / f'{name}.dcsnap'))
+    snapshot_to_json(str(tmp_path / f'{name}.dcsnap'), str(tmp_path / f'{name}.json'))
+    assert Section.load_file(str(tmp_path / f'{name}.json')).obj == Section.load(raw(name)).obj
+    assert Section.load_file(str(tmp_path / f'{name}.dcsnap')).render_to_string() == baseline(name)
+
+def test_normalized_roundtrip(tmp_path, load):
+    section = load()
+    section.save(str(tmp_path / 'normalized.json'), normalized=True)
+    json_to_snapshot(str(tmp_path / 'normalized.json'), str(tmp_path / 'teams.dcsnap'))
+    snapshot_to_json(str(tmp_path / 'teams.dcsnap'), str(tmp_path / 'back.json'), normalized=True)
+    assert (tmp_path / 'back.json').read_bytes() == (tmp_path / 'normalized.json').read_bytes()
+    assert Section.load_file(str(tmp_path / 'back.json')).obj == section.obj
+
+def test_unusual_fields_roundtrip():
+    section = unusual()
+    loaded = loads(dumps(section))
+    assert loaded.obj == section.obj and loaded.digest == section.digest
+    assert loaded.render_to_string() == section.render_to_string()
+    assert loaded[0].responses[0] is loaded[0].responses[2]
+    assert loads(dumps(Section('Empty', []))).obj == {'title': 'Empty', 'subsections': []}
+
+def test_loaded_sections_track_changes(load):
+    section = loads(dumps(load()))
+    obj = section.obj
+    section[0].parameters['page'].required = True
+    assert section.obj != obj and section.obj['subsections'][0]['parameters']['parameters'][0]['required'] == True
+    assert section[('/teams', 'POST')] is section[1]
+
+@pytest.mark.parametrize('extension', ['.dcsnap', '.dcsnap.gz', '.dcsnap.xz'])
+def test_save_and_load_file(tmp_path, extension, load):
+    path = str(tmp_path / f'teams{extension}')
+    assert is_snapshot(path)
+    load().save(path)
+    assert Section.load_file(path).obj == load().obj
+    assert dumps(Section.load_file(path)) == dumps(load())
+
+def test_json_options_are_refused_for_snapshots(tmp_path, load):
+    path = str(tmp_path / 'teams.dcsnap.gz')
+    with pytest.raises(ValueError, match='normalized= only applies to JSON files'):
+        load().save(path, normalized=True)
+    load().save(path)
+    with pytest.raises(ValueError, match='lazy= only applies to JSON files'):
+        Section.load_file(path, lazy=True)
+
+def test_truncated_snapshots_are_refused(load):
+    snapshot = dumps(load())
+    for size in range(0, len(snapshot), 7):
+        with pytest.raises(SnapshotError):
+            loads(snapshot[:size])
+
+def test_foreign_and_newer_files_are_refused(load):
+    snapshot = dumps(load('health'))
+    with pytest.raises(SnapshotError, match='not a snapshot'):
+        loads(b'{"title": "Health", "subsections": []}')
+    with pytest.raises(SnapshotError, match='too short'):
+        loads(b'DCSNAP')
+    magic, version, *counts = HEADER.unpack_from(snapshot)
+    with pytest.raises(SnapshotError, match='format 2 is not supported'):
+        loads(HEADER.pack(magic, 2, *counts) + snapshot[HEADER.size:])
+
+def test_corrupt_codes_are_refused(load):
+    snapshot = bytearray(dumps(load('health')))
+    snapshot[-8:-4] = (1 << 31).to_bytes(4, 'little') # an index far past the table
+    with pytest.raises(SnapshotError, match='corrupt'):
+        loads(bytes(snapshot))
+
+def test_convert_command(tmp_path, data, load):
+    assert main(['convert', data('teams.json'), str(tmp_path / 'teams.dcsnap')]) == 0
+    assert main(['convert', str(tmp_path / 'teams.dcsnap'), str(tmp_path / 'teams.json')]) == 0
+    assert Section.load_file(str(tmp_path / 'teams.json')).obj == load().obj
+    assert main(['convert', data('teams.json'), str(tmp_path / 'normalized.dcsnap'), '--normalized']) == 1
+    assert not (tmp_path / 'normalized.dcsnap').exists()
@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from ..webserver.path import Section
+from ..webserver.path.openapi import import_openapi
+from ..webserver.path.stream import JSONStreamReader
+
+DOCUMENTS = [
+    '{"a": [1]}',
+    '{"a": {"b": 1}}',
+    '{"a": 12345, "b": [1.5e+10, -2, 0], "c": {"d": [true, null, "x"]}}',
+    ' {"a" : [ 1 , 22 ] , "b" : -3.25 } \n',
+    '{"title":"T","subsections":[],"version":2}',
+    '{"x-build": 7}',
+]
+
+def read(reader: JSONStreamReader):
+    # rebuilds a document through items() and elements(), down to the leaves
+    char = reader._peek()
+    if char == '{':
+        return {key: read(reader) for key in reader.items()}
+    if char == '[':
+        return [read(reader) for _ in reader.elements()]
+    return reader.value()
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 65536])
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_values_at_chunk_boundaries_and_the_end_of_file(text, chunk_size):
+    assert read(JSONStreamReader(io.StringIO(text), chunk_size)) == json.loads(text)
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 65536])
+@pytest.mark.parametrize('text', ['7', '-12', '1.5', '1e+5', '"a"', 'true'])
+def test_bare_values(text, chunk_size):
+    assert JSONStreamReader(io.StringIO(text), chunk_size).value() == json.loads(text)
+
+@pytest.mark.parametrize('chunk_size', [1, 4, 65536])
+def test_skip(chunk_size):
+    reader = JSONStreamReader(io.StringIO('{"a": {"b": [1, {"c": 2}]}, "d": [3], "e": 4}'), chunk_size)
+    values = {}
+    for key in reader.items():
+        if key == 'e':
+            values[key] = reader.value()
+        else:
+            reader.skip()
+    assert values == {'e': 4}
+
+@pytest.mark.parametrize('text', ['{"a": 1', '{"a": [1, 2', '{"a" 1}', '[1 2]'])
+def test_truncated_and_broken_documents(text):
+    with pytest.raises(ValueError):
+        read(JSONStreamReader(io.StringIO(text), 2))
+
+def test_iter_render_file_ending_in_a_number(tmp_path):
+    path = tmp_path / 'versioned.json'
+    path.write_text('{"title":"T","subsections":[],"version":2}')
+    assert ''.join(Section.iter_render_file(str(path))) == Section.load({'title': 'T', 'subsections': []}).render_to_string()
+
+def test_import_openapi_spec_ending_in_a_number(tmp_path):
+    spec = {
+        'openapi': '3.0.0',
+        'paths': {'/health': {'get': {'tags': ['Health'], 'responses': {'200': {'description': 'Up'}}}}},
+        'x-build': 7,
+    }
+    (tmp_path / 'spec.json').write_text(json.dumps(spec))
+    result = import_openapi(str(tmp_path / 'spec.json'), str(tmp_path / 'out'))
+    assert result.operations == 1
+    assert Section.load_file(result.sections['Health']).subsections[0].path.url == '/health'
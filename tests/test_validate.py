@@ -0,0 +1,105 @@
+import copy
+import json
+import shutil
+
+import pytest
+
+from ..__main__ import main
+from ..webserver.path import Section
+from ..webserver.path.validate import validate_file, validate_files, validate_obj
+
+def messages(obj, strict: bool = False) -> list[str]:
+    return [str(error) for error in validate_obj(obj, strict)]
+
+@pytest.mark.parametrize('name', ['teams', 'health'])
+def test_fixtures_and_their_objs_are_valid(name, load, raw):
+    section = load(name)
+    assert validate_obj(raw(name), strict=True) == []
+    assert validate_obj(section.obj, strict=True) == []
+    assert validate_obj(section.normalized_obj, strict=True) == []
+
+def test_every_problem_is_reported_with_its_path(raw):
+    obj = raw()
+    del obj['subsections'][0]['path']['url']
+    obj['subsections'][1]['path']['method'] = 'PUT'
+    obj['subsections'][1]['parameters']['parameters'][2]['required'] = 'yes'
+    obj['subsections'][2]['responses'][0]['status'] = 299
+    obj['subsections'][2]['responses'].append({'status': 'NOT_A_STATUS'})
+    assert messages(obj) == [
+        '$.subsections[0].path: missing key "url"',
+        '$.subsections[1].path.method: expected one of "GET", "POST", found "PUT"',
+        '$.subsections[1].parameters.parameters[2].required: expected a boolean, found a string',
+        '$.subsections[2].responses[0].status: 299 is not an HTTP status code',
+        '$.subsections[2].responses[1].status: "NOT_A_STATUS" is not the name of an HTTP status',
+    ]
+
+def test_types(raw):
+    assert messages([]) == ['$: expected an object, found an array']
+    assert messages({'title': 1, 'subsections': {}}) == [
+        '$.title: expected a string, found an integer',
+        '$.subsections: expected an array, found an object',
+    ]
+    obj = raw('health')
+    obj['subsections'][0]['path']['requireAuth'] = 1 # not a boolean, although 1 == True
+    assert messages(obj) == ['$.subsections[0].path.requireAuth: expected a boolean, found an integer']
+
+def test_what_load_accepts_is_valid(raw):
+    obj = raw('health')
+    subsection = obj['subsections'][0]
+    subsection['logic'] = {'steps': 'A single step.'}
+    subsection['parameters'] = None
+    subsection['responses'].append({'status': 'NOT_FOUND'})
+    del subsection['description']
+    assert validate_obj(obj) == []
+    Section.load(obj)
+
+def test_strict_reports_unknown_keys(raw):
+    obj = raw('health')
+    obj['version'] = 2
+    obj['subsections'][0]['path']['summary'] = 'Health'
+    assert validate_obj(obj) == []
+    assert messages(obj, strict=True) == ['$.subsections[0].path: unknown key "summary"', '$: unknown key "version"']
+
+def test_normalized_response_indexes(raw):
+    obj = copy.deepcopy(Section.load(raw()).normalized_obj)
+    obj['subsections'][0]['responses'][0] = len(obj['responses'])
+    assert messages(obj) == [f'$.subsections[0].responses[0]: response index {len(obj["responses"])} is out of range, the table has {len(obj["responses"])} responses']
+    del obj['responses']
+    assert 'needs a top level "responses" table' in messages(obj)[0]
+
+def test_files(tmp_path, raw):
+    (tmp_path / 'broken.json').write_text('{"title": ')
+    assert [str(error) for error in validate_file(str(tmp_path / 'broken.json'))][0].startswith('$: invalid JSON')
+    assert str(validate_file(str(tmp_path / 'missing.json'))[0]).startswith('$: could not be read')
+    (tmp_path / 'empty.jsonl').write_text('\n')
+    assert [str(error) for error in validate_file(str(tmp_path / 'empty.jsonl'))] == ['$: the file is empty']
+    health = raw('health')
+    with open(tmp_path / 'health.jsonl', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'title': health['title']}) + '\n')
+        f.write(json.dumps(health['subsections'][0]) + '\n')
+        f.write(json.dumps({'path': {}}) + '\n')
+    assert [str(error) for error in validate_file(str(tmp_path / 'health.jsonl'))][0] == '$.subsections[1].path: missing key "url"'
+
+def test_validate_files_keeps_the_order(tmp_path, raw):
+    paths = []
+    for index in range(4):
+        path = tmp_path / f'{index}.json'
+        path.write_text('{}' if index % 2 else json.dumps(raw('health')))
+        paths.append(str(path))
+    for jobs in (1, 2):
+        results = validate_files(paths, jobs=jobs)
+        assert [path for path, _ in results] == paths
+        assert [len(errors) for _, errors in results] == [0, 2, 0, 2]
+
+def test_validate_command_and_build_validate(tmp_path, capsys, data):
+    src = tmp_path / 'src'
+    src.mkdir()
+    shutil.copy(data('teams.json'), src / 'teams.json')
+    assert main(['validate', str(src), '-j', '1']) == 0
+    (src / 'bad.json').write_text('{"title": "Bad", "subsections": [{}]}')
+    assert main(['validate', str(src), '-j', '1']) == 1
+    captured = capsys.readouterr()
+    assert 'bad.json: $.subsections[0]: missing key "path"' in captured.err
+    assert '(1 invalid)' in captured.out
+    assert main(['build', str(src), str(tmp_path / 'out'), '--validate', '-j', '1', '--no-cache']) == 1
+    assert not (tmp_path / 'out').exists()
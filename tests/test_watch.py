@@ -0,0 +1,97 @@
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ..webserver.path import Section
+from ..webserver.path.watch import InotifyWatcher, PollingWatcher, PreviewServer, PreviewSite, _libc, watcher_for
+
+def rename(path, title: str):
+    section = Section.load_file(str(path))
+    section.title = title
+    section.save(str(path))
+
+def test_pages_are_rendered_when_first_asked_for(tmp_path, baseline, src):
+    site = PreviewSite(src)
+    assert site.paths == ['nested/health.md', 'teams.md']
+    assert site._pages == {}
+    page = site.page('teams.md')
+    assert page.ok and page.markdown == baseline('teams')
+    assert site.page('teams.md') is page
+    assert site.page('missing.md') == None
+
+def test_changed_sources_are_rendered_again(tmp_path, src):
+    site = PreviewSite(src, out=str(tmp_path / 'out'))
+    site.page('teams.md')
+    rename(src / 'teams.json', 'Renamed')
+    page = site.update(str(src / 'teams.json'))
+    assert site.page('teams.md') is page and '## Renamed' in page.markdown
+    assert (tmp_path / 'out' / 'teams.md').read_text(encoding='utf-8') == page.markdown
+    assert site.version == 1
+
+def test_added_removed_and_broken_sources(tmp_path, src):
+    site = PreviewSite(src)
+    os.unlink(src / 'teams.json')
+    (src / 'broken.json').write_text('{"title": ')
+    results = dict(site.refresh())
+    assert results[str(src / 'teams.json')] == None
+    assert not results[str(src / 'broken.json')].ok
+    assert site.paths == ['broken.md', 'nested/health.md']
+    assert site.page('teams.md') == None
+
+def test_wait_returns_once_the_site_changes(tmp_path, src):
+    site = PreviewSite(src)
+    assert site.wait(0, timeout=0.01) == 0
+    threading.Timer(0.05, site.update, args=(str(src / 'teams.json'),)).start()
+    assert site.wait(0, timeout=10) == 1
+
+@pytest.mark.parametrize('polling', [True, False], ids=['polling', 'inotify'])
+def test_watchers_see_added_changed_and_removed_sources(tmp_path, polling, data, src):
+    if not polling and _libc() == None:
+        pytest.skip('inotify is not available')
+    watcher = watcher_for(src, polling=polling, interval=0.01)
+    assert isinstance(watcher, PollingWatcher if polling else InotifyWatcher)
+    try:
+        assert watcher.changes(timeout=0.05) == set()
+        rename(src / 'teams.json', 'A longer title than before')
+        assert str(src / 'teams.json') in watcher.changes(timeout=5)
+        (src / 'nested' / 'deeper').mkdir()
+        shutil.copy(data('health.json'), src / 'nested' / 'deeper' / 'added.json')
+        changes = set()
+        while str(src / 'nested' / 'deeper' / 'added.json') not in changes:
+            new = watcher.changes(timeout=5)
+            assert new
+            changes |= new
+        os.unlink(src / 'nested' / 'health.json')
+        assert str(src / 'nested' / 'health.json') in watcher.changes(timeout=5)
+    finally:
+        watcher.close()
+
+def test_preview_server(tmp_path, baseline, src):
+    site = PreviewSite(src)
+    server = PreviewServer(('127.0.0.1', 0), site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(base + '/') as response:
+            assert 'href="/nested/health.md"' in response.read().decode('utf-8')
+        with urllib.request.urlopen(base + '/raw/nested/health.md') as response:
+            assert response.read().decode('utf-8') == baseline('health')
+        with urllib.request.urlopen(base + '/teams.md') as response:
+            assert '<pre>' in response.read().decode('utf-8')
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(base + '/missing.md')
+        assert error.value.code == 404
+        with urllib.request.urlopen(base + f'/_wait?version={site.version - 1}') as response:
+            assert response.read().decode('utf-8') == str(site.version)
+        for query in ('', '?version=', '?version=two', '?version=1.5'):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(base + '/_wait' + query)
+            assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,7 +1,27 @@
+from collections import OrderedDict
 from enum import Enum
+import functools
+import hashlib
 from http import HTTPStatus
 import json
 import re
+import sys
+import threading
+
+from .instrument import instrumentation
+
+def intern(value):
+    # loading a large doc set creates the same short strings (types, names,
+    # contexts) thousands of times, interning keeps a single copy of each
+    # anything that is not a string is returned unchanged
+    if type(value) == str:
+        return sys.intern(value)
+    return value
+
+def digest(value) -> str:
+    # a short hash of a JSON value that does not depend on key order
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
 
 class HTTPMethod(Enum):
     GET = 'GET'
@@ -18,17 +38,352 @@ class HTTPMethod(Enum):
     def load(cls, obj):
         return cls(obj)
 
-class HTTPPath:
+# every node below caches its obj and its digest until one of its fields
+# changes: setting a field (plain assignment or through a setter) and changing
+# one of its lists (see NodeList) drops the caches of the node and of every
+# node above it, which it finds through the links every node keeps to its
+# parents, so a warm obj or digest is returned straight away, and after a
+# change only the changed node and the nodes above it are built again
+# the cached objs are shared, so they are handed out read only (see ReadOnlyDict)
+#
+# the digest of a node is a merkle hash: a parent hashes the digests of its
+# children instead of their content, so two trees can be compared by only
+# descending into the children whose digests differ (see diff.py)
+#
+# freeze() turns a node and everything below it into its Frozen class, whose
+# fields and lists can't be changed any more, and evolve() makes a copy with
+# some fields changed that shares every other field (and its cached obj,
+# digest and render output) with the node it was made from
+# many variants of a frozen Section only take the memory of what differs:
+#     v2 = base.freeze().evolve_subsection(('/teams', 'GET'), description='Version 2.')
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError('the obj of a node is cached and read only, copy.deepcopy() gives a copy that can be changed')
+
+class ReadOnlyDict(dict):
+    # what obj hands out instead of a dict, json, == and everything else that
+    # reads a dict work as usual, copies (copy, deepcopy, pickle) are plain dicts
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+class ReadOnlyList(list):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+def _parents(node) -> tuple:
+    parents = node._parents
+    if parents == None:
+        return ()
+    if type(parents) == list:
+        return tuple(parents)
+    return (parents,)
+
+def _link(child, parent):
+    # frozen nodes never change, so they don't need to know their parents
+    if not isinstance(child, Node) or isinstance(child, Frozen):
+        return
+    parents = child._parents
+    if parents == None:
+        object.__setattr__(child, '_parents', parent)
+    elif type(parents) == list:
+        parents.append(parent)
+    else:
+        object.__setattr__(child, '_parents', [parents, parent]) # shared by several nodes
+
+def _unlink(child, parent):
+    if not isinstance(child, Node):
+        return
+    parents = child._parents
+    if parents is parent:
+        child._parents = None
+    elif type(parents) == list:
+        for position, other in enumerate(parents):
+            if other is parent:
+                del parents[position]
+                break
+        if len(parents) == 1:
+            child._parents = parents[0]
+
+class NodeList(list):
+    # the lists of a node (its parameters, steps, responses and subsections),
+    # every change to one is a change to the node that owns it
+    __slots__ = ('_owner',)
+
+    def __init__(self, owner, items = ()):
+        list.__init__(self, items)
+        self._owner = owner
+        for item in self:
+            if type(item) != str: # the steps of a logic have nothing to link
+                _link(item, owner)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def _detach(self):
+        # the owner took another list, changing this one no longer changes it
+        owner = self._owner
+        if owner != None:
+            for item in self:
+                _unlink(item, owner)
+            self._owner = None
+
+    def _changed(self, removed = (), added = ()):
+        owner = self._owner
+        if owner == None:
+            return
+        for item in removed:
+            _unlink(item, owner)
+        for item in added:
+            _link(item, owner)
+        owner._list_changed()
+
+    def __setitem__(self, index, value):
+        if type(index) == slice:
+            value = list(value)
+            removed, added = self[index], value
+        else:
+            removed, added = (self[index],), (value,)
+        list.__setitem__(self, index, value)
+        self._changed(removed, added)
+
+    def __delitem__(self, index):
+        removed = self[index] if type(index) == slice else (self[index],)
+        list.__delitem__(self, index)
+        self._changed(removed)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, count):
+        if count <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (count - 1))
+        return self
+
+    def append(self, item):
+        list.append(self, item)
+        owner = self._owner
+        if owner != None:
+            _link(item, owner)
+            owner._appended(item, len(self) - 1)
+
+    def extend(self, items):
+        for item in list(items):
+            self.append(item)
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self._changed(added=(item,))
+
+    def pop(self, index = -1):
+        item = list.pop(self, index)
+        self._changed((item,))
+        return item
+
+    def remove(self, item):
+        list.remove(self, item)
+        self._changed((item,))
+
+    def clear(self):
+        removed = list(self)
+        list.clear(self)
+        self._changed(removed)
+
+    def reverse(self):
+        list.reverse(self)
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._changed()
+
+# setting these is not a change to the node
+UNTRACKED = frozenset(('__class__', '_building', '_parents', '_obj', '_digest', '_index', '_rendered', '_pending', '_response_table'))
+
+class Node:
+    # the dirty tracking every model class shares, a subclass lists which of
+    # its attributes hold a child node, a list (kept as a NodeList) and the
+    # key its parent indexes it by, and sets INDEXED if it keeps an _index of
+    # its children (see Parameters.get and Section.get)
+    __slots__ = ('_building', '_obj', '_digest', '_parents')
+
+    CHILDREN = frozenset()
+    LISTS = frozenset()
+    KEYS = frozenset()
+    INDEXED = False
+
+    def __setattr__(self, name, value):
+        if self._building or name in UNTRACKED:
+            object.__setattr__(self, name, value)
+            return
+        if name in self.LISTS:
+            old = getattr(self, name, None)
+            if type(old) == NodeList:
+                old._detach()
+            if type(value) != tuple: # the lists of a frozen node are tuples
+                value = NodeList(self, value)
+        elif name in self.CHILDREN:
+            _unlink(getattr(self, name, None), self)
+            _link(value, self)
+        object.__setattr__(self, name, value)
+        self._changed()
+        if name in self.KEYS:
+            self._rekey()
+
+    def _changed(self):
+        # drops the caches of this node and of the nodes above it
+        # a node is only ever cached when all of its children are, so there is
+        # nothing left to drop above a node that has no caches
+        if self._obj == None and self._digest == None:
+            return
+        self._obj = None
+        self._digest = None
+        for parent in _parents(self):
+            parent._changed()
+
+    def _rekey(self):
+        # the key the nearest indexed node above this one finds it by changed
+        for parent in _parents(self):
+            if parent.INDEXED:
+                parent._index = None
+            else:
+                parent._rekey()
+
+    def _list_changed(self):
+        if self.INDEXED:
+            self._index = None
+        self._changed()
+
+    def _appended(self, item, position: int):
+        # an append keeps the index, the item only has to be added to it
+        if self.INDEXED and self._index != None:
+            self._index.setdefault(self._key(item), position)
+        self._changed()
+
+    # a node that is being built has no caches and no parents yet, so there is
+    # nothing to track: __init__ and __setstate__ start with _setup, which sets
+    # _building, fields are then set like in any slotted class, and _built
+    # links the lists and children once every field is set
+
+    def _setup(self):
+        set = object.__setattr__
+        set(self, '_building', True)
+        set(self, '_obj', None)
+        set(self, '_digest', None)
+        set(self, '_parents', None)
+        if self.INDEXED:
+            set(self, '_index', None)
+
+    def _built(self):
+        for name in self.LISTS:
+            value = getattr(self, name)
+            if type(value) != tuple and type(value) != NodeList:
+                object.__setattr__(self, name, NodeList(self, value))
+        for name in self.CHILDREN:
+            _link(getattr(self, name), self)
+        object.__setattr__(self, '_building', False)
+
+    def __getstate__(self):
+        return tuple([getattr(self, attribute) for name, attribute in self.FIELDS])
+
+    def __setstate__(self, state):
+        self._setup()
+        set = object.__setattr__
+        for (name, attribute), value in zip(self.FIELDS, state):
+            set(self, attribute, value)
+        self._built()
+
+class Frozen:
+    # the fields of a frozen node can't be changed, only its caches are still
+    # filled in as they are used
+    # a frozen class is its model class with this mixed in (see freeze), so a
+    # node is frozen in place without copying it
+    __slots__ = ()
+
+    CACHES = frozenset(('_parents', '_obj', '_digest', '_index', '_rendered'))
+
+    def _immutable(self):
+        return AttributeError(f'{self!r} is frozen, evolve() makes a changed copy of it')
+
+    def __setattr__(self, name, value):
+        if name not in Frozen.CACHES:
+            raise self._immutable()
+        object.__setattr__(self, name, value)
+
+    def __setitem__(self, key, value):
+        raise self._immutable()
+
+    def add(self, *args):
+        raise self._immutable()
+
+    def __setstate__(self, state):
+        # unpickled (and deep copied) as the model class, then frozen again
+        frozen = type(self)
+        object.__setattr__(self, '__class__', frozen.thawed)
+        self.__setstate__(state)
+        self.__class__ = frozen
+
+    @property
+    def frozen(self) -> bool:
+        return True
+
+    def freeze(self):
+        return self
+
+def _unshared(value):
+    # a frozen node can be shared by any number of variants, a node that can
+    # still change is copied, so changing the variant or the node it was made
+    # from never changes the other
+    if isinstance(value, Node) and not isinstance(value, Frozen):
+        return _evolve(value, {})
+    return value
+
+def _evolve(node, changes: dict):
+    # builds a node of the same model class from the fields of node and changes
+    # fields that are not changed are shared if they are frozen and copied if
+    # they are not (see _unshared), and the copy of a frozen node is frozen as well
+    arguments = {}
+    for name, attribute in node.FIELDS:
+        if name in changes:
+            arguments[name] = changes.pop(name)
+        else:
+            value = getattr(node, attribute)
+            arguments[name] = [_unshared(item) for item in value] if isinstance(value, (list, tuple)) else _unshared(value)
+    if changes:
+        raise TypeError(f'{type(node).__name__} has no field {next(iter(changes))!r}')
+    if isinstance(node, Frozen):
+        return type(node).thawed(**arguments).freeze()
+    return type(node)(**arguments)
+
+class HTTPPath(Node):
+    __slots__ = ('url', '_method', 'requireAuth', 'requireMasterAuth')
+
     url: str
     _method: HTTPMethod
     requireAuth: bool
     requireMasterAuth: bool
+    _obj: dict
+    _digest: str
+
+    KEYS = frozenset(('url', '_method'))
 
     def __init__(self, url: 'the url of the path', method: HTTPMethod = HTTPMethod.GET, requireAuth: bool = False, requireMasterAuth: bool = False):
+        self._setup()
         self.url = url
         self.method = method
         self.requireAuth = requireAuth
         self.requireMasterAuth = requireMasterAuth
+        self._built()
     
     @property
     def method(self):
@@ -50,32 +405,66 @@ class HTTPPath:
     
     @property
     def obj(self) -> dict:
-        return {
+        if self._obj != None:
+            return self._obj
+        self._obj = ReadOnlyDict({
             'url': self.url,
             'method': self.method.obj,
             'requireAuth': self.requireAuth,
             'requireMasterAuth': self.requireMasterAuth
-        }
+        })
+        return self._obj
+
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest(self.obj)
+        return self._digest
     
     @classmethod
     def load(cls, obj):
         requireAuth = obj['requireAuth']
         requireMasterAuth = obj['requireMasterAuth']
-        return cls(obj['url'], HTTPMethod.load(obj['method']), requireAuth, requireMasterAuth)
+        return cls(intern(obj['url']), HTTPMethod.load(obj['method']), requireAuth, requireMasterAuth)
+
+    FIELDS = (('url', 'url'), ('method', '_method'), ('requireAuth', 'requireAuth'), ('requireMasterAuth', 'requireMasterAuth'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        self.__class__ = FrozenHTTPPath
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+class FrozenHTTPPath(Frozen, HTTPPath):
+    __slots__ = ()
+    thawed = HTTPPath
+
+class Parameter(Node):
+    __slots__ = ('name', 'value_type', 'required', '_default', 'description')
 
-class Parameter:
     name: str
     value_type: str
     required: bool
     _default: str
     description: str
+    _obj: dict
+    _digest: str
+
+    KEYS = frozenset(('name',))
 
     def __init__(self, name: 'the key of the parameter' = '', value_type: 'the type of the parameter in the target language' = 'null', required: bool = False, default: str = None, description = None):
+        self._setup()
         self.name = name
         self.value_type = value_type
         self.required = required
         self._default = default
         self.description = description
+        self._built()
     
     @property
     def default(self):
@@ -101,6 +490,8 @@ class Parameter:
     
     @property
     def obj(self) -> dict:
+        if self._obj != None:
+            return self._obj
         obj = {
             'name': self.name,
             'value_type': self.value_type,
@@ -112,17 +503,41 @@ class Parameter:
         
         if self.description != None:
             obj['description'] = self.description
-        return obj
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+    
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest(self.obj)
+        return self._digest
     
     @classmethod
     def load(cls, obj):
-        name = obj['name']
-        value_type = obj['value_type']
+        name = intern(obj['name'])
+        value_type = intern(obj['value_type'])
         required = obj['required']
-        default = obj.get('default', None)
-        description = obj.get('description', None)
+        default = intern(obj.get('default', None))
+        description = intern(obj.get('description', None))
         return cls(name, value_type, required, default, description)
 
+    FIELDS = (('name', 'name'), ('value_type', 'value_type'), ('required', 'required'), ('default', '_default'), ('description', 'description'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        self.__class__ = FrozenParameter
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+class FrozenParameter(Frozen, Parameter):
+    __slots__ = ()
+    thawed = Parameter
+
 class CustomIterator:
 
     def __init__(self, reference):
@@ -135,13 +550,23 @@ class CustomIterator:
         self._index += 1
         return result
 
-class Parameters:
+class Parameters(Node):
+    __slots__ = ('_parameters', 'notes', '_index')
+
     _parameters: list[Parameter]
     notes: str
+    _index: dict[str, int]
+    _obj: dict
+    _digest: str
 
-    def __init__(self, parameters: list[Parameter] = [], notes: str = None):
-        self.parameters = parameters
+    LISTS = frozenset(('_parameters',))
+    INDEXED = True
+
+    def __init__(self, parameters: list[Parameter] = None, notes: str = None):
+        self._setup()
+        self.parameters = parameters if parameters != None else []
         self.notes = notes
+        self._built()
     
     @property
     def parameters(self):
@@ -149,35 +574,68 @@ class Parameters:
     
     @parameters.setter
     def parameters(self, value):
-        if type(value) != list:
-            self._parameters = [value]
-        else:
-            self._parameters = value
-    
+        if not isinstance(value, list):
+            value = [value]
+        self._parameters = value
+        self._index = None
+    
+    @staticmethod
+    def _key(parameter):
+        return parameter.name
+
+    def _build_index(self) -> dict:
+        # name -> position of the first parameter with that name
+        index = {}
+        for position, parameter in enumerate(self._parameters):
+            index.setdefault(parameter.name, position)
+        self._index = index
+        return index
+
+    def reindex(self):
+        # the index follows every change by itself, this only builds it up front
+        self._build_index()
+
+    def get(self, name, default = None):
+        index = self._index
+        if index == None:
+            index = self._build_index()
+        position = index.get(name)
+        if position == None:
+            return default
+        return self._parameters[position]
+
+    def get_many(self, names) -> list[Parameter]:
+        # the parameter for each name, or None if there is no parameter with that name
+        return [self.get(name) for name in names]
+
     def __getitem__(self, key):
+        if type(key) == str:
+            parameter = self.get(key)
+            if parameter == None: raise KeyError(key)
+            return parameter
         if type(key) != int: raise TypeError
         return self.parameters[key]
     
     def __setitem__(self, key, value):
         if type(key) != int: raise TypeError
-        if type(value) != Parameter: raise TypeError
+        if not isinstance(value, Parameter): raise TypeError
         self.parameters[key] = value
     
     def __repr__(self) -> str:
         # <Parameters: [<Parameter: test>]>
         # <Parameters: [<Parameter: test>, notes: "Test"]>
         if self.notes == None:
-            return f'<Parameters: {repr(self.parameters)}>'
+            return f'<Parameters: {repr(list(self.parameters))}>'
         else:
-            return f'<Parameters: {repr(self.parameters)[:-1]}, notes: "{self.notes}"]>'
+            return f'<Parameters: {repr(list(self.parameters))[:-1]}, notes: "{self.notes}"]>'
     
     def __str__(self) -> str:
         # [<Parameter: test>]
         # [<Parameter: test>, notes: "Test"]
         if self.notes == None:
-            return repr(self.parameters)
+            return repr(list(self.parameters))
         else:
-            return f'{repr(self.parameters)[:-1]}, notes: "{self.notes}"]'
+            return f'{repr(list(self.parameters))[:-1]}, notes: "{self.notes}"]'
     
     def __iter__(self):
         return CustomIterator(self)
@@ -191,15 +649,21 @@ class Parameters:
     
     @property
     def obj(self) -> dict:
-        parameters = []
-        for parameter in self.parameters:
-            parameters.append(parameter.obj)
+        if self._obj != None:
+            return self._obj
         obj = {
-            'parameters': parameters
+            'parameters': ReadOnlyList([parameter.obj for parameter in self._parameters])
         }
         if self.notes != None:
             obj['notes'] = self.notes
-        return obj
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+    
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest([self.notes, [parameter.digest for parameter in self._parameters]])
+        return self._digest
     
     @classmethod
     def load(cls, obj):
@@ -212,6 +676,32 @@ class Parameters:
 
         return Parameters(loaded_parameters, notes)
 
+    FIELDS = (('parameters', '_parameters'), ('notes', 'notes'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        for parameter in self._parameters:
+            parameter.freeze()
+        self._parameters = tuple(self._parameters)
+        self.__class__ = FrozenParameters
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+    def evolve_parameter(self, name, **changes):
+        # a copy with the parameter called name evolved
+        parameter = self[name]
+        parameters = [parameter.evolve(**changes) if other is parameter else _unshared(other) for other in self._parameters]
+        return self.evolve(parameters=parameters)
+
+class FrozenParameters(Frozen, Parameters):
+    __slots__ = ()
+    thawed = Parameters
+
 class CriteriaType(Enum):
     VALIDATION = 'validation'
 
@@ -227,12 +717,14 @@ class CriteriaType(Enum):
         return cls(obj)
 
 class CriteriaList:
+    __slots__ = ('_criteria_type', 'criteria')
+
     _criteria_type: CriteriaType
     criteria: list[str]
 
-    def __init__(self, criteria: list[str] = [], criteria_type: CriteriaType = CriteriaType.VALIDATION):
+    def __init__(self, criteria: list[str] = None, criteria_type: CriteriaType = CriteriaType.VALIDATION):
         self.criteria = []
-        for c in criteria:
+        for c in criteria if criteria != None else []:
             self.add_criteria(c)
 
         self.criteria_type = criteria_type
@@ -267,32 +759,149 @@ class CriteriaList:
     def __iter__(self):
         return CustomIterator(self)
 
-class CriteriaPreset:
-    def team_name(param_name = 'name'):
+    def __getstate__(self):
+        return (self.criteria, self._criteria_type)
+
+    def __setstate__(self, state):
+        self.criteria, self._criteria_type = state
+
+class Criterion:
+    # one validation criterion of a parameter in a form that can be checked,
+    # str() gives the sentence that is documented for it
+    # kind is one of KINDS, value is the length for the length kinds, the
+    # regular expression for 'pattern' and None for 'integer'
+    # text replaces the generated sentence where a preset words it differently
+    __slots__ = ('kind', 'name', 'value', 'text')
+
+    KINDS = ('min_length', 'max_length', 'length', 'pattern', 'integer')
+
+    kind: str
+    name: str
+    value: object
+    text: str
+
+    def __init__(self, kind: str, name: str, value = None, text: str = None):
+        if kind not in Criterion.KINDS:
+            raise ValueError(f'{kind!r} is not a criterion kind, expected one of {", ".join(Criterion.KINDS)}')
+        self.kind = kind
+        self.name = name
+        self.value = value
+        self.text = text
+
+    def __repr__(self) -> str:
+        # <Criterion: max_length 40 of "name">
+        value = f' {self.value}' if self.value != None else ''
+        return f'<Criterion: {self.kind}{value} of "{self.name}">'
+
+    def __str__(self) -> str:
+        # `name` must be at most 40 characters
+        if self.text != None:
+            return self.text
+        if self.kind == 'min_length':
+            return f'`{self.name}` must be at least {self.value} character' + ('s' if self.value != 1 else '')
+        elif self.kind == 'max_length':
+            return f'`{self.name}` must be at most {self.value} characters'
+        elif self.kind == 'length':
+            return f'`{self.name}` must be exactly {self.value} characters'
+        elif self.kind == 'pattern':
+            return f'`{self.name}` must follow pattern `{self.value}`'
+        return f'`{self.name}` must be an integer'
+
+    def __eq__(self, other):
+        if type(other) != Criterion:
+            return NotImplemented
+        return (self.kind, self.name, self.value, self.text) == (other.kind, other.name, other.value, other.text)
+
+    def __hash__(self):
+        return hash((self.kind, self.name, self.value, self.text))
+
+    def __getstate__(self):
+        return (self.kind, self.name, self.value, self.text)
+
+    def __setstate__(self, state):
+        self.kind, self.name, self.value, self.text = state
+
+    # the sentences str() writes (and the ones the presets used to write), so
+    # criteria that were only documented as text can be checked too
+    SENTENCES = (
+        (re.compile(r'^`(?P<name>[^`]+)` must be at least (?P<value>\d+|one) characters?$'), 'min_length'),
+        (re.compile(r'^`(?P<name>[^`]+)` must be at most (?P<value>\d+|one) characters?$'), 'max_length'),
+        (re.compile(r'^`(?P<name>[^`]+)` must be exactly (?P<value>\d+|one) characters?$'), 'length'),
+        (re.compile(r'^`(?P<name>[^`]+)` must follow pattern `(?P<value>.+)`$'), 'pattern'),
+        (re.compile(r'^`(?P<name>[^`]+)` must be an integer$'), 'integer')
+    )
+
+    @classmethod
+    def parse(cls, text: str):
+        # the Criterion of a documented sentence, or None if it isn't one of SENTENCES
+        text = str(text).strip()
+        for sentence, kind in Criterion.SENTENCES:
+            match = sentence.match(text)
+            if match == None:
+                continue
+            value = match.groupdict().get('value')
+            if kind != 'pattern' and value != None:
+                value = 1 if value == 'one' else int(value)
+            return cls(kind, match['name'], value, text)
+        return None
+
+    @property
+    def obj(self) -> dict:
+        obj = {
+            'kind': self.kind,
+            'name': self.name
+        }
+        if self.value != None:
+            obj['value'] = self.value
+        if self.text != None:
+            obj['text'] = self.text
+        return obj
+
+    @classmethod
+    def load(cls, obj):
+        return cls(obj['kind'], obj['name'], obj.get('value'), obj.get('text'))
+
+class CriterionPreset:
+    # the criteria of CriteriaPreset as Criterion objects, which can be checked
+    def team_name(param_name = 'name') -> list[Criterion]:
         return [
-            f'`{param_name}` must be at least 1 character',
-            f'`{param_name}` must be at most 40 characters',
-            f'`{param_name}` must follow pattern `^[A-Za-z0-9 \-_\(\):]+$`'
+            Criterion('min_length', param_name, 1),
+            Criterion('max_length', param_name, 40),
+            Criterion('pattern', param_name, r'^[A-Za-z0-9 \-_\(\):]+$')
         ]
-    def team_id(param_name = 'id'):
+    def team_id(param_name = 'id') -> list[Criterion]:
         return [
-            f'`{param_name}` must be exactly 3 characters',
-            f'`{param_name}` must follow pattern `^[0-9]*$`'
+            Criterion('length', param_name, 3),
+            Criterion('pattern', param_name, '^[0-9]*$')
         ]
-    def team_score(param_name = 'score'):
+    def team_score(param_name = 'score') -> list[Criterion]:
         return [
-            f'`{param_name}` must be at least one character',
-            f'`{param_name}` must be at most 30 characters',
-            f'`{param_name}` must follow pattern `^\-?[0-9]+$`',
-            f'`{param_name}` must be an integer'
+            Criterion('min_length', param_name, 1, f'`{param_name}` must be at least one character'),
+            Criterion('max_length', param_name, 30),
+            Criterion('pattern', param_name, r'^\-?[0-9]+$'),
+            Criterion('integer', param_name)
         ]
 
-class Response:
+class CriteriaPreset:
+    # the documented sentences of the CriterionPreset criteria
+    def team_name(param_name = 'name') -> list[str]:
+        return [str(c) for c in CriterionPreset.team_name(param_name)]
+    def team_id(param_name = 'id') -> list[str]:
+        return [str(c) for c in CriterionPreset.team_id(param_name)]
+    def team_score(param_name = 'score') -> list[str]:
+        return [str(c) for c in CriterionPreset.team_score(param_name)]
+
+class Response(Node):
+    __slots__ = ('_status', 'content', 'context')
+
     _status: HTTPStatus
     content: str
     context: str
+    _obj: dict
+    _digest: str
 
     def __init__(self, status = HTTPStatus.OK, content = None, context = None):
+        self._setup()
         self.status = status
 
         if type(content) == dict:
@@ -301,6 +910,7 @@ class Response:
             self.content = content
 
         self.context = context
+        self._built()
     
     @property
     def status(self):
@@ -333,6 +943,8 @@ class Response:
     
     @property
     def obj(self) -> dict:
+        if self._obj != None:
+            return self._obj
         obj = {
             'status': self.status_code
         }
@@ -340,22 +952,65 @@ class Response:
             obj['content'] = self.content
         if self.context != None:
             obj['context'] = self.context
-        return obj
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+    
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest(self.obj)
+        return self._digest
     
     @classmethod
     def load(cls, obj):
         status = obj['status']
-        content = obj.get('content', None)
-        context = obj.get('context', None)
+        content = intern(obj.get('content', None))
+        context = intern(obj.get('context', None))
         return Response(status, content, context)
 
-class Logic:
+    def copy(self):
+        return Response(self._status, self.content, self.context)
+
+    FIELDS = (('status', '_status'), ('content', 'content'), ('context', 'context'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        self.__class__ = SharedResponse
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+class SharedResponse(Frozen, Response):
+    # a frozen Response, the preset Responses below are handed out to any
+    # number of subsections, copy() gives a Response that can be changed
+    __slots__ = ()
+    thawed = Response
+
+    def __new__(cls, status = HTTPStatus.OK, content = None, context = None):
+        return Response(status, content, context).freeze()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+class Logic(Node):
+    __slots__ = ('_steps', 'notes')
+
     _steps: list[str]
     notes: str
+    _obj: dict
+    _digest: str
+
+    LISTS = frozenset(('_steps',))
 
-    def __init__(self, steps = [], notes = None):
-        self.steps = steps
+    def __init__(self, steps = None, notes = None):
+        self._setup()
+        self.steps = steps if steps != None else []
         self.notes = notes
+        self._built()
     
     @property
     def steps(self):
@@ -388,33 +1043,77 @@ class Logic:
     
     @property
     def obj(self):
+        if self._obj != None:
+            return self._obj
         obj = {
-            'steps': self.steps
+            'steps': ReadOnlyList(self._steps)
         }
         if self.notes != None:
             obj['notes'] = self.notes
-        return obj
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+    
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest(self.obj)
+        return self._digest
     
     @classmethod
     def load(cls, obj):
         steps = obj['steps']
+        if type(steps) == list:
+            steps = [intern(step) for step in steps]
         notes = obj.get('notes', None)
         return cls(steps, notes)
 
-class Subsection:
+    FIELDS = (('steps', '_steps'), ('notes', 'notes'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        self._steps = tuple(self._steps)
+        self.__class__ = FrozenLogic
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+class FrozenLogic(Frozen, Logic):
+    __slots__ = ()
+    thawed = Logic
+
+class Subsection(Node):
+    __slots__ = ('path', 'parameters', 'logic', 'responses', '_description', '_rendered')
+
     path: HTTPPath
     parameters: Parameters
     logic: Logic
     responses: list[Response]
     _description: str
+    _obj: dict
+    _digest: str
+    _rendered: tuple
 
-    def __init__(self, path: HTTPPath = HTTPPath(''), parameters: Parameters = None, logic: Logic = None, responses: list[Response] = [], description: str = None):
-        self.path = path
+    CHILDREN = frozenset(('path', 'parameters', 'logic'))
+    LISTS = frozenset(('responses',))
+    KEYS = frozenset(('path',))
+
+    def __init__(self, path: HTTPPath = None, parameters: Parameters = None, logic: Logic = None, responses: list[Response] = None, description: str = None):
+        self._setup()
+        self.path = path if path != None else HTTPPath('')
         self.parameters = parameters
         self.logic = logic
-        self.responses = responses
+        self.responses = responses if responses != None else []
         self.description = description
+        self._built()
     
+    def _setup(self):
+        Node._setup(self)
+        object.__setattr__(self, '_rendered', None) # (engine, multiple, markdown) once frozen, see RenderEngine.render_subsection
+
     @property
     def description(self):
         return self._description
@@ -422,15 +1121,18 @@ class Subsection:
     @description.setter
     def description(self, value):
         if type(value) == str:
-            description = re.sub(r"^\n*", '', value) # remove any newlines at the start of the description
-            description = re.sub(r"\n*$", '', description) # remove any newlines at the end of the description
-            description = re.sub(r"(?<!\n)\n(?!\n)", ' ', description) # remove lone \n
+            with instrumentation.stage('description'):
+                description = re.sub(r"^\n*", '', value) # remove any newlines at the start of the description
+                description = re.sub(r"\n*$", '', description) # remove any newlines at the end of the description
+                description = re.sub(r"(?<!\n)\n(?!\n)", ' ', description) # remove lone \n
             self._description = description
         else:
             self._description = value
 
     @property
     def obj(self):
+        if self._obj != None:
+            return self._obj
         obj = {
             'path': self.path.obj
         }
@@ -440,14 +1142,23 @@ class Subsection:
             obj['logic'] = self.logic.obj
         if self.description != None:
             obj['description'] = self.description
-        responses = []
-        for response in self.responses:
-            responses.append(response.obj)
-        obj['responses'] = responses
-        return obj
+        obj['responses'] = ReadOnlyList([response.obj for response in self.responses])
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+    
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            parameters = self.parameters.digest if self.parameters != None else None
+            logic = self.logic.digest if self.logic != None else None
+            responses = [response.digest for response in self.responses]
+            self._digest = digest([self.path.digest, parameters, logic, self.description, responses])
+        return self._digest
     
     @classmethod
-    def load(cls, obj):
+    def load(cls, obj, response_table: list[Response] = None):
+        # with a response_table, responses may also be indexes into that table
+        # (see Section.normalized_obj), which share the Response from the table
         path = HTTPPath.load(obj['path'])
         parameters = obj.get('parameters', None)
         if parameters != None:
@@ -455,167 +1166,457 @@ class Subsection:
         logic = obj.get('logic', None)
         if logic != None:
             logic = Logic.load(logic)
-        responses = obj.get('responses', None)
+        responses = obj.get('responses', [])
         calculated_responses = []
         for response in responses:
-            calculated_responses.append(Response.load(response))
+            if type(response) == int:
+                calculated_responses.append(response_table[response])
+            else:
+                calculated_responses.append(Response.load(response))
         responses = calculated_responses
         description = obj.get('description', None)
+        if instrumentation.enabled:
+            instrumentation.count('subsections')
+            instrumentation.count('parameters', len(parameters) if parameters != None else 0)
+            instrumentation.count('responses', len(responses))
         return cls(path, parameters, logic, responses, description)
 
-class Section:
+    FIELDS = (('path', 'path'), ('parameters', 'parameters'), ('logic', 'logic'), ('responses', 'responses'), ('description', '_description'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        self.path.freeze()
+        if self.parameters != None:
+            self.parameters.freeze()
+        if self.logic != None:
+            self.logic.freeze()
+        for response in self.responses:
+            response.freeze()
+        self.responses = tuple(self.responses)
+        self.__class__ = FrozenSubsection
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+class FrozenSubsection(Frozen, Subsection):
+    __slots__ = ()
+    thawed = Subsection
+
+class Section(Node):
+    __slots__ = ('title', '_subsections', '_pending', '_response_table', '_index')
+
     title: str
     _subsections: list[Subsection]
+    _pending: int
+    _response_table: list[Response]
+    _index: dict[tuple, int]
+    _obj: dict
+    _digest: str
+
+    LISTS = frozenset(('_subsections',))
+    INDEXED = True
 
-    def __init__(self, title: str = 'Untitled', subsections = []):
+    def __init__(self, title: str = 'Untitled', subsections = None):
+        self._setup()
         self.title = title
-        self.subsections = subsections
+        self.subsections = subsections if subsections != None else []
+        self._built()
     
     @property
     def subsections(self):
+        if self._pending:
+            for position in range(len(self._subsections)):
+                self._materialize(position)
         return self._subsections
     
     @subsections.setter
     def subsections(self, value):
-        if type(value) != list:
-            self._subsections = [value]
-        else:
-            self._subsections = value
+        if not isinstance(value, (list, tuple)): # the subsections of a frozen section are a tuple
+            value = [value]
+        self._subsections = value
+        self._pending = 0
+        self._response_table = None
+        self._index = None
+
+    # a lazily loaded section (see load) keeps the obj of every subsection that
+    # has not been used yet in _subsections, and only builds the Subsection when
+    # it is first accessed, _pending counts how many are still left
+
+    def _materialize(self, position) -> Subsection:
+        subsection = self._subsections[position]
+        if isinstance(subsection, dict):
+            # the same subsection in another form, so nothing cached changes
+            subsection = Subsection.load(subsection, self._response_table)
+            list.__setitem__(self._subsections, position, subsection)
+            _link(subsection, self)
+            self._pending -= 1
+        return subsection
+
+    @staticmethod
+    def _path_key(subsection) -> tuple:
+        if isinstance(subsection, dict):
+            path = subsection['path']
+            return (path['url'], HTTPMethod.load(path['method']))
+        return (subsection.path.url, subsection.path.method)
+
+    @property
+    def paths(self) -> list[tuple]:
+        # (url, method) of every subsection, without building any lazily loaded ones
+        return [self._path_key(subsection) for subsection in self._subsections]
+
+    @property
+    def unique_paths(self) -> bool:
+        # False if two subsections document the same (url, method), found
+        # through the index, which follows every change by itself
+        index = self._index
+        if index == None:
+            index = self._build_index()
+        return len(index) == len(self._subsections)
+
+    @property
+    def loaded(self) -> bool:
+        # False while a lazily loaded section still has subsections that were never built
+        return self._pending == 0
     
+    _key = _path_key
+
+    def _build_index(self) -> dict:
+        # (url, method) -> position of the first subsection with that path
+        index = {}
+        for position, subsection in enumerate(self._subsections):
+            index.setdefault(self._path_key(subsection), position)
+        self._index = index
+        return index
+
+    def reindex(self):
+        # the index follows every change by itself, this only builds it up front
+        self._build_index()
+
+    def get(self, key, default = None):
+        # key is (url, method), method can be an HTTPMethod or its name
+        url, method = key
+        if type(method) != HTTPMethod:
+            method = HTTPMethod(method)
+        index = self._index
+        if index == None:
+            index = self._build_index()
+        position = index.get((url, method))
+        if position == None:
+            return default
+        return self._materialize(position)
+
+    def get_many(self, keys) -> list[Subsection]:
+        # the subsection for each (url, method), or None if the section does not have that path
+        return [self.get(key) for key in keys]
+
     def __getitem__(self, index):
+        # section[0] or section[('/teams', 'POST')]
+        if type(index) == tuple:
+            subsection = self.get(index)
+            if subsection == None: raise KeyError(index)
+            return subsection
         if type(index) != int: raise TypeError
-        return self.subsections[index]
+        return self._materialize(index)
     
     def __setitem__(self, index, value):
         if type(index) != int: raise TypeError
-        self.subsections[index] = value
+        if isinstance(self._subsections[index], dict):
+            self._pending -= 1
+        self._subsections[index] = value
     
     def __len__(self):
-        return len(self.subsections)
+        return len(self._subsections)
     
     def __iter__(self):
         return CustomIterator(self)
     
     @property
     def obj(self):
+        if self._obj != None:
+            return self._obj
         obj = {
             'title': self.title
         }
-        subsections = []
-        for subsection in self.subsections:
-            subsections.append(subsection.obj)
-        obj['subsections'] = subsections
-        return obj
+        obj['subsections'] = ReadOnlyList([subsection.obj for subsection in self.subsections])
+        self._obj = ReadOnlyDict(obj)
+        return self._obj
+
+    @property
+    def digest(self) -> str:
+        if self._digest == None:
+            self._digest = digest([self.title, [subsection.digest for subsection in self.subsections]])
+        return self._digest
     
+    @property
+    def normalized_obj(self):
+        # same as obj, but every distinct response is stored once in a top level
+        # 'responses' table and subsections list indexes into that table
+        # {
+        #     'title': 'Teams',
+        #     'responses': [{'status': 400, ...}, {'status': 200, ...}],
+        #     'subsections': [{'path': {...}, 'responses': [0, 1]}, ...]
+        # }
+        table = []
+        indexes = {}
+        subsections = []
+        for subsection in self.obj['subsections']:
+            references = []
+            for response in subsection['responses']:
+                try:
+                    key = (response['status'], response.get('content', None), response.get('context', None))
+                    hash(key)
+                except TypeError: # content or context that is not a plain value
+                    key = json.dumps(response, sort_keys=True)
+                index = indexes.get(key)
+                if index == None:
+                    index = len(table)
+                    indexes[key] = index
+                    table.append(response)
+                references.append(index)
+            subsection = dict(subsection)
+            subsection['responses'] = references
+            subsections.append(subsection)
+        return {
+            'title': self.title,
+            'responses': table,
+            'subsections': subsections
+        }
+
     @classmethod
-    def load(cls, obj):
+    def load(cls, obj, lazy: bool = False):
+        # reads both obj and normalized_obj
+        # a lazy load only builds a Subsection when it is first used, the title,
+        # len() and paths are available straight away
         title = obj['title']
+        response_table = obj.get('responses', None)
+        if response_table != None:
+            response_table = [Response.load(response) for response in response_table]
         subsections = obj['subsections']
+        if lazy:
+            section = cls(title, list(subsections))
+            section._pending = len(subsections)
+            section._response_table = response_table
+            return section
         calculated_subsections = []
-        for subsection in subsections:
-            calculated_subsections.append(Subsection.load(subsection))
+        with instrumentation.stage('load'):
+            for subsection in subsections:
+                with instrumentation.stage('load.subsection'):
+                    calculated_subsections.append(Subsection.load(subsection, response_table))
         subsections = calculated_subsections
+        if instrumentation.enabled:
+            instrumentation.count('sections')
         return cls(title, subsections)
     
-    def save(self, path):
-        with open(path, 'w+') as f:
-            f.write(json.dumps(self.obj))
+    def save(self, path, normalized: bool = False):
+        # normalized files store every distinct response once, see normalized_obj
+        # paths ending in .gz, .xz, .lzma or .bz2 are compressed, and paths
+        # ending in .dcsnap are a binary snapshot (see snapshot.py), which has
+        # no normalized layout
+        # the JSON is written one subsection at a time to a temporary file that
+        # only replaces path once it is complete
+        if is_snapshot(path):
+            refuse_json_options(path, normalized=normalized)
+            save_snapshot(self, path)
+            return
+        with instrumentation.stage('save.serialize'):
+            obj = self.normalized_obj if normalized else self.obj
+        with instrumentation.stage('save.write'):
+            with atomic_write(path, sync=True) as f:
+                for chunk in iter_encode(obj):
+                    f.write(chunk)
     
     @classmethod
-    def load_file(cls, path):
-        with open(path, 'r') as f:
-            data = json.loads(f.read())
-            return cls.load(data)
-    
+    def load_file(cls, path, lazy: bool = False):
+        if is_snapshot(path):
+            refuse_json_options(path, lazy=lazy)
+            return load_snapshot(path)
+        with open_text(path) as f:
+            with instrumentation.stage('load_file.read'):
+                content = f.read()
+        with instrumentation.stage('load_file.parse'):
+            data = json.loads(content)
+        del content # free the text before the objects are built
+        return cls.load(data, lazy)
+    
+    def iter_render(self):
+        return engine.iter_render(self)
+
+    @classmethod
+    def iter_render_file(cls, path):
+        # streams the rendered markdown of a JSON or JSONL section file
+        # without building the whole Section in memory
+        return engine.iter_render_source(path)
+
+    def render_to_string(self) -> str:
+        return engine.render_to_string(self)
+
+    def render_into(self, buffer):
+        engine.render_into(self, buffer)
+
     def render(self, path):
-        with open(path, 'w+', encoding='utf-8') as f:
-            f.write(f"## {self.title}\n")
-            f.write("\n")
-            f.write("| Title | Path | Method | Requires Authentication | Requires Master Authentication |\n")
-            f.write("|---|---|---|---|---|\n")
-            for s in self: # s = subsection
-                requireAuthSymbol = "✅" if s.path.requireAuth else "❌"
-                requireMasterAuthSymbol = "✅" if s.path.requireMasterAuth else "❌"
-                f.write(f"| [{self.title}]() | `{s.path.url}` | [{s.path.method}]() | {requireAuthSymbol} | {requireMasterAuthSymbol} |\n")
-            f.write('\n')
-
-            for s in self: # s = subsection
-                if len(self) > 1:
-                    f.write(f'### {s.path.method}\n')
-                    f.write('\n')
-                
-                f.write('#### Description\n')
-                f.write('\n')
-                if s.description != None:
-                    f.write(s.description)
-                else:
-                    f.write('Description for the subsection goes here.')
-                f.write('\n')
-
-                if s.parameters != None and s.path.method == HTTPMethod.GET: # if parameters are set and method is GET
-                    f.write('#### Query Parameters\n')
-                    f.write('| Name | Value Type | Required | Default Value | Description |\n')
-                    f.write('|---|---|---|---|---|\n')
-                
-                if s.parameters != None and s.path.method == HTTPMethod.POST: # if parameters are set and method is POST
-                    f.write('#### Request Parameters\n')
-                    f.write('This path only accepts JSON data. When sending a request, the `Content-Type` header must be set to `application/json`, and the request body must be a JSON string that contains all the parameters listed below.\n')
-                    f.write('\n')
-                    f.write('| Name | Value Type | Required | Default Value | Description |\n')
-                    f.write('|---|---|---|---|---|\n')
-                
-                if s.parameters != None:
-                    for param in s.parameters:
-                        required = "✅" if param.required else "❌"
-                        default = 'N/A' if param.required else f"`{param.default}`"
-                        f.write(f'| `{param.name}` | `{param.value_type}` | {required} | {default} | {param.description if param.description != None else "No description."} |\n')
-                    f.write('\n')
-                
-                if s.logic != None:
-                    f.write('#### Logic\n')
-                    for index, line in enumerate(s.logic):
-                        f.write(f'{index + 1}. {line}\n')
-                    if s.logic.notes != None:
-                        f.write('\n')
-                        f.write(s.logic.notes + '\n')
-                    f.write('\n')
-
-                f.write('#### Possible Responses\n')
-                f.write('| Method | Status Code | Status | Content | Context |\n')
-                f.write('|---|---|---|---|---|\n')
-
-                sorted_responses = sorted(s.responses, key=lambda response: response.status_code)
-                for response in sorted_responses:
-                    f.write(f'| {s.path.method} | {response.status_code} | {response.status_string} | {response.content if response.content != None else "No content"} | {response.context if response.context != None else "No context"} |\n')
+        with instrumentation.stage('render.build'):
+            content = self.render_to_string()
+        with instrumentation.stage('render.write'):
+            with atomic_write(path) as f:
+                f.write(content)
+
+    def render_files(self, *paths):
+        # renders into several formats with a single walk over the section, the
+        # format of every path is picked from its extension (.md, .html, .txt)
+        with instrumentation.stage('render.files'):
+            render_files(self, dict.fromkeys(paths))
+
+    # the same as load_file, save and render, but awaitable: the work runs on
+    # the executors of the default DocExecutor instead of the event loop (see aio.py)
+
+    @classmethod
+    async def load_file_async(cls, path, lazy: bool = False):
+        return await aio.load_file(path, lazy)
+
+    async def save_async(self, path, normalized: bool = False):
+        await aio.save(self, path, normalized)
+
+    async def render_async(self, path = None):
+        # the markdown without a path
+        return await aio.render(self, path)
+
+    FIELDS = (('title', 'title'), ('subsections', 'subsections'))
+
+    @property
+    def frozen(self) -> bool:
+        return False
+
+    def freeze(self):
+        # a lazily loaded section builds every subsection first
+        for subsection in self.subsections:
+            subsection.freeze()
+        self._subsections = tuple(self._subsections)
+        self._response_table = None
+        self.__class__ = FrozenSection
+        return self
+
+    def evolve(self, **changes):
+        return _evolve(self, changes)
+
+    def evolve_subsection(self, key, **changes):
+        # a copy with the subsection at key ((url, method) or its position) evolved
+        subsection = self[key]
+        subsections = [subsection.evolve(**changes) if other is subsection else _unshared(other) for other in self.subsections]
+        return self.evolve(subsections=subsections)
+
+class FrozenSection(Frozen, Section):
+    __slots__ = ()
+    thawed = Section
+
+def _preset_key(value):
+    # a hashable stand-in for an argument of a preset, CriteriaLists and lists
+    # are compared by their items
+    if type(value) == CriteriaList:
+        return (CriteriaList, tuple(_preset_key(c) for c in value.criteria), value.criteria_type)
+    if type(value) in (list, tuple):
+        return (list, tuple(_preset_key(v) for v in value))
+    return value
+
+_COLLECTIONS = (CriteriaList, list, tuple)
+
+class PresetCache:
+    # remembers the Responses the preset factories made, so calling a preset
+    # with the same arguments gives back the same SharedResponse instead of
+    # building a new one, the least recently used entries are dropped once
+    # there are more than max_entries
+    #
+    # usage:
+    #     @presets.cached
+    #     def not_found(resource):
+    #         return SharedResponse(404, '`Not found`', f'There is no {resource}.')
+    #     presets.stats() -> {'entries': 1, 'max_entries': 1024, 'hits': 3, 'misses': 1}
+    max_entries: int
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cached(self, factory):
+        name = factory.__qualname__
+        @functools.wraps(factory)
+        def cached_factory(*args, **kwargs):
+            key = (name, args)
+            if kwargs or any(type(value) in _COLLECTIONS for value in args):
+                key = (name, _preset_key(args), _preset_key(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # an argument that can't be hashed, the Response is made but not kept
+                with self._lock:
+                    self.misses += 1
+                return factory(*args, **kwargs)
+            with self._lock:
+                response = self._entries.get(key)
+                if response != None:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return response
+            # made outside the lock, two threads that miss at once both make
+            # one, the first one stored is kept and handed to both
+            response = factory(*args, **kwargs)
+            with self._lock:
+                self.misses += 1
+                stored = self._entries.get(key)
+                if stored != None:
+                    self._entries.move_to_end(key)
+                    return stored
+                self._entries[key] = response
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return response
+        return cached_factory
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'hits': self.hits, 'misses': self.misses}
+
+presets = PresetCache()
+
+def criteria_context(criteria) -> str:
+    items = ''.join([f'<li>{c}</li>' for c in criteria])
+    return f'One of the following validation criteria was not met:<br><ul>{items}</ul>'
 
 class GETResponses:
 
-    REQUIRED_PARAMETERS_MISSING = Response(
+    REQUIRED_PARAMETERS_MISSING = SharedResponse(
         status = 400,
         content = '`One or more required parameters are missing.`',
         context = 'A required parameter was not sent as part of the message body.'
     )
 
+    @presets.cached
     def validation_failed(criteria: CriteriaList):
-        
-        dynamic_context = 'One of the following validation criteria was not met:<br><ul>'
-        for i, c in enumerate(criteria):
-            dynamic_context += f"<li>{c}</li>"
-        dynamic_context += '</ul>'
-
-        return Response(
+        return SharedResponse(
             status = 400,
             content = '`One or more required parameters did not meet validation requirements.`',
-            context = dynamic_context
+            context = criteria_context(criteria)
         )
     
-    DATABASE_ERROR = Response(
+    DATABASE_ERROR = SharedResponse(
         status = 500,
         content = 'Error page',
         context = 'Database error'
     )
 
-    REQUESTED_PAGE = Response(
+    REQUESTED_PAGE = SharedResponse(
         status = 200,
         content = 'Requested page',
         context = 'Normal operation'
@@ -623,45 +1624,50 @@ class GETResponses:
 
 class POSTResponses:
 
-    REQUIRED_PARAMETERS_MISSING = Response(
+    REQUIRED_PARAMETERS_MISSING = SharedResponse(
         status = 400,
         content = '`One or more required parameters are missing.`',
         context = 'A required parameter was not sent as part of the message body.'
     )
 
+    @presets.cached
     def validation_failed(criteria: CriteriaList):
-        
-        dynamic_context = 'One of the following validation criteria was not met:<br><ul>'
-        for i, c in enumerate(criteria):
-            dynamic_context += f"<li>{c}</li>"
-        dynamic_context += '</ul>'
-
-        return Response(
+        return SharedResponse(
             status = 400,
             content = "`Parameter '{name}' failed to meet validation criteria.`",
-            context = dynamic_context
+            context = criteria_context(criteria)
         )
 
+    @presets.cached
     def database_error(modification: 'A fatal error occurred when attempting to ___.'):
-        return Response(
+        return SharedResponse(
             status = 500,
             content = '`Database error`',
             context = f'A fatal error occurred when attempting to {modification}.'
         )
 
+    @presets.cached
     def failed_modification(modification: 'The server attempted to ___ but was unsuccessful.', message):
-        return Response(
+        return SharedResponse(
             status = 500,
             content = f'`{message}`',
             context = f'The server attempted to {modification} but was unsuccessful.'
         )
     
+    @presets.cached
     def ok(context, status=200):
-        return Response(
+        return SharedResponse(
             status = status,
             content = '`ok`',
             context = context
         )
 
 def code(string):
-    return f'`{string}`'
\ No newline at end of file
+    return f'`{string}`'
+
+from . import aio
+from .document import render_files
+from .files import atomic_write, open_text
+from .render import engine
+from .snapshot import is_snapshot, load_snapshot, refuse_json_options, save_snapshot
+from .stream import iter_encode
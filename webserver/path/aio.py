@@ -0,0 +1,164 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+
+from . import Section
+from .files import atomic_write, open_binary
+from .snapshot import dumps, is_snapshot, loads, refuse_json_options
+from .stream import iter_encode
+
+# loads, renders and saves Sections from asyncio code without blocking the
+# event loop
+#
+# every call is split into file I/O and CPU work (parsing, building, encoding,
+# rendering), which run on two separate bounded executors, so one file is read
+# or written while another one is parsed or rendered
+# a DocExecutor lets at most limit calls run at once, the others wait their
+# turn without taking a thread, and cancelling a call that is still waiting or
+# between two steps stops it there (a step that already runs on a thread
+# finishes, but its result is thrown away)
+#
+# usage:
+#     sections = await gather(*(Section.load_file_async(path) for path in paths), limit=16)
+#     await gather(*(section.render_async(f'{section.title}.md') for section in sections))
+
+class DocExecutor:
+    # workers threads do the CPU work and io_workers threads read and write
+    # files, cpu can be any other concurrent.futures executor (a
+    # ProcessPoolExecutor, for example) and is then not shut down by close()
+    workers: int
+    io_workers: int
+    limit: int
+
+    def __init__(self, workers: int = None, io_workers: int = 4, limit: int = None, cpu = None):
+        self.workers = workers if workers != None else min(4, os.cpu_count() or 1)
+        self.io_workers = io_workers
+        self.limit = limit if limit != None else self.workers * 2
+        self._cpu = cpu
+        self._owns_cpu = cpu == None
+        self._io = None
+        self._semaphore = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self, wait: bool = True):
+        if self._io != None:
+            self._io.shutdown(wait=wait, cancel_futures=True)
+            self._io = None
+        if self._cpu != None and self._owns_cpu:
+            self._cpu.shutdown(wait=wait, cancel_futures=True)
+            self._cpu = None
+
+    def slot(self) -> asyncio.Semaphore:
+        # the semaphore that keeps at most limit calls running, one per event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    async def cpu(self, function, *args):
+        if self._cpu == None:
+            self._cpu = ThreadPoolExecutor(self.workers, thread_name_prefix='doccreator-cpu')
+        return await asyncio.get_running_loop().run_in_executor(self._cpu, function, *args)
+
+    async def io(self, function, *args):
+        if self._io == None:
+            self._io = ThreadPoolExecutor(self.io_workers, thread_name_prefix='doccreator-io')
+        return await asyncio.get_running_loop().run_in_executor(self._io, function, *args)
+
+_default_executor = None
+
+def default_executor() -> DocExecutor:
+    global _default_executor
+    if _default_executor == None:
+        _default_executor = DocExecutor()
+    return _default_executor
+
+# the steps, module level functions so a ProcessPoolExecutor can run them too
+
+def _read(path) -> bytes:
+    with open_binary(path) as f:
+        return f.read()
+
+def _parse(path: str, data: bytes, lazy: bool) -> Section:
+    if is_snapshot(path):
+        refuse_json_options(path, lazy=lazy)
+        return loads(data)
+    obj = json.loads(data)
+    del data
+    return Section.load(obj, lazy)
+
+def _serialize(section: Section, path: str, normalized: bool) -> bytes:
+    if is_snapshot(path):
+        refuse_json_options(path, normalized=normalized)
+        return dumps(section)
+    obj = section.normalized_obj if normalized else section.obj
+    return ''.join(iter_encode(obj)).encode('utf-8')
+
+def _render(section: Section) -> str:
+    return section.render_to_string()
+
+def _write(path, data: bytes, sync: bool):
+    with atomic_write(path, sync=sync, binary=True) as f:
+        f.write(data)
+
+async def load_file(path, lazy: bool = False, executor: DocExecutor = None) -> Section:
+    executor = executor if executor != None else default_executor()
+    async with executor.slot():
+        data = await executor.io(_read, path)
+        return await executor.cpu(_parse, str(path), data, lazy)
+
+async def save(section: Section, path, normalized: bool = False, executor: DocExecutor = None):
+    # like Section.save, the section must not be changed until this returns
+    executor = executor if executor != None else default_executor()
+    async with executor.slot():
+        data = await executor.cpu(_serialize, section, str(path), normalized)
+        await executor.io(_write, path, data, True)
+
+async def render(section: Section, path = None, executor: DocExecutor = None):
+    # the markdown, or None once it was written to path
+    # the section must not be changed until this returns
+    executor = executor if executor != None else default_executor()
+    async with executor.slot():
+        markdown = await executor.cpu(_render, section)
+        if path == None:
+            return markdown
+        await executor.io(_write, path, markdown.encode('utf-8'), False)
+
+async def gather(*aws, limit: int = None, return_exceptions: bool = False) -> list:
+    # like asyncio.gather, but with at most limit of aws running at once, and
+    # once one of them fails (without return_exceptions) the others are
+    # cancelled before the error is raised, the same happens when gather
+    # itself is cancelled
+    semaphore = asyncio.Semaphore(limit) if limit != None else None
+
+    async def run(aw):
+        if semaphore != None:
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                if asyncio.iscoroutine(aw):
+                    aw.close() # never started, so it is not left unawaited
+                raise
+        try:
+            return await aw
+        finally:
+            if semaphore != None:
+                semaphore.release()
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,67 @@
+from . import HTTPMethod
+
+# a Section is walked once into these plain blocks, which hold everything the
+# renderers write and nothing else, the markdown of RenderEngine and the
+# backends in document.py are all written from them
+
+class DocumentHeader:
+    # the title and one (url, method, requireAuth, requireMasterAuth) row per subsection
+    __slots__ = ('title', 'rows')
+
+    title: str
+    rows: list[tuple]
+
+    def __init__(self, title: str, rows: list[tuple]):
+        self.title = title
+        self.rows = rows
+
+    def __repr__(self) -> str:
+        # <DocumentHeader: Teams>
+        return f'<DocumentHeader: {self.title}>'
+
+class DocumentBlock:
+    # everything one subsection renders to
+    # parameters are (name, value_type, required, default, description) rows,
+    # default is None for required parameters
+    # responses are (status, content, context) rows, already sorted by status code
+    # parameters and logic are None when the subsection has none
+    __slots__ = ('method', 'multiple', 'description', 'parameters', 'logic', 'notes', 'responses')
+
+    method: HTTPMethod
+    multiple: bool
+    description: str
+    parameters: list[tuple]
+    logic: list[str]
+    notes: str
+    responses: list[tuple]
+
+    def __init__(self, method: HTTPMethod, multiple: bool, description: str, parameters: list[tuple], logic: list[str], notes: str, responses: list[tuple]):
+        self.method = method
+        self.multiple = multiple
+        self.description = description
+        self.parameters = parameters
+        self.logic = logic
+        self.notes = notes
+        self.responses = responses
+
+    def __repr__(self) -> str:
+        # <DocumentBlock: GET>
+        return f'<DocumentBlock: {self.method}>'
+
+def header_row(path) -> tuple:
+    return (path.url, path.method, bool(path.requireAuth), bool(path.requireMasterAuth))
+
+def document_header(section) -> DocumentHeader:
+    return DocumentHeader(section.title, [header_row(s.path) for s in section])
+
+def document_block(subsection, multiple: bool = False) -> DocumentBlock:
+    s = subsection
+    parameters = None
+    if s.parameters != None:
+        parameters = [(p.name, p.value_type, bool(p.required), None if p.required else p.default, p.description) for p in s.parameters.parameters]
+    logic = notes = None
+    if s.logic != None:
+        logic = list(s.logic.steps)
+        notes = s.logic.notes
+    responses = [(r.status, r.content, r.context) for r in sorted(s.responses, key=lambda response: response.status_code)]
+    return DocumentBlock(s.path.method, multiple, s.description, parameters, logic, notes, responses)
@@ -0,0 +1,163 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+from . import Section
+from .cache import BuildManifest, file_stat
+from .instrument import Instrumentation, instrumentation
+
+SOURCE_EXTENSIONS = ('.json', '.json.gz', '.json.xz', '.json.lzma', '.json.bz2')
+OUTPUT_EXTENSION = '.md'
+
+class BuildResult:
+    source: str
+    output: str
+    seconds: float
+    error: str
+    hash: str
+    source_stat: tuple
+    skipped: bool
+    profile: dict
+
+    def __init__(self, source: str, output: str, seconds: float = 0.0, error: str = None, hash: str = None, source_stat: tuple = None, skipped: bool = False, profile: dict = None):
+        self.source = source
+        self.output = output
+        self.seconds = seconds
+        self.error = error
+        self.hash = hash
+        self.source_stat = source_stat
+        self.skipped = skipped
+        self.profile = profile
+
+    @property
+    def ok(self) -> bool:
+        return self.error == None
+
+    def __repr__(self) -> str:
+        # <BuildResult: "teams.json" in 1.2 ms>
+        # <BuildResult: "teams.json" failed: KeyError: 'title'>
+        # <BuildResult: "teams.json" unchanged>
+        if self.skipped:
+            return f'<BuildResult: "{self.source}" unchanged>'
+        elif self.ok:
+            return f'<BuildResult: "{self.source}" in {self.seconds * 1000:.1f} ms>'
+        else:
+            return f'<BuildResult: "{self.source}" failed: {self.error}>'
+
+def discover(src) -> list[str]:
+    if os.path.isfile(src):
+        return [src]
+
+    sources = []
+    for directory, _, files in os.walk(src):
+        for name in files:
+            if name.endswith(SOURCE_EXTENSIONS):
+                sources.append(os.path.join(directory, name))
+    sources.sort()
+    return sources
+
+def output_path(source, src, out) -> str:
+    # teams/list.json in src becomes teams/list.md in out
+    if os.path.isfile(src):
+        relative = os.path.basename(source)
+    else:
+        relative = os.path.relpath(source, src)
+    for extension in SOURCE_EXTENSIONS:
+        if relative.endswith(extension):
+            relative = relative[:-len(extension)]
+            break
+    return os.path.join(out, relative + OUTPUT_EXTENSION)
+
+def build_file(job) -> BuildResult:
+    # runs inside the worker processes, so only the paths and the previous hash
+    # are sent over and a small BuildResult comes back
+    # if the section still has the previous hash the output is left alone
+    # with profile set, the result carries the instrumentation of this file
+    # with jobs=1 this runs in the calling process, whose own instrumentation
+    # is put back afterwards (with this file added if it was enabled)
+    source, output, previous_hash, profile = job
+    if profile:
+        previous = (instrumentation.enabled, instrumentation.timers, instrumentation.counters)
+        instrumentation.reset()
+        instrumentation.enable()
+    start = time.perf_counter()
+    try:
+        result = _build_file(source, output, previous_hash, start)
+    finally:
+        if profile:
+            snapshot = instrumentation.snapshot()
+            instrumentation.enabled, instrumentation.timers, instrumentation.counters = previous
+            if instrumentation.enabled:
+                instrumentation.merge(snapshot)
+    if profile:
+        result.profile = snapshot
+    return result
+
+def _build_file(source, output, previous_hash, start) -> BuildResult:
+    try:
+        # stat before reading so a change made while building is caught next time
+        source_stat = file_stat(source)
+        section = Section.load_file(source)
+        with instrumentation.stage('build.hash'):
+            digest = section.digest
+        if digest == previous_hash:
+            return BuildResult(source, output, time.perf_counter() - start, hash=digest, source_stat=source_stat, skipped=True)
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        section.render(output)
+    except Exception as e:
+        return BuildResult(source, output, time.perf_counter() - start, f'{type(e).__name__}: {e}')
+    return BuildResult(source, output, time.perf_counter() - start, hash=digest, source_stat=source_stat)
+
+def build(src, out, jobs: int = None, report = None, cache_dir: str = None, force: bool = False, profile: bool = False) -> list[BuildResult]:
+    # renders every section file in src into out, report is called with each
+    # BuildResult as soon as it is available
+    # with profile set, every BuildResult that was built carries an
+    # instrumentation snapshot (see profile_summary)
+    # with a cache_dir, outputs whose source has not changed since the last build
+    # are skipped, without even reading the source when its mtime and size match
+    if jobs == None:
+        jobs = os.cpu_count() or 1
+
+    manifest = BuildManifest(cache_dir, out) if cache_dir != None else None
+    results = []
+    work = []
+    for source in discover(src):
+        output = output_path(source, src, out)
+        if manifest != None and not force:
+            if manifest.is_fresh(source, output):
+                results.append(BuildResult(source, output, skipped=True))
+                continue
+            work.append((source, output, manifest.previous_hash(source, output), profile))
+        else:
+            work.append((source, output, None, profile))
+
+    def finish(result):
+        results.append(result)
+        if manifest != None:
+            manifest.record(result)
+        if report != None:
+            report(result)
+
+    if jobs <= 1 or len(work) <= 1:
+        for job in work:
+            finish(build_file(job))
+    else:
+        # hand out the files in batches so each worker round trip renders several files
+        chunksize = max(1, len(work) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for result in executor.map(build_file, work, chunksize=chunksize):
+                finish(result)
+
+    if manifest != None and work:
+        manifest.save()
+    return results
+
+def profile_summary(results: list[BuildResult]) -> str:
+    # adds up the instrumentation of every file, wherever it was built
+    total = Instrumentation()
+    for result in results:
+        if result.profile != None:
+            total.merge(result.profile)
+    return total.summary()
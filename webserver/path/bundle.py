@@ -0,0 +1,202 @@
+import json
+import mmap
+import os
+
+from . import HTTPMethod, Section
+
+class BundleEntry:
+    offset: int
+    length: int
+    title: str
+    paths: list[tuple]
+
+    def __init__(self, offset: int, length: int, title: str, paths: list[tuple]):
+        self.offset = offset
+        self.length = length
+        self.title = title
+        self.paths = paths
+
+    def __repr__(self) -> str:
+        # <BundleEntry: "Teams" at 1024>
+        return f'<BundleEntry: "{self.title}" at {self.offset}>'
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+    @property
+    def obj(self) -> dict:
+        return {
+            'offset': self.offset,
+            'length': self.length,
+            'title': self.title,
+            'paths': [[url, method.obj] for url, method in self.paths]
+        }
+
+    @classmethod
+    def load(cls, obj):
+        paths = [(url, HTTPMethod.load(method)) for url, method in obj['paths']]
+        return cls(obj['offset'], obj['length'], obj['title'], paths)
+
+class Bundle:
+    # many Sections in one JSONL file, one saved Section per line, with a
+    # sidecar index (<path>.idx, also JSONL) of the byte range every Section
+    # was written to, so a single Section can be read with one slice of a
+    # memory map and one json.loads
+    #
+    # both files are only ever appended to, so adding Sections never rewrites
+    # what is already there
+    # if the index is behind the bundle (for example after a crash between the
+    # two writes) the missing entries are rebuilt from the bundle when it is opened
+    # there should only be one writer at a time
+    #
+    # usage:
+    #     with Bundle('api.jsonl') as bundle:
+    #         bundle.append(teams, scores)
+    #         bundle.get('Teams')
+    #         bundle.find('/teams', 'POST')
+    path: str
+    index_path: str
+    entries: list[BundleEntry]
+
+    def __init__(self, path, normalized: bool = True):
+        self.path = str(path)
+        self.index_path = self.path + '.idx'
+        self.normalized = normalized
+        self.entries = []
+        self._titles = {}
+        self._paths = {}
+        self._file = None
+        self._map = None
+        self._read_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._map != None:
+            self._map.close()
+            self._map = None
+        if self._file != None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        for entry in list(self.entries):
+            yield self.read(entry)
+
+    def __repr__(self) -> str:
+        # <Bundle: "api.jsonl" with 12 sections>
+        return f'<Bundle: "{self.path}" with {len(self)} sections>'
+
+    @property
+    def titles(self) -> list[str]:
+        return [entry.title for entry in self.entries]
+
+    def _add_entry(self, entry: BundleEntry):
+        # later Sections win when titles or paths repeat
+        self.entries.append(entry)
+        self._titles[entry.title] = entry
+        for key in entry.paths:
+            self._paths[key] = entry
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._add_entry(BundleEntry.load(json.loads(line)))
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # a line cut short by a crash, the index is written again up to the
+            # last good entry and everything after it is rebuilt from the bundle
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry.obj) + '\n' for entry in self.entries))
+
+        indexed = self.entries[-1].end if self.entries else 0
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size > indexed:
+            self._scan(indexed)
+
+    def _scan(self, offset: int):
+        # indexes every complete line from offset to the end of the bundle
+        missing = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break # a line that was never finished
+                if line.strip():
+                    obj = json.loads(line)
+                    missing.append(self._entry_for(obj, offset, len(line)))
+                offset += len(line)
+        self._write_index(missing)
+
+    def _entry_for(self, obj: dict, offset: int, length: int) -> BundleEntry:
+        paths = [(subsection['path']['url'], HTTPMethod.load(subsection['path']['method'])) for subsection in obj['subsections']]
+        return BundleEntry(offset, length, obj['title'], paths)
+
+    def _write_index(self, entries: list[BundleEntry]):
+        if not entries:
+            return
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry.obj) + '\n' for entry in entries))
+        for entry in entries:
+            self._add_entry(entry)
+
+    def append(self, *sections: Section):
+        # the bundle is written and flushed before the index so the index never
+        # points past the end of the bundle
+        entries = []
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            for section in sections:
+                obj = section.normalized_obj if self.normalized else section.obj
+                line = (json.dumps(obj) + '\n').encode('utf-8')
+                f.write(line)
+                entries.append(self._entry_for(obj, offset, len(line)))
+                offset += len(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_index(entries)
+
+    def _mapped(self, end: int):
+        # maps the bundle again whenever it has grown past the current map
+        if self._map == None or len(self._map) < end:
+            self.close()
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, entry: BundleEntry, lazy: bool = False) -> Section:
+        data = self._mapped(entry.end)[entry.offset:entry.end]
+        return Section.load(json.loads(data), lazy)
+
+    def get(self, title: str, lazy: bool = False) -> Section:
+        entry = self._titles.get(title)
+        if entry == None:
+            raise KeyError(title)
+        return self.read(entry, lazy)
+
+    def find(self, url: str, method = HTTPMethod.GET, lazy: bool = True) -> Section:
+        # the Section that documents url via method
+        if type(method) != HTTPMethod:
+            method = HTTPMethod(method)
+        entry = self._paths.get((url, method))
+        if entry == None:
+            raise KeyError((url, method))
+        return self.read(entry, lazy)
+
+    def find_subsection(self, url: str, method = HTTPMethod.GET):
+        return self.find(url, method)[(url, method)]
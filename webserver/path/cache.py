@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+try:
+    import fcntl
+except ImportError: # not available on Windows, builds there are not locked against each other
+    fcntl = None
+
+from .files import atomic_write
+from .render import RENDERER_VERSION
+
+def default_cache_dir() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'doccreator')
+
+def file_stat(path):
+    # (mtime_ns, size), or None if the file does not exist
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class BuildManifest:
+    # remembers what every output in a build directory was rendered from
+    #
+    # entries are keyed by the absolute output path:
+    #     {
+    #         'source': '/abs/path/teams.json',
+    #         'source_mtime': 1690000000000000000, 'source_size': 1234,
+    #         'hash': '<Section.digest>',
+    #         'renderer': RENDERER_VERSION,
+    #         'output_mtime': 1690000000000000000
+    #     }
+    path: str
+    entries: dict
+
+    def __init__(self, cache_dir, out):
+        out = os.path.abspath(out)
+        key = hashlib.sha1(out.encode('utf-8')).hexdigest()[:16]
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, f'manifest-{key}.json')
+        self.entries = self._read()
+        self._updates = {}
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            # a missing or unreadable manifest only means everything gets rebuilt
+            return {}
+
+    def previous_hash(self, source, output) -> str:
+        # the recorded hash of the source, as long as the output rendered from it
+        # is still exactly the file that was written
+        entry = self.entries.get(os.path.abspath(output))
+        if entry == None or entry.get('renderer') != RENDERER_VERSION:
+            return None
+        if entry.get('source') != os.path.abspath(source):
+            return None
+        output_stat = file_stat(output)
+        if output_stat == None or output_stat[0] != entry.get('output_mtime'):
+            return None
+        return entry.get('hash')
+
+    def is_fresh(self, source, output) -> bool:
+        # cheap check that only looks at file metadata, no file is read
+        if self.previous_hash(source, output) == None:
+            return False
+        entry = self.entries[os.path.abspath(output)]
+        return file_stat(source) == (entry.get('source_mtime'), entry.get('source_size'))
+
+    def record(self, result):
+        if not result.ok or result.hash == None:
+            return
+        output_stat = file_stat(result.output)
+        if output_stat == None:
+            return
+        self._updates[os.path.abspath(result.output)] = {
+            'source': os.path.abspath(result.source),
+            'source_mtime': result.source_stat[0],
+            'source_size': result.source_stat[1],
+            'hash': result.hash,
+            'renderer': RENDERER_VERSION,
+            'output_mtime': output_stat[0]
+        }
+
+    def save(self):
+        # several builds can write to the same manifest at once, so the latest
+        # manifest is re-read under a lock and only this build's entries are
+        # merged into it, then it is swapped in atomically so readers never
+        # see a half written file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock:
+            if fcntl != None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read()
+                entries.update(self._updates)
+                for output, entry in list(entries.items()):
+                    if not os.path.exists(entry['source']):
+                        del entries[output]
+
+                with atomic_write(self.path) as f:
+                    f.write(json.dumps(entries))
+            finally:
+                if fcntl != None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        self.entries = entries
+        self._updates = {}
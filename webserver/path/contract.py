@@ -0,0 +1,403 @@
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+import json
+import os
+import re
+import urllib.parse
+
+from . import Criterion, Section
+from .build import discover
+from .files import COMPRESSION_EXTENSIONS, open_text
+
+# checks recorded requests against the parameters their endpoint documents, to
+# find where the documentation and the implementation drifted apart
+#
+# every Subsection is compiled once into an EndpointContract: a check per
+# documented parameter (required and value_type) and one per criterion its
+# responses document (the <li> items of a validation_failed context, read back
+# with Criterion.parse)
+# recorded requests are JSON lines, params and status are optional:
+#     {"method": "GET", "url": "/teams/12?page=2", "params": {"name": "x"}, "status": 200}
+# query parameters and path parameters ({id} or :id in the documented url)
+# are checked like params
+#
+# logs are split into byte ranges that are checked across a process pool,
+# every worker compiles the contracts once and only sends back counts, so the
+# memory used does not depend on the length of the logs
+#
+# usage:
+#     report = check_requests('docs', ['requests.jsonl'])
+#     for violation in report.sorted():
+#         print(violation)
+
+INTEGER = re.compile(r'^-?[0-9]+$')
+NUMBER = re.compile(r'^-?[0-9]+(\.[0-9]+)?([eE][-+]?[0-9]+)?$')
+
+def is_integer(value) -> bool:
+    # bool is a subclass of int, so the exact type is compared
+    return type(value) == int or (type(value) == str and INTEGER.match(value) != None)
+
+def is_number(value) -> bool:
+    return type(value) in (int, float) or (type(value) == str and NUMBER.match(value) != None)
+
+def is_boolean(value) -> bool:
+    return type(value) == bool or (type(value) == str and value.lower() in ('true', 'false'))
+
+def is_string(value) -> bool:
+    return type(value) == str
+
+def is_array(value) -> bool:
+    return type(value) == list
+
+def is_object(value) -> bool:
+    return type(value) == dict
+
+VALUE_TYPES = {
+    'int': is_integer, 'integer': is_integer, 'long': is_integer,
+    'float': is_number, 'double': is_number, 'number': is_number,
+    'bool': is_boolean, 'boolean': is_boolean,
+    'str': is_string, 'string': is_string,
+    'list': is_array, 'array': is_array,
+    'dict': is_object, 'object': is_object
+}
+
+def value_check(value_type: str):
+    # the check of a documented value_type, or None for types that are not
+    # known (those are not checked)
+    value_type = str(value_type).strip().lower()
+    if value_type.endswith('[]') or value_type.startswith('list['):
+        return is_array
+    return VALUE_TYPES.get(value_type)
+
+def as_text(value) -> str:
+    return value if type(value) == str else json.dumps(value)
+
+def compile_criterion(criterion: Criterion):
+    # a function that tells whether a value meets criterion
+    if criterion.kind == 'min_length':
+        minimum = criterion.value
+        return lambda value: len(as_text(value)) >= minimum
+    elif criterion.kind == 'max_length':
+        maximum = criterion.value
+        return lambda value: len(as_text(value)) <= maximum
+    elif criterion.kind == 'length':
+        length = criterion.value
+        return lambda value: len(as_text(value)) == length
+    elif criterion.kind == 'pattern':
+        pattern = re.compile(criterion.value)
+        return lambda value: pattern.search(as_text(value)) != None
+    return is_integer
+
+CRITERIA_ITEM = re.compile(r'<li>(.*?)</li>')
+
+def documented_criteria(responses) -> list[Criterion]:
+    # the criteria the validation_failed responses of a subsection list
+    criteria = []
+    for response in responses:
+        if response.context == None or '<li>' not in response.context:
+            continue
+        for text in CRITERIA_ITEM.findall(response.context):
+            criterion = Criterion.parse(text)
+            if criterion != None and criterion not in criteria:
+                criteria.append(criterion)
+    return criteria
+
+def normalize_path(path: str) -> str:
+    # /teams/ and /teams are the same endpoint
+    return path.rstrip('/') or '/'
+
+PATH_PARAMETER = re.compile(r'\{([^}/]+)\}|:([A-Za-z_][A-Za-z0-9_]*)')
+
+class EndpointContract:
+    # the compiled checks of a single Subsection
+    method: str
+    url: str
+    names: list[str]
+
+    def __init__(self, subsection):
+        self.method = str(subsection.path.method)
+        self.url = normalize_path(subsection.path.url)
+        self.names = [] # path parameters, in the order they appear in the url
+        pattern = []
+        position = 0
+        for match in PATH_PARAMETER.finditer(self.url):
+            pattern.append(re.escape(self.url[position:match.start()]))
+            pattern.append('([^/]+)')
+            self.names.append(match.group(1) or match.group(2))
+            position = match.end()
+        self.pattern = re.compile('^' + ''.join(pattern) + re.escape(self.url[position:]) + '$') if self.names else None
+
+        self.parameters = [] # (name, required, value_type, check)
+        documented = set(self.names)
+        if subsection.parameters != None:
+            for parameter in subsection.parameters:
+                self.parameters.append((parameter.name, bool(parameter.required), parameter.value_type, value_check(parameter.value_type)))
+                documented.add(parameter.name)
+        self.documented = frozenset(documented)
+        self.criteria = {} # name -> [(criterion, check)]
+        for criterion in documented_criteria(subsection.responses):
+            self.criteria.setdefault(criterion.name, []).append((criterion, compile_criterion(criterion)))
+        self.statuses = frozenset(response.status_code for response in subsection.responses)
+
+    def __repr__(self) -> str:
+        # <EndpointContract: GET /teams/{id} with 3 parameters>
+        return f'<EndpointContract: {self.method} {self.url} with {len(self.parameters)} parameters>'
+
+    def check(self, params: dict, status = None) -> list[str]:
+        # a message for every way the request breaks the documentation
+        problems = []
+        for name, required, value_type, check in self.parameters:
+            if name not in params:
+                if required:
+                    problems.append(f'missing required parameter "{name}"')
+            elif check != None and params[name] != None and not check(params[name]):
+                problems.append(f'parameter "{name}" is not {value_type}')
+        if not self.documented.issuperset(params):
+            for name in params:
+                if name not in self.documented:
+                    problems.append(f'undocumented parameter "{name}"')
+        for name, criteria in self.criteria.items():
+            if name in params and params[name] != None:
+                for criterion, check in criteria:
+                    if not check(params[name]):
+                        problems.append(f'parameter "{name}" breaks "{criterion}"')
+        if status != None and self.statuses and status not in self.statuses:
+            problems.append(f'undocumented status {status}')
+        return problems
+
+class ContractSet:
+    # every EndpointContract of a set of Sections, looked up by method and path
+    def __init__(self, sections = ()):
+        self._exact = {} # (method, url) -> EndpointContract
+        self._templates = [] # EndpointContracts with path parameters
+        for section in sections:
+            self.add(section)
+
+    def add(self, section: Section):
+        for subsection in section:
+            contract = EndpointContract(subsection)
+            if contract.pattern == None:
+                self._exact[(contract.method, contract.url)] = contract
+            else:
+                self._templates.append(contract)
+
+    def __len__(self):
+        return len(self._exact) + len(self._templates)
+
+    @classmethod
+    def load(cls, src):
+        # every Section JSON file in src, like build finds them
+        return cls(Section.load_file(source) for source in discover(src))
+
+    def match(self, method: str, path: str) -> tuple:
+        # (EndpointContract, path parameters), or (None, None) for an
+        # endpoint that is not documented
+        path = normalize_path(path)
+        contract = self._exact.get((method, path))
+        if contract != None:
+            return contract, {}
+        for contract in self._templates:
+            if contract.method != method:
+                continue
+            match = contract.pattern.match(path)
+            if match != None:
+                return contract, dict(zip(contract.names, match.groups()))
+        return None, None
+
+class Violation:
+    # one kind of problem of one endpoint, with how many requests had it and
+    # where the first of them is (log:byte offset)
+    endpoint: tuple
+    message: str
+    count: int
+    example: str
+
+    def __init__(self, endpoint: tuple, message: str, count: int = 0, example: str = None):
+        self.endpoint = endpoint
+        self.message = message
+        self.count = count
+        self.example = example
+
+    def __repr__(self) -> str:
+        # <Violation: GET /teams missing required parameter "name" x12>
+        method, url = self.endpoint
+        return f'<Violation: {method} {url} {self.message} x{self.count}>'
+
+    def __str__(self) -> str:
+        # GET /teams: missing required parameter "name" (12 requests, first at requests.jsonl:5120)
+        method, url = self.endpoint
+        return f'{method} {url}: {self.message} ({self.count} requests, first at {self.example})'
+
+    @property
+    def obj(self) -> dict:
+        method, url = self.endpoint
+        return {'method': method, 'url': url, 'message': self.message, 'count': self.count, 'example': self.example}
+
+class ContractReport:
+    # requests is every recorded request that was read, matched the ones that
+    # went to a documented endpoint, invalid the lines that are not a request
+    # (first_invalid is where the first of them is)
+    # log is the log that is being read, examples point into it
+    log: str
+    requests: int
+    matched: int
+    invalid: int
+    first_invalid: str
+    violations: dict
+
+    def __init__(self, log: str = None):
+        self.log = log
+        self.requests = 0
+        self.matched = 0
+        self.invalid = 0
+        self.first_invalid = None
+        self.violations = {} # (endpoint, message) -> Violation
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations and not self.invalid
+
+    def __repr__(self) -> str:
+        # <ContractReport: 120000 requests, 42 violations>
+        return f'<ContractReport: {self.requests} requests, {len(self.violations)} violations>'
+
+    def add(self, endpoint: tuple, message: str, position):
+        # position is where the request is in log, the example is only
+        # formatted for the first request with a violation
+        violation = self.violations.get((endpoint, message))
+        if violation == None:
+            violation = self.violations[(endpoint, message)] = Violation(endpoint, message, 0, f'{self.log}:{position}')
+        violation.count += 1
+
+    def skip(self, position):
+        self.invalid += 1
+        if self.first_invalid == None:
+            self.first_invalid = f'{self.log}:{position}'
+
+    def merge(self, other):
+        # adds the counts of a report of a later part of the logs
+        self.requests += other.requests
+        self.matched += other.matched
+        self.invalid += other.invalid
+        if self.first_invalid == None:
+            self.first_invalid = other.first_invalid
+        for key, violation in other.violations.items():
+            existing = self.violations.get(key)
+            if existing == None:
+                self.violations[key] = Violation(violation.endpoint, violation.message, violation.count, violation.example)
+            else:
+                existing.count += violation.count
+
+    def sorted(self) -> list[Violation]:
+        # the most common violations first
+        return sorted(self.violations.values(), key=lambda violation: (-violation.count, violation.endpoint, violation.message))
+
+def request_params(record: dict, query: str, path_params: dict) -> dict:
+    body = record.get('params')
+    if not query and not path_params:
+        return body if type(body) == dict else {}
+    params = dict(path_params)
+    for name, values in urllib.parse.parse_qs(query, keep_blank_values=True).items():
+        params[name] = values[0] if len(values) == 1 else values
+    if type(body) == dict:
+        params.update(body)
+    return params
+
+def check_record(contracts: ContractSet, record, report: ContractReport, position):
+    if type(record) != dict or type(record.get('method')) != str or type(record.get('url')) != str:
+        report.skip(position)
+        return
+    report.requests += 1
+    method = record['method'].upper()
+    path = record['url']
+    query = ''
+    if '?' in path or '#' in path or '://' in path:
+        url = urllib.parse.urlsplit(path)
+        path, query = url.path, url.query
+    contract, path_params = contracts.match(method, path)
+    if contract == None:
+        report.add((method, normalize_path(path)), 'undocumented endpoint', position)
+        return
+    report.matched += 1
+    status = record.get('status')
+    if type(status) == HTTPStatus:
+        status = status.value
+    for message in contract.check(request_params(record, query, path_params), status):
+        report.add((contract.method, contract.url), message, position)
+
+DECODER = json.JSONDecoder()
+
+def check_line(contracts: ContractSet, line, report: ContractReport, position):
+    try:
+        record = DECODER.decode(line.decode('utf-8') if type(line) == bytes else line)
+    except ValueError:
+        report.skip(position)
+        return
+    check_record(contracts, record, report, position)
+
+def check_range(contracts: ContractSet, log: str, start: int = 0, end: int = None) -> ContractReport:
+    # checks the lines of log that start in [start, end), a range that starts
+    # inside a line begins with the next one
+    report = ContractReport(str(log))
+    if str(log).endswith(COMPRESSION_EXTENSIONS):
+        # compressed logs can't be seeked into, they are read as one range
+        with open_text(log) as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    check_line(contracts, line, report, f'line {number}')
+        return report
+    with open(log, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while end == None or position < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                check_line(contracts, line, report, position)
+            position += len(line)
+    return report
+
+_worker_contracts = None
+
+def _load_worker_contracts(src):
+    global _worker_contracts
+    _worker_contracts = ContractSet.load(src)
+
+def _check_job(job) -> ContractReport:
+    return check_range(_worker_contracts, *job)
+
+def split_logs(logs: list, chunk_size: int) -> list[tuple]:
+    # (log, start, end) byte ranges of about chunk_size bytes, in log order
+    jobs = []
+    for log in logs:
+        log = str(log)
+        size = os.path.getsize(log)
+        if log.endswith(COMPRESSION_EXTENSIONS) or size <= chunk_size:
+            jobs.append((log, 0, None))
+            continue
+        for start in range(0, size, chunk_size):
+            jobs.append((log, start, start + chunk_size))
+    return jobs
+
+def check_requests(src, logs: list, jobs: int = None, chunk_size: int = None) -> ContractReport:
+    # checks every recorded request in logs against the Sections in src
+    # (a Section JSON file or a directory of them), across jobs processes
+    if jobs == None:
+        jobs = os.cpu_count() or 1
+    if chunk_size == None:
+        total = sum(os.path.getsize(log) for log in logs)
+        chunk_size = min(max(total // (jobs * 4), 1 << 20), 64 << 20)
+    work = split_logs(logs, chunk_size)
+    report = ContractReport()
+    if jobs <= 1 or len(work) <= 1:
+        contracts = ContractSet.load(src)
+        for job in work:
+            report.merge(check_range(contracts, *job))
+        return report
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work)), initializer=_load_worker_contracts, initargs=(src,)) as executor:
+        for part in executor.map(_check_job, work):
+            report.merge(part)
+    return report
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+import json
+import os
+import socket
+import socketserver
+import threading
+
+from . import Section
+from .cache import file_stat
+from .files import atomic_write
+from .validate import validate_file
+
+class CacheEntry:
+    stat: tuple
+    section: Section
+    markdown: str
+
+    def __init__(self, stat: tuple, section: Section):
+        self.stat = stat
+        self.section = section
+        self.markdown = None
+
+class RenderDaemon:
+    # keeps loaded Sections and their rendered markdown in memory between
+    # requests, an entry is dropped as soon as the mtime or size of its
+    # source file changes, and the least recently used entries are dropped
+    # once there are more than max_entries
+    #
+    # requests and responses are dicts (one JSON object per line on the socket):
+    #     {'command': 'render', 'source': '/abs/teams.json'}
+    #         -> {'ok': True, 'markdown': '## Teams...'}
+    #     {'command': 'render', 'source': '/abs/teams.json', 'output': '/abs/teams.md'}
+    #         -> {'ok': True}
+    #     {'command': 'save', 'source': '/abs/teams.json', 'output': '/abs/teams.json.gz', 'normalized': True}
+    #         -> {'ok': True}
+    #     {'command': 'validate', 'source': '/abs/teams.json'}
+    #         -> {'ok': True} or {'ok': False, 'error': '2 problems', 'errors': [{'path': '$.title', 'message': ...}]}
+    #     {'command': 'stats'} -> {'ok': True, 'entries': 3, 'hits': 10, 'misses': 3}
+    #     {'command': 'ping'} and {'command': 'shutdown'} -> {'ok': True}
+    max_entries: int
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry(self, source: str) -> CacheEntry:
+        stat = file_stat(source)
+        if stat == None:
+            raise FileNotFoundError(f'No such file: {source}')
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry != None and entry.stat == stat:
+                self._entries.move_to_end(source)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # loaded without the lock so a slow file doesn't hold up every other request
+        # if two requests load the same file at once, the first one to finish is kept
+        loaded = CacheEntry(stat, Section.load_file(source))
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry == None or entry.stat != stat:
+                entry = loaded
+                self._entries[source] = entry
+            self._entries.move_to_end(source)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def markdown(self, source: str) -> str:
+        entry = self.entry(source)
+        if entry.markdown == None:
+            entry.markdown = entry.section.render_to_string()
+        return entry.markdown
+
+    def drop(self, source: str = None):
+        with self._lock:
+            if source == None:
+                self._entries.clear()
+            else:
+                self._entries.pop(source, None)
+
+    def handle(self, request: dict) -> dict:
+        command = request.get('command')
+        try:
+            if command in ('ping', 'shutdown'):
+                return {'ok': True}
+            elif command == 'render':
+                markdown = self.markdown(request['source'])
+                if request.get('output') == None:
+                    return {'ok': True, 'markdown': markdown}
+                with atomic_write(request['output']) as f:
+                    f.write(markdown)
+                return {'ok': True}
+            elif command == 'save':
+                self.entry(request['source']).section.save(request['output'], normalized=request.get('normalized', False))
+                return {'ok': True}
+            elif command == 'validate':
+                # a Section that is already loaded is valid, anything else is
+                # checked without loading it
+                with self._lock:
+                    entry = self._entries.get(request['source'])
+                if entry != None and entry.stat == file_stat(request['source']):
+                    return {'ok': True}
+                errors = validate_file(request['source'])
+                if errors:
+                    return {'ok': False, 'error': f'{len(errors)} problems', 'errors': [error.obj for error in errors]}
+                return {'ok': True}
+            elif command == 'drop':
+                self.drop(request.get('source'))
+                return {'ok': True}
+            elif command == 'stats':
+                return {'ok': True, 'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+            else:
+                return {'ok': False, 'error': f'Unknown command: {command}'}
+        except Exception as e:
+            return {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {'ok': False, 'error': f'Invalid request: {e}'}
+                request = {}
+            else:
+                response = self.server.daemon.handle(request)
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+            self.wfile.flush()
+            if request.get('command') == 'shutdown':
+                # shutdown() waits for serve_forever to return, so it can't run on this thread
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: RenderDaemon):
+        self.daemon = daemon
+        super().__init__(socket_path, RequestHandler)
+
+def remove_stale_socket(socket_path: str):
+    # a socket file left behind by a daemon that did not shut down cleanly is
+    # removed, but a running daemon is never replaced
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f'A daemon is already listening on {socket_path}')
+
+def serve(socket_path: str, max_entries: int = 1024):
+    remove_stale_socket(socket_path)
+    server = DaemonServer(socket_path, RenderDaemon(max_entries))
+    try:
+        os.chmod(socket_path, 0o600) # only the user who started the daemon can talk to it
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
@@ -0,0 +1,189 @@
+from . import Section
+
+# compares two versions of a Section through the digests of their nodes, a
+# subtree whose digest did not change is skipped without looking inside it
+#
+# usage:
+#     changes = diff(Section.load_file('old.json'), Section.load_file('new.json'))
+#     print(changelog(changes, 'Teams'))
+
+class Change:
+    # kind is 'added', 'removed' or 'changed'
+    # subject is 'endpoint', 'authentication', 'description', 'parameters',
+    # 'parameter', 'logic' or 'response'
+    # name is the parameter name or the response status, details say what
+    # changed, for example ['required: True -> False']
+    kind: str
+    subject: str
+    endpoint: tuple
+    name: str
+    details: list[str]
+
+    def __init__(self, kind: str, subject: str, endpoint: tuple, name: str = None, details: list[str] = None):
+        self.kind = kind
+        self.subject = subject
+        self.endpoint = endpoint
+        self.name = name
+        self.details = details if details != None else []
+
+    def __repr__(self) -> str:
+        # <Change: changed parameter "team_id" of GET /teams>
+        name = f' "{self.name}"' if self.name != None else ''
+        url, method = self.endpoint
+        return f'<Change: {self.kind} {self.subject}{name} of {method} {url}>'
+
+def _field_changes(old: dict, new: dict) -> list[str]:
+    # 'field: old -> new' for every field of two objs that differs
+    details = []
+    for key in list(old) + [key for key in new if key not in old]:
+        if old.get(key) != new.get(key):
+            details.append(f'{key}: {old.get(key)} -> {new.get(key)}')
+    return details
+
+def _diff_parameters(old, new, endpoint) -> list[Change]:
+    if old == None or new == None:
+        if old == new:
+            return []
+        return [Change('added' if old == None else 'removed', 'parameters', endpoint)]
+    if old.digest == new.digest:
+        return []
+
+    changes = []
+    if old.notes != new.notes:
+        changes.append(Change('changed', 'parameters', endpoint, details=[f'notes: {old.notes} -> {new.notes}']))
+    old_parameters = {parameter.name: parameter for parameter in old.parameters}
+    new_parameters = {parameter.name: parameter for parameter in new.parameters}
+    for name, parameter in old_parameters.items():
+        other = new_parameters.get(name)
+        if other == None:
+            changes.append(Change('removed', 'parameter', endpoint, name))
+        elif other.digest != parameter.digest:
+            changes.append(Change('changed', 'parameter', endpoint, name, _field_changes(parameter.obj, other.obj)))
+    for name in new_parameters:
+        if name not in old_parameters:
+            changes.append(Change('added', 'parameter', endpoint, name))
+    return changes
+
+def _diff_responses(old: list, new: list, endpoint) -> list[Change]:
+    # responses have no name, so the ones whose digest is only on one side are
+    # paired up by status, a pair is a changed response and the rest were
+    # added or removed
+    old_digests = {}
+    for response in old:
+        old_digests.setdefault(response.digest, []).append(response)
+    added = []
+    for response in new:
+        matching = old_digests.get(response.digest)
+        if matching:
+            matching.pop()
+        else:
+            added.append(response)
+    removed = [response for responses in old_digests.values() for response in responses]
+
+    changes = []
+    for response in removed:
+        replacement = next((other for other in added if other.status == response.status), None)
+        if replacement == None:
+            changes.append(Change('removed', 'response', endpoint, str(response)))
+        else:
+            added.remove(replacement)
+            changes.append(Change('changed', 'response', endpoint, str(response), _field_changes(response.obj, replacement.obj)))
+    for response in added:
+        changes.append(Change('added', 'response', endpoint, str(response)))
+    return changes
+
+def diff_subsection(old, new) -> list[Change]:
+    endpoint = (new.path.url, new.path.method)
+    if old.digest == new.digest:
+        return []
+    changes = []
+    if old.path.obj != new.path.obj:
+        changes.append(Change('changed', 'authentication', endpoint, details=_field_changes(old.path.obj, new.path.obj)))
+    if old.description != new.description:
+        changes.append(Change('changed', 'description', endpoint))
+    changes.extend(_diff_parameters(old.parameters, new.parameters, endpoint))
+    old_logic = old.logic.digest if old.logic != None else None
+    new_logic = new.logic.digest if new.logic != None else None
+    if old_logic != new_logic:
+        if old_logic == None or new_logic == None:
+            changes.append(Change('added' if old_logic == None else 'removed', 'logic', endpoint))
+        else:
+            changes.append(Change('changed', 'logic', endpoint))
+    changes.extend(_diff_responses(old.responses, new.responses, endpoint))
+    return changes
+
+def _check_unique(section: Section):
+    # an endpoint that is documented twice can't be matched up with the other
+    # version
+    if section.unique_paths:
+        return
+    seen = set()
+    for endpoint in section.paths:
+        if endpoint in seen:
+            url, method = endpoint
+            raise ValueError(f'"{section.title}" documents {method} {url} more than once, so it cannot be compared')
+        seen.add(endpoint)
+
+def diff(old: Section, new: Section) -> list[Change]:
+    # every change from old to new, endpoints are matched by url and method
+    # the digests are cached, so an unchanged Section is found without
+    # looking inside it, and a subsection's digest covers its path, so one
+    # whose digest is on both sides is the same endpoint and is skipped
+    if old.digest == new.digest:
+        return []
+    _check_unique(old)
+    _check_unique(new)
+    old_digests = {subsection.digest for subsection in old.subsections}
+    new_digests = {subsection.digest for subsection in new.subsections}
+    changes = []
+    for subsection in old.subsections:
+        if subsection.digest in new_digests:
+            continue
+        endpoint = (subsection.path.url, subsection.path.method)
+        other = new.get(endpoint)
+        if other == None:
+            changes.append(Change('removed', 'endpoint', endpoint))
+        else:
+            changes.extend(diff_subsection(subsection, other))
+    for subsection in new.subsections:
+        if subsection.digest in old_digests:
+            continue
+        endpoint = (subsection.path.url, subsection.path.method)
+        if old.get(endpoint) == None:
+            changes.append(Change('added', 'endpoint', endpoint))
+    return changes
+
+def _describe(change: Change) -> str:
+    # Added parameter `team_id`
+    # Changed response `400 BAD_REQUEST`: content: a -> b
+    subject = change.subject if change.name == None else f'{change.subject} `{change.name}`'
+    text = f'{change.kind.capitalize()} {subject}'
+    if change.details:
+        text += ': ' + '; '.join(change.details)
+    return text
+
+def changelog(changes: list[Change], title: str = None) -> str:
+    # the changes as markdown, added and removed endpoints first, then
+    # everything that changed inside the endpoints both versions have
+    heading = f'## Changelog: {title}\n\n' if title != None else '## Changelog\n\n'
+    if not changes:
+        return heading + 'No changes.\n'
+    out = [heading]
+    for kind in ('added', 'removed'):
+        endpoints = [change.endpoint for change in changes if change.subject == 'endpoint' and change.kind == kind]
+        if endpoints:
+            out.append(f'### {kind.capitalize()} endpoints\n')
+            out.extend(f'- `{method} {url}`\n' for url, method in endpoints)
+            out.append('\n')
+
+    changed = {}
+    for change in changes:
+        if change.subject != 'endpoint':
+            changed.setdefault(change.endpoint, []).append(change)
+    if changed:
+        out.append('### Changed endpoints\n')
+        for (url, method), endpoint_changes in changed.items():
+            out.append(f'#### `{method} {url}`\n')
+            out.extend(f'- {_describe(change)}\n' for change in endpoint_changes)
+            out.append('\n')
+    return ''.join(out)
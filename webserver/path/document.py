@@ -0,0 +1,214 @@
+from contextlib import ExitStack
+from functools import lru_cache
+import html
+import re
+
+from . import HTTPMethod
+from .blocks import DocumentBlock, DocumentHeader, document_block, document_header
+from .files import atomic_write, strip_compression
+from .render import CHECK, CROSS, RenderEngine, engine
+
+# a Section is walked once into the plain blocks of blocks.py, and any number
+# of backends turn the same blocks into their own format
+#
+# usage:
+#     markdown, page = render(section, MarkdownBackend(), HTMLBackend())
+#     render_files(section, {'teams.md': MarkdownBackend(), 'teams.html': HTMLBackend()})
+
+def iter_document(section):
+    # yields the DocumentHeader, then one DocumentBlock per subsection
+    multiple = len(section) > 1
+    yield document_header(section)
+    for s in section: # s = subsection
+        yield document_block(s, multiple)
+
+class Backend:
+    # turns the blocks of a document into text, one chunk per block
+    # a backend keeps no state between documents, so one can be reused
+    extension = ''
+
+    def begin(self, header: DocumentHeader) -> str:
+        raise NotImplementedError
+
+    def block(self, block: DocumentBlock) -> str:
+        raise NotImplementedError
+
+    def end(self) -> str:
+        return ''
+
+class MarkdownBackend(Backend):
+    # the markdown of Section.render, written by the RenderEngine from the same blocks
+    extension = '.md'
+
+    def __init__(self, engine: RenderEngine = engine):
+        self.engine = engine
+
+    def begin(self, header: DocumentHeader) -> str:
+        return self.engine.render_document_header(header)
+
+    def block(self, block: DocumentBlock) -> str:
+        return self.engine.render_document_block(block)
+
+CODE_SPAN = re.compile(r'`([^`]*)`')
+
+@lru_cache(maxsize=4096)
+def inline_html(text: str) -> str:
+    # escapes text and turns `code` spans into <code> elements
+    # contexts, types and descriptions repeat a lot, so the result is cached
+    return CODE_SPAN.sub(r'<code>\1</code>', html.escape(text))
+
+class HTMLBackend(Backend):
+    # a standalone HTML page
+    extension = '.html'
+    SYMBOLS = (CROSS, CHECK)
+
+    def _table(self, columns: tuple, rows) -> str:
+        out = ['<table>\n<thead><tr>', ''.join(f'<th>{column}</th>' for column in columns), '</tr></thead>\n<tbody>\n']
+        for row in rows:
+            out.append('<tr>' + ''.join(f'<td>{cell}</td>' for cell in row) + '</tr>\n')
+        out.append('</tbody>\n</table>\n')
+        return ''.join(out)
+
+    def begin(self, header: DocumentHeader) -> str:
+        symbols = self.SYMBOLS
+        title = inline_html(header.title)
+        rows = ((title, f'<code>{inline_html(url)}</code>', method, symbols[auth], symbols[master_auth]) for url, method, auth, master_auth in header.rows)
+        return (
+            f'<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>{title}</title></head>\n<body>\n'
+            f'<h2>{title}</h2>\n'
+        ) + self._table(('Title', 'Path', 'Method', 'Requires Authentication', 'Requires Master Authentication'), rows)
+
+    def block(self, block: DocumentBlock) -> str:
+        symbols = self.SYMBOLS
+        out = []
+        if block.multiple:
+            out.append(f'<h3>{block.method}</h3>\n')
+
+        description = block.description if block.description != None else RenderEngine.DEFAULT_DESCRIPTION
+        out.append(f'<h4>Description</h4>\n<p>{inline_html(description)}</p>\n')
+
+        if block.parameters != None:
+            if block.method == HTTPMethod.GET:
+                out.append('<h4>Query Parameters</h4>\n')
+            elif block.method == HTTPMethod.POST:
+                out.append('<h4>Request Parameters</h4>\n<p>This path only accepts JSON data. When sending a request, the <code>Content-Type</code> header must be set to <code>application/json</code>, and the request body must be a JSON string that contains all the parameters listed below.</p>\n')
+            rows = (
+                (
+                    f'<code>{inline_html(name)}</code>',
+                    f'<code>{inline_html(str(value_type))}</code>',
+                    symbols[required],
+                    'N/A' if default == None else f'<code>{inline_html(str(default))}</code>',
+                    inline_html(description if description != None else 'No description.')
+                )
+                for name, value_type, required, default, description in block.parameters
+            )
+            out.append(self._table(('Name', 'Value Type', 'Required', 'Default Value', 'Description'), rows))
+
+        if block.logic != None:
+            out.append('<h4>Logic</h4>\n<ol>\n')
+            out.extend(f'<li>{inline_html(line)}</li>\n' for line in block.logic)
+            out.append('</ol>\n')
+            if block.notes != None:
+                out.append(f'<p>{inline_html(block.notes)}</p>\n')
+
+        out.append('<h4>Possible Responses</h4>\n')
+        rows = (
+            (block.method, status.value, status.name, inline_html(content if content != None else 'No content'), inline_html(context if context != None else 'No context'))
+            for status, content, context in block.responses
+        )
+        out.append(self._table(('Method', 'Status Code', 'Status', 'Content', 'Context'), rows))
+        return ''.join(out)
+
+    def end(self) -> str:
+        return '</body>\n</html>\n'
+
+class TextBackend(Backend):
+    # plain text with the tables lined up in columns
+    extension = '.txt'
+    SYMBOLS = ('no', 'yes')
+
+    def _table(self, columns: tuple, rows: list[tuple]) -> str:
+        rows = [tuple(str(cell) for cell in row) for row in rows]
+        widths = [max([len(column)] + [len(row[index]) for row in rows]) for index, column in enumerate(columns)]
+        lines = [columns, tuple('-' * width for width in widths)] + rows
+        return ''.join('  '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() + '\n' for line in lines)
+
+    def begin(self, header: DocumentHeader) -> str:
+        symbols = self.SYMBOLS
+        rows = [(url, method, symbols[auth], symbols[master_auth]) for url, method, auth, master_auth in header.rows]
+        return f'{header.title}\n{"=" * len(header.title)}\n\n' + self._table(('Path', 'Method', 'Authentication', 'Master Authentication'), rows) + '\n'
+
+    def block(self, block: DocumentBlock) -> str:
+        symbols = self.SYMBOLS
+        out = []
+        if block.multiple:
+            out.append(f'{block.method}\n{"-" * len(str(block.method))}\n\n')
+
+        out.append((block.description if block.description != None else RenderEngine.DEFAULT_DESCRIPTION) + '\n\n')
+
+        if block.parameters != None:
+            if block.method == HTTPMethod.GET:
+                out.append('Query parameters:\n')
+            elif block.method == HTTPMethod.POST:
+                out.append('Request parameters (sent as a JSON body):\n')
+            rows = [
+                (name, value_type, symbols[required], 'N/A' if default == None else default, description if description != None else 'No description.')
+                for name, value_type, required, default, description in block.parameters
+            ]
+            out.append(self._table(('Name', 'Type', 'Required', 'Default', 'Description'), rows) + '\n')
+
+        if block.logic != None:
+            out.append('Logic:\n')
+            out.extend(f'  {index}. {line}\n' for index, line in enumerate(block.logic, 1))
+            if block.notes != None:
+                out.append(f'\n{block.notes}\n')
+            out.append('\n')
+
+        out.append('Possible responses:\n')
+        rows = [
+            (f'{status.value} {status.name}', content if content != None else 'No content', context if context != None else 'No context')
+            for status, content, context in block.responses
+        ]
+        out.append(self._table(('Status', 'Content', 'Context'), rows) + '\n')
+        return ''.join(out)
+
+BACKENDS = {
+    MarkdownBackend.extension: MarkdownBackend,
+    HTMLBackend.extension: HTMLBackend,
+    TextBackend.extension: TextBackend
+}
+
+def backend_for(path) -> Backend:
+    # teams.html -> HTMLBackend, compressed outputs (teams.html.gz) work too
+    for extension, backend in BACKENDS.items():
+        if strip_compression(path).endswith(extension):
+            return backend()
+    raise ValueError(f'No backend for {path}, the extension must be one of {", ".join(BACKENDS)}')
+
+def iter_render(section, *backends):
+    # walks the section once and yields a tuple with the next chunk of every backend
+    document = iter_document(section)
+    header = next(document)
+    yield tuple(backend.begin(header) for backend in backends)
+    for block in document:
+        yield tuple(backend.block(block) for backend in backends)
+    yield tuple(backend.end() for backend in backends)
+
+def render(section, *backends) -> list[str]:
+    outputs = [[] for _ in backends]
+    for chunks in iter_render(section, *backends):
+        for output, chunk in zip(outputs, chunks):
+            output.append(chunk)
+    return [''.join(output) for output in outputs]
+
+def render_files(section, outputs: dict):
+    # renders into every path in one pass, outputs maps each path to its
+    # Backend (or None to pick one from the extension)
+    # every file only replaces its path once all of them were rendered
+    paths = list(outputs)
+    backends = [outputs[path] if outputs[path] != None else backend_for(path) for path in paths]
+    with ExitStack() as stack:
+        files = [stack.enter_context(atomic_write(path)) for path in paths]
+        for chunks in iter_render(section, *backends):
+            for f, chunk in zip(files, chunks):
+                f.write(chunk)
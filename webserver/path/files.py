@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+
+# the compression of a file is picked from its extension, for example
+# teams.json.gz is gzip and teams.json.xz is xz
+COMPRESSION_EXTENSIONS = ('.gz', '.xz', '.lzma', '.bz2')
+
+# read once so files written through a temporary file get the same
+# permissions a plain open() would have given them
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+def strip_compression(path) -> str:
+    # teams.json.gz -> teams.json
+    path = str(path)
+    for extension in COMPRESSION_EXTENSIONS:
+        if path.endswith(extension):
+            return path[:-len(extension)]
+    return path
+
+def open_text(path, mode: str = 'r'):
+    path = str(path)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    elif path.endswith('.xz'):
+        return lzma.open(path, mode + 't', encoding='utf-8')
+    elif path.endswith('.lzma'):
+        return lzma.open(path, mode + 't', format=lzma.FORMAT_ALONE, encoding='utf-8')
+    elif path.endswith('.bz2'):
+        return bz2.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def open_binary(path, mode: str = 'r'):
+    path = str(path)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 'b')
+    elif path.endswith('.xz'):
+        return lzma.open(path, mode + 'b')
+    elif path.endswith('.lzma'):
+        return lzma.open(path, mode + 'b', format=lzma.FORMAT_ALONE)
+    elif path.endswith('.bz2'):
+        return bz2.open(path, mode + 'b')
+    return open(path, mode + 'b')
+
+def _compressor(raw, path: str):
+    # wraps the binary file in the compression its extension asks for, without
+    # taking ownership of it so it can still be synced after the compressor is closed
+    if path.endswith('.gz'):
+        # no timestamp in the header, so the same content always gives the same bytes
+        return gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+    elif path.endswith('.xz'):
+        return lzma.LZMAFile(raw, 'wb')
+    elif path.endswith('.lzma'):
+        return lzma.LZMAFile(raw, 'wb', format=lzma.FORMAT_ALONE)
+    elif path.endswith('.bz2'):
+        return bz2.BZ2File(raw, 'wb')
+    return None
+
+@contextmanager
+def atomic_write(path, sync: bool = False, binary: bool = False):
+    # yields a text file (or a binary one with binary) that replaces path only
+    # once everything was written, so a crash part way through leaves the old
+    # file (or no file) instead of a truncated one
+    # with sync, the data is on disk before the rename, which also protects
+    # against power loss
+    path = str(path)
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            compressor = _compressor(raw, path)
+            if binary:
+                yield compressor if compressor != None else raw
+            else:
+                f = io.TextIOWrapper(compressor if compressor != None else raw, encoding='utf-8')
+                yield f
+                f.flush()
+                f.detach()
+            if compressor != None:
+                compressor.close()
+            if sync:
+                raw.flush()
+                os.fsync(raw.fileno())
+        os.chmod(temp_path, 0o666 & ~UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,222 @@
+import heapq
+import json
+import os
+import tempfile
+import urllib.parse
+
+from . import HTTPPath
+from .build import discover, output_path
+from .files import atomic_write, open_text
+from .render import CHECK, CROSS
+from .stream import iter_section_records
+
+class ExternalSorter:
+    # sorts more items than fit in memory: items are collected in runs of
+    # run_size, every full run is sorted and spilled to a temporary file, and
+    # iterating merges the runs back together
+    # at most fan_in runs are open at once, more runs are first merged into
+    # bigger ones, so only about run_size + fan_in items are ever in memory
+    # items must be tuples of JSON values, they are compared as tuples
+    #
+    # usage:
+    #     with ExternalSorter() as sorter:
+    #         for item in items:
+    #             sorter.add(item)
+    #         for item in sorter:
+    #             ...
+    run_size: int
+    fan_in: int
+
+    def __init__(self, run_size: int = 100000, fan_in: int = 64, directory: str = None):
+        self.run_size = run_size
+        self.fan_in = fan_in
+        self._directory = tempfile.TemporaryDirectory(prefix='doccreator-sort-', dir=directory)
+        self._buffer = []
+        self._runs = []
+        self._written = 0
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self._buffer = []
+        self._runs = []
+        self._directory.cleanup()
+
+    def add(self, item: tuple):
+        self._buffer.append(item)
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _write_run(self, items) -> str:
+        path = os.path.join(self._directory.name, f'run-{self._written}.jsonl')
+        self._written += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item))
+                f.write('\n')
+        return path
+
+    def _spill(self):
+        self._buffer.sort()
+        self._runs.append(self._write_run(self._buffer))
+        self._buffer = []
+
+    def _read_run(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield tuple(json.loads(line))
+
+    def __iter__(self):
+        if not self._runs:
+            # everything fit in memory, nothing was written
+            self._buffer.sort()
+            yield from self._buffer
+            return
+        if self._buffer:
+            self._spill()
+        while len(self._runs) > self.fan_in:
+            merged = []
+            for start in range(0, len(self._runs), self.fan_in):
+                group = self._runs[start:start + self.fan_in]
+                merged.append(self._write_run(heapq.merge(*(self._read_run(path) for path in group))))
+                for path in group:
+                    os.unlink(path)
+            self._runs = merged
+        yield from heapq.merge(*(self._read_run(path) for path in self._runs))
+
+def iter_paths(source):
+    # yields the title of a source first, then the HTTPPath of every subsection
+    # one at a time
+    records = iter_section_records(source)
+    try:
+        title = next(records)
+    except ValueError:
+        # a hand written file with the subsections before the title cannot be
+        # streamed, so it is read in one go
+        with open_text(source) as f:
+            obj = json.loads(f.read())
+        yield obj['title']
+        for record in obj['subsections']:
+            yield HTTPPath.load(record['path'])
+        return
+    yield title
+    for record in records:
+        yield HTTPPath.load(record['path'])
+
+def heading_anchor(method, occurrence: int) -> str:
+    # the anchor a markdown renderer gives the n-th "### GET" heading of a
+    # page: #get, #get-1, #get-2 ...
+    anchor = str(method).lower()
+    return anchor if occurrence == 0 else f'{anchor}-{occurrence}'
+
+class IndexResult:
+    index: str
+    sections: int
+    endpoints: int
+    errors: list[tuple]
+
+    def __init__(self, index: str, sections: int = 0, endpoints: int = 0, errors: list[tuple] = None):
+        self.index = index
+        self.sections = sections
+        self.endpoints = endpoints
+        self.errors = errors if errors != None else []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def __repr__(self) -> str:
+        # <IndexResult: "out/index.md" with 1200 endpoints in 40 sections>
+        return f'<IndexResult: "{self.index}" with {self.endpoints} endpoints in {self.sections} sections>'
+
+class SiteIndexer:
+    # writes one markdown page that lists every Section of a site (sorted by
+    # title) and every endpoint (sorted by url and method), linked to the files
+    # build renders them to
+    #
+    # sources are streamed one subsection at a time and both lists go through
+    # an ExternalSorter, so the memory used stays the same no matter how many
+    # endpoints there are
+    # a source that fails part way through is reported in IndexResult.errors,
+    # the endpoints read from it before it failed stay in the index
+    SYMBOLS = (CROSS, CHECK)
+
+    def __init__(self, src, out, index = None, run_size: int = 100000, spill_dir: str = None):
+        self.src = src
+        self.out = out
+        self.index = index if index != None else os.path.join(out, 'index.md')
+        self.run_size = run_size
+        self.spill_dir = spill_dir
+
+    def link(self, source) -> str:
+        # the rendered file of source, relative to the index page
+        output = os.path.abspath(output_path(source, self.src, self.out))
+        relative = os.path.relpath(output, os.path.dirname(os.path.abspath(self.index)))
+        return urllib.parse.quote(relative.replace(os.sep, '/'))
+
+    def _collect(self, sections: ExternalSorter, endpoints: ExternalSorter, report) -> list[tuple]:
+        errors = []
+        for source in discover(self.src):
+            link = self.link(source)
+            count = 0
+            first = None
+            occurrences = {}
+            try:
+                paths = iter_paths(source)
+                title = next(paths)
+                sections.add((title, link))
+                for path in paths:
+                    method = str(path.method)
+                    occurrence = occurrences.get(method, 0)
+                    occurrences[method] = occurrence + 1
+                    row = (path.url, method, title, f'{link}#{heading_anchor(method, occurrence)}', bool(path.requireAuth), bool(path.requireMasterAuth))
+                    count += 1
+                    if count == 1:
+                        # a page with a single subsection has no method headings,
+                        # which is only known once the page ends or a second one shows up
+                        first = row
+                        continue
+                    if count == 2:
+                        endpoints.add(first)
+                    endpoints.add(row)
+                if count == 1:
+                    endpoints.add(first[:3] + (link,) + first[4:])
+                first = None
+            except Exception as e:
+                if count == 1 and first != None:
+                    # the source ended in an error, not after its only subsection
+                    endpoints.add(first)
+                error = f'{type(e).__name__}: {e}'
+                errors.append((source, error))
+                if report != None:
+                    report(source, error)
+        return errors
+
+    def write(self, report = None) -> IndexResult:
+        # report is called with (source, error) for every source that failed
+        symbols = self.SYMBOLS
+        directory = os.path.dirname(self.index)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with ExternalSorter(self.run_size, directory=self.spill_dir) as sections, ExternalSorter(self.run_size, directory=self.spill_dir) as endpoints:
+            errors = self._collect(sections, endpoints, report)
+            with atomic_write(self.index) as f:
+                f.write('## Contents\n\n')
+                for title, link in sections:
+                    f.write(f'- [{title}]({link})\n')
+                f.write('\n## Endpoints\n\n')
+                f.write('| Path | Method | Section | Requires Authentication | Requires Master Authentication |\n')
+                f.write('|---|---|---|---|---|\n')
+                for url, method, title, link, auth, master_auth in endpoints:
+                    f.write(f'| `{url}` | [{method}]({link}) | {title} | {symbols[auth]} | {symbols[master_auth]} |\n')
+            return IndexResult(self.index, sections.count, endpoints.count, errors)
+
+def write_index(src, out, index = None, run_size: int = 100000, spill_dir: str = None, report = None) -> IndexResult:
+    return SiteIndexer(src, out, index, run_size, spill_dir).write(report)
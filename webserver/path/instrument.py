@@ -0,0 +1,108 @@
+import time
+
+class NullStage:
+    # handed out while instrumentation is disabled, so an instrumented block
+    # costs one method call and nothing else
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_STAGE = NullStage()
+
+class Stage:
+    def __init__(self, instrumentation, name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._instrumentation.record_time(self._name, time.perf_counter() - self._start)
+        return False
+
+class Instrumentation:
+    # opt-in timers and counters for the load, serialize and render stages
+    #
+    # usage:
+    #     instrumentation.enable()
+    #     Section.load_file('teams.json').render('teams.md')
+    #     print(instrumentation.summary())
+    #
+    # observers are called with ('time', stage, seconds) and ('count', name, amount)
+    # as soon as something is recorded
+    enabled: bool
+    timers: dict[str, list]
+    counters: dict[str, int]
+    observers: list
+
+    def __init__(self):
+        self.enabled = False
+        self.observers = []
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timers = {} # stage -> [calls, seconds]
+        self.counters = {}
+
+    def add_observer(self, callback):
+        self.observers.append(callback)
+
+    def remove_observer(self, callback):
+        self.observers.remove(callback)
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return NULL_STAGE
+        return Stage(self, name)
+
+    def record_time(self, name: str, seconds: float):
+        timer = self.timers.get(name)
+        if timer == None:
+            self.timers[name] = [1, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+        for observer in self.observers:
+            observer('time', name, seconds)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        for observer in self.observers:
+            observer('count', name, amount)
+
+    def snapshot(self) -> dict:
+        # plain data that can be sent between processes and merged
+        return {
+            'timers': {name: list(timer) for name, timer in self.timers.items()},
+            'counters': dict(self.counters)
+        }
+
+    def merge(self, snapshot: dict):
+        for name, (calls, seconds) in snapshot['timers'].items():
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += calls
+            timer[1] += seconds
+        for name, amount in snapshot['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> str:
+        lines = [f'{"stage":<20} {"calls":>8} {"total ms":>10} {"mean ms":>10}']
+        for name, (calls, seconds) in sorted(self.timers.items(), key=lambda item: -item[1][1]):
+            lines.append(f'{name:<20} {calls:>8} {seconds * 1000:>10.2f} {seconds * 1000 / calls:>10.3f}')
+        if self.counters:
+            lines.append('')
+            for name, amount in sorted(self.counters.items()):
+                lines.append(f'{name:<20} {amount:>8}')
+        return '\n'.join(lines)
+
+instrumentation = Instrumentation()
@@ -0,0 +1,300 @@
+from http import HTTPStatus
+import json
+import os
+import re
+import tempfile
+
+from . import HTTPMethod, HTTPPath, Parameter, Parameters, Response, Section, Subsection
+from .files import atomic_write, open_text
+from .render import engine
+from .stream import JSONStreamReader, iter_section_records
+
+# turns the operations of an OpenAPI 3 JSON document into Sections, one
+# Section per tag (the first tag of an operation, or DEFAULT_TAG)
+#
+# the document is streamed twice with JSONStreamReader: once for the
+# components and the global security, which $refs can point into, and once
+# for the paths, where only one path item is in memory at a time
+# every operation is written to a JSONL file per tag as soon as it is read, so
+# the memory used does not depend on the size of the document, and the JSONL
+# files are then turned into Section JSON and markdown files one record at a time
+#
+# usage:
+#     with OpenAPIImporter('openapi.json') as importer:
+#         for section in importer.sections():
+#             section.render(f'{section.title}.md')
+#     import_openapi('openapi.json', 'docs', render=True)
+
+DEFAULT_TAG = 'default'
+BODY_CONTENT_TYPE = 'application/json'
+
+class ImportResult:
+    sections: dict[str, str]
+    operations: int
+    skipped: list[str]
+
+    def __init__(self, sections: dict[str, str] = None, operations: int = 0, skipped: list[str] = None):
+        self.sections = sections if sections != None else {} # title -> Section JSON file
+        self.operations = operations
+        self.skipped = skipped if skipped != None else []
+
+    def __repr__(self) -> str:
+        # <ImportResult: 120 operations in 8 sections, 3 skipped>
+        return f'<ImportResult: {self.operations} operations in {len(self.sections)} sections, {len(self.skipped)} skipped>'
+
+def file_name(title: str) -> str:
+    # a tag like "Teams & Scores" becomes Teams_Scores
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', title).strip('_') or DEFAULT_TAG
+
+class OpenAPIImporter:
+    # operations with a method HTTPMethod does not have (PUT, DELETE, ...),
+    # parameters that are not in the query or the path (header, cookie) and
+    # response codes that are not a single HTTPStatus (2XX, default) are
+    # skipped, skipped lists them
+    # at most max_open spill files are kept open at once
+    path: str
+    skipped: list[str]
+    operations: int
+
+    def __init__(self, path, spill_dir: str = None, max_open: int = 64):
+        self.path = str(path)
+        self.max_open = max_open
+        self.skipped = []
+        self.operations = 0
+        self._directory = tempfile.TemporaryDirectory(prefix='doccreator-openapi-', dir=spill_dir)
+        self._components = {}
+        self._security = []
+        self._spills = {} # tag -> spill file
+        self._open = {} # tag -> open spill file, oldest first
+        self._read = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        for f in self._open.values():
+            f.close()
+        self._open = {}
+        self._directory.cleanup()
+
+    # first pass
+
+    def _read_components(self):
+        with open_text(self.path) as f:
+            reader = JSONStreamReader(f)
+            for key in reader.items():
+                if key == 'components':
+                    self._components = reader.value()
+                elif key == 'security':
+                    self._security = reader.value()
+                else:
+                    reader.skip()
+
+    def resolve(self, obj):
+        # follows $refs into the components, other references are left as they are
+        seen = 0
+        while type(obj) == dict and '$ref' in obj and seen < 32:
+            reference = obj['$ref']
+            if not reference.startswith('#/components/'):
+                return obj
+            target = self._components
+            for part in reference[len('#/components/'):].split('/'):
+                part = part.replace('~1', '/').replace('~0', '~')
+                if type(target) != dict or part not in target:
+                    return obj
+                target = target[part]
+            obj = target
+            seen += 1
+        return obj
+
+    # mapping
+
+    def value_type(self, schema) -> str:
+        # integer, string, Team (for a $ref to #/components/schemas/Team), Team[] ...
+        if type(schema) != dict:
+            return 'null'
+        if '$ref' in schema:
+            return schema['$ref'].rsplit('/', 1)[-1]
+        schema_type = schema.get('type')
+        if type(schema_type) == list: # OpenAPI 3.1 allows ['string', 'null']
+            schema_type = next((name for name in schema_type if name != 'null'), 'null')
+        if schema_type == 'array':
+            return self.value_type(schema.get('items')) + '[]'
+        if schema_type == None:
+            for combined in ('oneOf', 'anyOf', 'allOf'):
+                if combined in schema:
+                    return ' | '.join(self.value_type(option) for option in schema[combined])
+            return 'object'
+        return schema_type
+
+    def _parameter(self, obj) -> Parameter:
+        obj = self.resolve(obj)
+        schema = self.resolve(obj.get('schema', {}))
+        required = bool(obj.get('required', False))
+        default = None if required or type(schema) != dict else schema.get('default')
+        return Parameter(obj['name'], self.value_type(obj.get('schema')), required, default, obj.get('description'))
+
+    def _body_parameters(self, body) -> list[Parameter]:
+        # one Parameter per property of a JSON request body
+        body = self.resolve(body)
+        media = body.get('content', {}).get(BODY_CONTENT_TYPE)
+        if media == None:
+            return []
+        schema = self.resolve(media.get('schema', {}))
+        if type(schema) != dict:
+            return []
+        required = set(schema.get('required', []))
+        parameters = []
+        for name, property_schema in schema.get('properties', {}).items():
+            resolved = self.resolve(property_schema)
+            default = None if name in required or type(resolved) != dict else resolved.get('default')
+            description = resolved.get('description') if type(resolved) == dict else None
+            parameters.append(Parameter(name, self.value_type(property_schema), name in required, default, description))
+        return parameters
+
+    def _responses(self, responses, operation_name: str) -> list[Response]:
+        mapped = []
+        for code, response in responses.items():
+            try:
+                status = HTTPStatus(int(code))
+            except ValueError:
+                self.skipped.append(f'response {code} of {operation_name}')
+                continue
+            response = self.resolve(response)
+            content = None
+            media = response.get('content', {}).get(BODY_CONTENT_TYPE)
+            if media != None and 'example' in media:
+                content = media['example']
+                if type(content) != dict:
+                    content = f'`{json.dumps(content)}`'
+            mapped.append(Response(status, content, response.get('description')))
+        return mapped
+
+    def subsection(self, url: str, method: str, operation: dict, shared_parameters: list) -> Subsection:
+        # shared_parameters are the parameters of the path item, an operation
+        # parameter with the same name and location replaces a shared one
+        http_method = HTTPMethod(method.upper())
+        parameters = {}
+        for obj in list(shared_parameters) + list(operation.get('parameters', [])):
+            obj = self.resolve(obj)
+            parameters[(obj.get('in'), obj.get('name'))] = obj
+        mapped = []
+        for (location, name), obj in parameters.items():
+            if location in ('query', 'path'):
+                mapped.append(self._parameter(obj))
+            else:
+                self.skipped.append(f'{location} parameter {name} of {method.upper()} {url}')
+        if http_method == HTTPMethod.POST and 'requestBody' in operation:
+            mapped = self._body_parameters(operation['requestBody']) or mapped
+
+        security = operation.get('security', self._security)
+        path = HTTPPath(url, http_method, requireAuth=any(len(requirement) > 0 for requirement in security), requireMasterAuth=bool(operation.get('x-require-master-auth', False)))
+        description = operation.get('description') or operation.get('summary')
+        responses = self._responses(operation.get('responses', {}), f'{method.upper()} {url}')
+        return Subsection(path, Parameters(mapped) if mapped else None, None, responses, description)
+
+    # second pass
+
+    def _spill(self, tag: str, subsection: Subsection):
+        f = self._open.pop(tag, None)
+        if f == None:
+            path = self._spills.get(tag)
+            if path == None:
+                path = os.path.join(self._directory.name, f'{len(self._spills)}.jsonl')
+                self._spills[tag] = path
+                f = open(path, 'w', encoding='utf-8')
+                f.write(json.dumps({'title': tag}) + '\n')
+            else:
+                f = open(path, 'a', encoding='utf-8')
+            if len(self._open) >= self.max_open:
+                oldest = next(iter(self._open))
+                self._open.pop(oldest).close()
+        self._open[tag] = f # most recently used last
+        f.write(json.dumps(subsection.obj) + '\n')
+
+    def read(self):
+        # reads the whole document, every operation ends up in the spill file of its tag
+        if self._read:
+            return
+        self._read_components()
+        with open_text(self.path) as f:
+            reader = JSONStreamReader(f)
+            for key in reader.items():
+                if key != 'paths':
+                    reader.skip()
+                    continue
+                for url in reader.items():
+                    item = self.resolve(reader.value()) # one path item at a time
+                    shared_parameters = item.get('parameters', [])
+                    for method, operation in item.items():
+                        if method in ('parameters', 'servers', 'summary', 'description', '$ref') or method.startswith('x-'):
+                            continue
+                        if method.upper() not in HTTPMethod.__members__:
+                            self.skipped.append(f'{method.upper()} {url}')
+                            continue
+                        tags = operation.get('tags') or [DEFAULT_TAG]
+                        self._spill(tags[0], self.subsection(url, method, operation, shared_parameters))
+                        self.operations += 1
+        for f in self._open.values():
+            f.close()
+        self._open = {}
+        self._read = True
+
+    @property
+    def tags(self) -> list[str]:
+        self.read()
+        return list(self._spills)
+
+    def records(self, tag: str):
+        # the title, then the subsection obj of every operation of tag
+        self.read()
+        return iter_section_records(self._spills[tag])
+
+    def sections(self):
+        # yields one Section per tag, only one of them is in memory at a time
+        for tag in self.tags:
+            records = self.records(tag)
+            title = next(records)
+            yield Section(title, [Subsection.load(record) for record in records])
+
+    def save(self, tag: str, path):
+        # writes the Section of tag like Section.save would, one subsection at a time
+        records = self.records(tag)
+        with atomic_write(path) as f:
+            f.write('{"title": ' + json.dumps(next(records)) + ', "subsections": [')
+            for position, record in enumerate(records):
+                if position > 0:
+                    f.write(', ')
+                f.write(json.dumps(record))
+            f.write(']}')
+
+    def render(self, tag: str, path):
+        # writes the markdown of tag, one subsection at a time
+        self.read()
+        with atomic_write(path) as f:
+            for chunk in engine.iter_render_source(self._spills[tag]):
+                f.write(chunk)
+
+def import_openapi(spec, out, render: bool = False, spill_dir: str = None) -> ImportResult:
+    # writes <tag>.json into out for every tag, and <tag>.md as well with render
+    os.makedirs(out, exist_ok=True)
+    result = ImportResult()
+    with OpenAPIImporter(spec, spill_dir) as importer:
+        names = set()
+        for tag in importer.tags:
+            name = file_name(tag)
+            while name in names: # tags that only differ in punctuation
+                name += '_'
+            names.add(name)
+            path = os.path.join(out, name + '.json')
+            importer.save(tag, path)
+            if render:
+                importer.render(tag, os.path.join(out, name + '.md'))
+            result.sections[tag] = path
+        result.operations = importer.operations
+        result.skipped = importer.skipped
+    return result
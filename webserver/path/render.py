@@ -0,0 +1,159 @@
+from . import Frozen, HTTPMethod, HTTPPath, Subsection
+from .blocks import DocumentBlock, DocumentHeader, document_block, document_header, header_row
+from .stream import iter_section_records
+
+# bump whenever a change to the engine changes the rendered markdown, so build
+# caches know that outputs made by an older version are stale
+RENDERER_VERSION = 1
+
+CHECK = '✅'
+CROSS = '❌'
+
+class RenderEngine:
+    # every fixed piece of the markdown is built once here, so rendering a row
+    # only has to fill in the values that actually change between rows
+    SYMBOLS = (CROSS, CHECK) # indexed by bool
+
+    SUMMARY_HEADER = (
+        "| Title | Path | Method | Requires Authentication | Requires Master Authentication |\n"
+        "|---|---|---|---|---|\n"
+    )
+    PARAMETER_TABLE_HEADER = (
+        '| Name | Value Type | Required | Default Value | Description |\n'
+        '|---|---|---|---|---|\n'
+    )
+    QUERY_PARAMETERS_HEADER = '#### Query Parameters\n' + PARAMETER_TABLE_HEADER
+    REQUEST_PARAMETERS_HEADER = (
+        '#### Request Parameters\n'
+        'This path only accepts JSON data. When sending a request, the `Content-Type` header must be set to `application/json`, and the request body must be a JSON string that contains all the parameters listed below.\n'
+        '\n'
+    ) + PARAMETER_TABLE_HEADER
+    RESPONSES_HEADER = (
+        '#### Possible Responses\n'
+        '| Method | Status Code | Status | Content | Context |\n'
+        '|---|---|---|---|---|\n'
+    )
+    DESCRIPTION_HEADER = '#### Description\n\n'
+    DEFAULT_DESCRIPTION = 'Description for the subsection goes here.'
+    LOGIC_HEADER = '#### Logic\n'
+
+    def __init__(self):
+        self._response_prefixes = {}
+
+    def _response_prefix(self, method, status):
+        # "| GET | 400 | BAD_REQUEST | " only depends on the method and the status
+        key = (method, status)
+        prefix = self._response_prefixes.get(key)
+        if prefix == None:
+            prefix = f'| {method} | {status.value} | {status.name} | '
+            self._response_prefixes[key] = prefix
+        return prefix
+
+    def _summary_row(self, title_link, row) -> str:
+        url, method, auth, master_auth = row
+        symbols = self.SYMBOLS
+        return f"{title_link}{url}` | [{method}]() | {symbols[auth]} | {symbols[master_auth]} |\n"
+
+    def render_document_header(self, header: DocumentHeader) -> str:
+        title_link = f'| [{header.title}]() | `'
+        out = [f"## {header.title}\n", "\n", self.SUMMARY_HEADER]
+        for row in header.rows:
+            out.append(self._summary_row(title_link, row))
+        out.append('\n')
+        return ''.join(out)
+
+    def render_document_block(self, block: DocumentBlock) -> str:
+        symbols = self.SYMBOLS
+        method = block.method
+        out = []
+
+        if block.multiple:
+            out.append(f'### {method}\n\n')
+
+        out.append(self.DESCRIPTION_HEADER)
+        out.append(block.description if block.description != None else self.DEFAULT_DESCRIPTION)
+        out.append('\n')
+
+        if block.parameters != None:
+            if method == HTTPMethod.GET:
+                out.append(self.QUERY_PARAMETERS_HEADER)
+            elif method == HTTPMethod.POST:
+                out.append(self.REQUEST_PARAMETERS_HEADER)
+
+            for name, value_type, required, default, description in block.parameters:
+                default = 'N/A' if required else f"`{default}`"
+                description = description if description != None else "No description."
+                out.append(f'| `{name}` | `{value_type}` | {symbols[required]} | {default} | {description} |\n')
+            out.append('\n')
+
+        if block.logic != None:
+            out.append(self.LOGIC_HEADER)
+            for index, line in enumerate(block.logic, 1):
+                out.append(f'{index}. {line}\n')
+            if block.notes != None:
+                out.append('\n')
+                out.append(block.notes + '\n')
+            out.append('\n')
+
+        out.append(self.RESPONSES_HEADER)
+        for status, content, context in block.responses:
+            content = content if content != None else "No content"
+            context = context if context != None else "No context"
+            out.append(f'{self._response_prefix(method, status)}{content} | {context} |\n')
+
+        return ''.join(out)
+
+    def render_header(self, section) -> str:
+        return self.render_document_header(document_header(section))
+
+    def render_subsection(self, subsection, multiple: bool = False) -> str:
+        # a frozen subsection can't change, so it keeps its markdown and every
+        # variant of a Section that shares it renders it only once
+        if isinstance(subsection, Frozen):
+            rendered = subsection._rendered
+            if rendered != None and rendered[0] is self and rendered[1] == multiple:
+                return rendered[2]
+            markdown = self.render_document_block(document_block(subsection, multiple))
+            subsection._rendered = (self, multiple, markdown)
+            return markdown
+        return self.render_document_block(document_block(subsection, multiple))
+
+    def iter_render(self, section):
+        # yields the title and summary table first, then one chunk per subsection
+        multiple = len(section) > 1
+        yield self.render_header(section)
+        for s in section: # s = subsection
+            yield self.render_subsection(s, multiple)
+
+    def iter_render_source(self, path, rows_per_chunk: int = 256):
+        # renders a JSON/JSONL section file without loading the whole Section
+        # the summary table needs every path before the first subsection can be
+        # written, so the source is read twice: once for the paths and once for
+        # the subsections themselves, and only one subsection is in memory at a time
+        records = iter_section_records(path)
+        title = next(records)
+        title_link = f'| [{title}]() | `'
+        out = [f"## {title}\n", "\n", self.SUMMARY_HEADER]
+        count = 0
+        for record in records:
+            out.append(self._summary_row(title_link, header_row(HTTPPath.load(record['path']))))
+            count += 1
+            if len(out) >= rows_per_chunk:
+                yield ''.join(out)
+                out = []
+        out.append('\n')
+        yield ''.join(out)
+
+        records = iter_section_records(path)
+        next(records) # skip the title
+        multiple = count > 1
+        for record in records:
+            yield self.render_subsection(Subsection.load(record), multiple)
+
+    def render_to_string(self, section) -> str:
+        return ''.join(self.iter_render(section))
+
+    def render_into(self, section, buffer):
+        buffer.write(self.render_to_string(section))
+
+engine = RenderEngine()
@@ -0,0 +1,285 @@
+from array import array
+from http import HTTPStatus
+import json
+import struct
+import sys
+
+from . import HTTPMethod, HTTPPath, Logic, Parameter, Parameters, Response, Section, Subsection
+from .files import atomic_write, open_binary, strip_compression
+from .instrument import instrumentation
+
+# a compact binary form of a Section that loads without json.loads and without
+# the load() classmethods: the fields of every node are read straight into
+# __setstate__ in the order __getstate__ gives them
+#
+# a snapshot is a header, a string table and one flat array of uint32 codes:
+#     HEADER       magic, format version, string count, string bytes,
+#                  JSON value count, code count
+#     lengths      the length in characters of every string, then of every JSON value
+#     text         every string and then every JSON value, UTF-8
+#     codes        the response table, then the section
+#
+# a field is a single code: NONE, FALSE, TRUE, or VALUES + the position of its
+# value in the table of strings followed by JSON values (defaults that are not
+# strings, for example)
+# methods are stored as their code in METHODS, statuses as their status code
+# (criteria are not part of a Section, so CriteriaType has no code)
+# every distinct response is stored once like in Section.normalized_obj, and
+# the loaded subsections share it
+#
+# codes of the section:
+#     title, subsection count, then for every subsection
+#     url, method, requireAuth, requireMasterAuth,
+#     parameter count + 1 (0 for no Parameters) [notes, then name, value_type,
+#         required, default, description for every parameter],
+#     step count + 1 (0 for no Logic) [every step, then notes],
+#     response count, every response index, description
+# the response table is a count, then status, content, context for every response
+#
+# usage:
+#     Section.load_file('teams.json').save('teams.dcsnap')
+#     section = Section.load_file('teams.dcsnap')
+#     json_to_snapshot('teams.json', 'teams.dcsnap')
+#     snapshot_to_json('teams.dcsnap', 'teams.json')
+
+SNAPSHOT_EXTENSION = '.dcsnap'
+MAGIC = b'DCSNAP'
+VERSION = 1
+HEADER = struct.Struct('<6sHIIII')
+
+NONE = 0
+FALSE = 1
+TRUE = 2
+VALUES = 3
+
+# append only, a code must never change its meaning within a format version
+METHODS = (HTTPMethod.GET, HTTPMethod.POST)
+METHOD_CODES = {method: code for code, method in enumerate(METHODS)}
+STATUSES = {status.value: status for status in HTTPStatus}
+
+class SnapshotError(ValueError):
+    pass
+
+def is_snapshot(path) -> bool:
+    # teams.dcsnap and teams.dcsnap.gz are snapshots
+    return strip_compression(path).endswith(SNAPSHOT_EXTENSION)
+
+def refuse_json_options(path, **options):
+    # a snapshot has a single layout and is always loaded whole, so normalized=
+    # and lazy= are refused for one instead of being ignored
+    for name, value in options.items():
+        if value:
+            raise ValueError(f'{name}= only applies to JSON files, {path} is a snapshot')
+
+class _Encoder:
+
+    def __init__(self):
+        self.codes = array('I')
+        self.strings = {} # string -> position in the string table
+        self.values = [] # JSON text of every value that is not a string
+        self._pending = [] # (code position, value position) of every JSON value
+
+    def field(self, value):
+        if value is None:
+            self.codes.append(NONE)
+        elif value is False:
+            self.codes.append(FALSE)
+        elif value is True:
+            self.codes.append(TRUE)
+        elif type(value) == str:
+            position = self.strings.get(value)
+            if position == None:
+                position = self.strings[value] = len(self.strings)
+            self.codes.append(VALUES + position)
+        else:
+            # JSON values come after the strings, whose count is only known at
+            # the end, so their codes are filled in then
+            self.values.append(json.dumps(value))
+            self.codes.append(0)
+            self._pending.append((len(self.codes) - 1, len(self.values) - 1))
+
+    def encode(self, section) -> bytes:
+        codes = self.codes
+        field = self.field
+
+        table = []
+        indexes = {}
+        subsections = section.subsections
+        references = []
+        for subsection in subsections:
+            positions = []
+            for response in subsection.responses:
+                key = (response.status, response.content, response.context)
+                try:
+                    index = indexes.get(key)
+                except TypeError: # content or context that is not a plain value
+                    key = id(response)
+                    index = indexes.get(key)
+                if index == None:
+                    index = indexes[key] = len(table)
+                    table.append(response)
+                positions.append(index)
+            references.append(positions)
+
+        codes.append(len(table))
+        for response in table:
+            status, content, context = response.__getstate__()
+            codes.append(status.value)
+            field(content)
+            field(context)
+
+        field(section.title)
+        codes.append(len(subsections))
+        for subsection, positions in zip(subsections, references):
+            path, parameters, logic, responses, description = subsection.__getstate__()
+            url, method, requireAuth, requireMasterAuth = path.__getstate__()
+            field(url)
+            codes.append(METHOD_CODES[method])
+            field(requireAuth)
+            field(requireMasterAuth)
+            if parameters == None:
+                codes.append(0)
+            else:
+                items, notes = parameters.__getstate__()
+                codes.append(len(items) + 1)
+                field(notes)
+                for parameter in items:
+                    for value in parameter.__getstate__():
+                        field(value)
+            if logic == None:
+                codes.append(0)
+            else:
+                steps, notes = logic.__getstate__()
+                codes.append(len(steps) + 1)
+                for step in steps:
+                    field(step)
+                field(notes)
+            codes.append(len(positions))
+            codes.extend(positions)
+            field(description)
+
+        strings = list(self.strings)
+        for code_position, value_position in self._pending:
+            codes[code_position] = VALUES + len(strings) + value_position
+        texts = strings + self.values
+        lengths = array('I', [len(text) for text in texts])
+        text = ''.join(texts).encode('utf-8')
+        if sys.byteorder != 'little':
+            lengths.byteswap()
+            codes.byteswap()
+        header = HEADER.pack(MAGIC, VERSION, len(strings), len(text), len(self.values), len(codes))
+        return b''.join((header, lengths.tobytes(), text, codes.tobytes()))
+
+def dumps(section: Section) -> bytes:
+    with instrumentation.stage('snapshot.encode'):
+        return _Encoder().encode(section)
+
+def _read_array(data, start: int, count: int) -> tuple:
+    end = start + count * 4
+    if end > len(data):
+        raise SnapshotError('the snapshot is truncated')
+    values = array('I')
+    values.frombytes(data[start:end])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values, end
+
+def loads(data: bytes) -> Section:
+    if len(data) < HEADER.size:
+        raise SnapshotError('not a snapshot, the file is too short')
+    magic, version, string_count, text_size, value_count, code_count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError('not a snapshot')
+    if version != VERSION:
+        raise SnapshotError(f'snapshot format {version} is not supported, only format {VERSION} is')
+
+    with instrumentation.stage('snapshot.decode'):
+        lengths, position = _read_array(data, HEADER.size, string_count + value_count)
+        text = bytes(data[position:position + text_size]).decode('utf-8')
+        codes, _ = _read_array(data, position + text_size, code_count)
+
+        # NONE, FALSE, TRUE, then the strings and the JSON values
+        table = [None, False, True]
+        start = 0
+        intern = sys.intern
+        for index, length in enumerate(lengths):
+            end = start + length
+            if index < string_count:
+                table.append(intern(text[start:end]))
+            else:
+                table.append(json.loads(text[start:end]))
+            start = end
+
+    with instrumentation.stage('snapshot.build'):
+        try:
+            return _build(iter(codes).__next__, table)
+        except (StopIteration, IndexError, KeyError) as e:
+            raise SnapshotError(f'the snapshot is corrupt ({type(e).__name__})') from None
+
+def _build(take, table) -> Section:
+    new = object.__new__
+    statuses = STATUSES
+    methods = METHODS
+
+    responses = []
+    for _ in range(take()):
+        response = new(Response)
+        response.__setstate__((statuses[take()], table[take()], table[take()]))
+        responses.append(response)
+
+    title = table[take()]
+    subsections = []
+    for _ in range(take()):
+        path = new(HTTPPath)
+        path.__setstate__((table[take()], methods[take()], table[take()], table[take()]))
+
+        count = take()
+        if count == 0:
+            parameters = None
+        else:
+            notes = table[take()]
+            items = []
+            for _ in range(count - 1):
+                parameter = new(Parameter)
+                parameter.__setstate__((table[take()], table[take()], table[take()], table[take()], table[take()]))
+                items.append(parameter)
+            parameters = new(Parameters)
+            parameters.__setstate__((items, notes))
+
+        count = take()
+        if count == 0:
+            logic = None
+        else:
+            steps = [table[take()] for _ in range(count - 1)]
+            logic = new(Logic)
+            logic.__setstate__((steps, table[take()]))
+
+        subsection_responses = [responses[take()] for _ in range(take())]
+        subsection = new(Subsection)
+        subsection.__setstate__((path, parameters, logic, subsection_responses, table[take()]))
+        subsections.append(subsection)
+
+    section = new(Section)
+    section.__setstate__((title, subsections))
+    if instrumentation.enabled:
+        instrumentation.count('sections')
+        instrumentation.count('subsections', len(subsections))
+    return section
+
+def save_snapshot(section: Section, path):
+    # paths ending in .gz, .xz, .lzma or .bz2 are compressed
+    data = dumps(section)
+    with atomic_write(path, sync=True, binary=True) as f:
+        f.write(data)
+
+def load_snapshot(path) -> Section:
+    with open_binary(path) as f:
+        with instrumentation.stage('snapshot.read'):
+            data = f.read()
+    return loads(data)
+
+def json_to_snapshot(source, target):
+    save_snapshot(Section.load_file(source), target)
+
+def snapshot_to_json(source, target, normalized: bool = False):
+    load_snapshot(source).save(target, normalized=normalized)
@@ -0,0 +1,199 @@
+import json
+
+from .files import open_text, strip_compression
+
+WHITESPACE = ' \t\n\r'
+
+class JSONStreamReader:
+    # pull parser over a text file that only ever decodes one value at a time,
+    # so arrays and objects with huge amounts of entries can be walked without
+    # holding the whole document in memory
+    #
+    # usage:
+    #     for key in reader.items():      # walk an object
+    #         if key == 'subsections':
+    #             for _ in reader.elements():  # walk an array
+    #                 subsection = reader.value()
+    #         else:
+    #             reader.skip()
+    #
+    # after every key/element that is yielded, exactly one of value(), items(),
+    # elements() or skip() must be used to consume the value
+
+    def __init__(self, f, chunk_size: int = 65536):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        # the buffer is only rebased when something was read, callers still
+        # hold offsets into it when the end of the file is reached
+        if self._eof:
+            return False
+        # grow geometrically so a single value larger than the chunk size
+        # is not re-decoded once per chunk
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ''
+
+    def _take(self, expected: str):
+        char = self._peek()
+        if char == '' or char not in expected:
+            found = repr(char) if char else 'end of file'
+            raise ValueError(f'Expected one of {expected!r} but found {found}')
+        self._pos += 1
+        return char
+
+    def value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number at the very end of the buffer might continue in the next
+            # chunk, also when the buffer ends right after its "." or "e" ("1." or "1e+")
+            if end == len(self._buffer) or (type(value) in (int, float) and len(self._buffer) - end <= 2):
+                if self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def skip(self):
+        # the children of an object or array are decoded and dropped one at a
+        # time, which is much faster than walking them token by token and
+        # still only holds a single child in memory
+        char = self._peek()
+        if char == '{':
+            for _ in self.items():
+                self.value()
+        elif char == '[':
+            for _ in self.elements():
+                self.value()
+        else:
+            self.value()
+
+    def items(self):
+        self._take('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                self._take('"')
+            key = self.value()
+            self._take(':')
+            yield key
+            if self._take(',}') == '}':
+                return
+
+    def elements(self):
+        self._take('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._take(',]') == ']':
+                return
+
+def is_jsonl(path) -> bool:
+    return strip_compression(path).endswith(('.jsonl', '.ndjson'))
+
+def iter_encode(obj: dict):
+    # yields the same text as json.dumps(obj), but every list directly inside
+    # obj (like the subsections of a section) is encoded one element at a time,
+    # so the whole document never has to exist as one string
+    encode = json.JSONEncoder().encode
+    separator = ''
+    yield '{'
+    for key, value in obj.items():
+        if isinstance(value, list):
+            yield f'{separator}{encode(key)}: ['
+            for index, item in enumerate(value):
+                if index:
+                    yield ', ' + encode(item)
+                else:
+                    yield encode(item)
+            yield ']'
+        else:
+            yield f'{separator}{encode(key)}: {encode(value)}'
+        separator = ', '
+    yield '}'
+
+def resolve_responses(record, response_table):
+    # swaps response indexes of a normalized subsection for the obj in the table
+    responses = record.get('responses', None)
+    if response_table != None and responses != None:
+        record['responses'] = [response_table[response] if type(response) == int else response for response in responses]
+    return record
+
+def iter_section_records(path):
+    # yields the title of the section first, then every subsection obj one by one
+    #
+    # JSON sources use the same layout as Section.save, normalized or not
+    # JSONL sources have a {"title": ...} record on the first line and one
+    # subsection obj on every line after it, the title record can also hold a
+    # normalized "responses" table
+    with open_text(path) as f:
+        if is_jsonl(path):
+            title = None
+            response_table = None
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if title == None:
+                    title = record['title']
+                    response_table = record.get('responses', None)
+                    yield title
+                else:
+                    yield resolve_responses(record, response_table)
+            if title == None:
+                raise ValueError(f'{path} does not contain a title record')
+        else:
+            reader = JSONStreamReader(f)
+            title = None
+            response_table = None
+            for key in reader.items():
+                if key == 'title':
+                    title = reader.value()
+                    yield title
+                elif key == 'responses':
+                    response_table = reader.value()
+                elif key == 'subsections':
+                    if title == None:
+                        # the title (and the response table) always come first when
+                        # written by Section.save, anything else has to be read in two passes
+                        raise ValueError(f'{path} has "subsections" before "title" and cannot be streamed')
+                    for _ in reader.elements():
+                        yield resolve_responses(reader.value(), response_table)
+                else:
+                    reader.skip()
+            if title == None:
+                raise ValueError(f'{path} does not contain a title')
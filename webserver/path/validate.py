@@ -0,0 +1,254 @@
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+import json
+import os
+
+from . import HTTPMethod
+from .files import open_text
+from .stream import is_jsonl
+
+# checks the obj of a Section (plain or normalized, see Section.normalized_obj)
+# without building any model objects, and reports every problem instead of
+# stopping at the first one
+#
+# the schema below is compiled once into nested check functions, a check is
+# called with (value, path, errors, state) and appends a ValidationError for
+# every problem it finds
+# paths are only turned into strings ($.subsections[3].path.url) for errors
+#
+# usage:
+#     for error in validate_file('teams.json'):
+#         print(error)
+
+class ValidationError:
+    path: str
+    message: str
+
+    def __init__(self, path: str, message: str):
+        self.path = path
+        self.message = message
+
+    def __repr__(self) -> str:
+        # <ValidationError: $.subsections[0].path: missing key "url">
+        return f'<ValidationError: {self}>'
+
+    def __str__(self) -> str:
+        # $.subsections[0].path: missing key "url"
+        return f'{self.path}: {self.message}'
+
+    @property
+    def obj(self) -> dict:
+        return {'path': self.path, 'message': self.message}
+
+def format_path(path) -> str:
+    # paths are kept as (parent, key) pairs while checking, ('$' is the root)
+    parts = []
+    while type(path) == tuple:
+        path, key = path
+        parts.append(f'[{key}]' if type(key) == int else f'.{key}')
+    parts.append(path)
+    return ''.join(reversed(parts))
+
+TYPE_NAMES = {str: 'a string', bool: 'a boolean', int: 'an integer', list: 'an array', dict: 'an object', type(None): 'null'}
+
+def kind(value) -> type:
+    # the obj of a model object is made of read only subclasses of dict and
+    # list, which are checked like plain ones
+    cls = type(value)
+    if cls not in TYPE_NAMES:
+        if isinstance(value, dict):
+            return dict
+        if isinstance(value, list):
+            return list
+    return cls
+
+def describe(value) -> str:
+    return TYPE_NAMES.get(kind(value), type(value).__name__)
+
+def of_type(*types):
+    expected = ' or '.join(TYPE_NAMES[t] for t in types)
+    def check(value, path, errors, state):
+        # bool is a subclass of int, so the exact type is compared
+        if type(value) not in types and kind(value) not in types:
+            errors.append(ValidationError(format_path(path), f'expected {expected}, found {describe(value)}'))
+    check.types = types # lets object_of check the type inline
+    return check
+
+def any_value(value, path, errors, state):
+    pass
+
+def one_of(values):
+    expected = ', '.join(json.dumps(value) for value in values)
+    def check(value, path, errors, state):
+        if type(value) != str or value not in values:
+            errors.append(ValidationError(format_path(path), f'expected one of {expected}, found {json.dumps(value)}'))
+    return check
+
+def nullable(check):
+    def checked(value, path, errors, state):
+        if value != None:
+            check(value, path, errors, state)
+    return checked
+
+def array_of(item):
+    def check(value, path, errors, state):
+        if not isinstance(value, list):
+            errors.append(ValidationError(format_path(path), f'expected an array, found {describe(value)}'))
+            return
+        for index, element in enumerate(value):
+            item(element, (path, index), errors, state)
+    return check
+
+def object_of(required: dict, optional: dict = None):
+    # required and optional map keys to the check of their value
+    # values that only need a type check are checked right here, the check
+    # itself is only called to report the error
+    optional = optional if optional != None else {}
+    known = set(required) | set(optional)
+    keys = [(key, check_value, getattr(check_value, 'types', None), True) for key, check_value in required.items()]
+    keys += [(key, check_value, getattr(check_value, 'types', None), False) for key, check_value in optional.items()]
+    def check(value, path, errors, state):
+        if not isinstance(value, dict):
+            errors.append(ValidationError(format_path(path), f'expected an object, found {describe(value)}'))
+            return
+        for key, check_value, types, is_required in keys:
+            if key in value:
+                if types == None or type(value[key]) not in types:
+                    check_value(value[key], (path, key), errors, state)
+            elif is_required:
+                errors.append(ValidationError(format_path(path), f'missing key "{key}"'))
+        if state['strict'] and not known.issuperset(value):
+            for key in value:
+                if key not in known:
+                    errors.append(ValidationError(format_path(path), f'unknown key "{key}"'))
+    return check
+
+STATUS_CODES = frozenset(status.value for status in HTTPStatus)
+
+def status_code(value, path, errors, state):
+    # Response accepts a status code or the name of an HTTPStatus
+    if type(value) == int:
+        if value not in STATUS_CODES:
+            errors.append(ValidationError(format_path(path), f'{value} is not an HTTP status code'))
+    elif type(value) == str:
+        if value not in HTTPStatus.__members__:
+            errors.append(ValidationError(format_path(path), f'"{value}" is not the name of an HTTP status'))
+    else:
+        errors.append(ValidationError(format_path(path), f'expected an integer, found {describe(value)}'))
+
+text = of_type(str)
+optional_text = of_type(str, type(None))
+boolean = of_type(bool)
+
+PATH = object_of({
+    'url': text,
+    'method': one_of(list(HTTPMethod.__members__)),
+    'requireAuth': boolean,
+    'requireMasterAuth': boolean
+})
+
+PARAMETER = object_of({
+    'name': text,
+    'value_type': text,
+    'required': boolean
+}, {
+    'default': any_value,
+    'description': optional_text
+})
+
+PARAMETERS = object_of({
+    'parameters': array_of(PARAMETER)
+}, {
+    'notes': optional_text
+})
+
+STEP_LIST = array_of(text)
+
+def steps(value, path, errors, state):
+    # Logic accepts a single step as a plain string
+    if type(value) != str:
+        STEP_LIST(value, path, errors, state)
+
+LOGIC = object_of({
+    'steps': steps
+}, {
+    'notes': optional_text
+})
+
+RESPONSE = object_of({
+    'status': status_code
+}, {
+    'content': of_type(str, dict, type(None)),
+    'context': optional_text
+})
+
+def response_or_index(value, path, errors, state):
+    # in a normalized section a response can be an index into the response table
+    if type(value) != int:
+        RESPONSE(value, path, errors, state)
+        return
+    table = state.get('responses')
+    if table == None:
+        errors.append(ValidationError(format_path(path), 'a response index needs a top level "responses" table'))
+    elif not 0 <= value < table:
+        errors.append(ValidationError(format_path(path), f'response index {value} is out of range, the table has {table} responses'))
+
+SUBSECTION = object_of({
+    'path': PATH
+}, {
+    'parameters': nullable(PARAMETERS),
+    'logic': nullable(LOGIC),
+    'description': optional_text,
+    'responses': array_of(response_or_index)
+})
+
+SECTION = object_of({
+    'title': text,
+    'subsections': array_of(SUBSECTION)
+}, {
+    'responses': array_of(RESPONSE)
+})
+
+def validate_obj(obj, strict: bool = False) -> list[ValidationError]:
+    # with strict, keys Section.load would ignore are reported too
+    errors = []
+    state = {'strict': strict, 'responses': None}
+    if isinstance(obj, dict) and isinstance(obj.get('responses'), list):
+        state['responses'] = len(obj['responses'])
+    SECTION(obj, '$', errors, state)
+    return errors
+
+def validate_file(path, strict: bool = False) -> list[ValidationError]:
+    # JSON sources like Section.save writes them, and JSONL sources with a
+    # title record first (see iter_section_records)
+    try:
+        with open_text(path) as f:
+            if is_jsonl(path):
+                lines = [line for line in f if line.strip()]
+                if not lines:
+                    return [ValidationError('$', 'the file is empty')]
+                obj = json.loads(lines[0])
+                if type(obj) == dict:
+                    obj['subsections'] = [json.loads(line) for line in lines[1:]]
+            else:
+                obj = json.loads(f.read())
+    except ValueError as e:
+        return [ValidationError('$', f'invalid JSON: {e}')]
+    except OSError as e:
+        return [ValidationError('$', f'could not be read: {e}')]
+    return validate_obj(obj, strict)
+
+def _validate_job(job) -> tuple:
+    path, strict = job
+    return path, validate_file(path, strict)
+
+def validate_files(paths: list, jobs: int = None, strict: bool = False) -> list[tuple]:
+    # (path, errors) for every path, in the same order, validated across jobs processes
+    if jobs == None:
+        jobs = os.cpu_count() or 1
+    work = [(path, strict) for path in paths]
+    if jobs <= 1 or len(work) <= 1:
+        return [_validate_job(job) for job in work]
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_validate_job, work, chunksize=chunksize))
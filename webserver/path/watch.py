@@ -0,0 +1,433 @@
+import ctypes
+import html
+import http.server
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import urllib.parse
+
+from . import Section
+from .build import SOURCE_EXTENSIONS, discover, output_path
+from .cache import file_stat
+from .files import atomic_write
+
+# inotify(7), only what the watcher needs
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct('iIII') # wd, mask, cookie, length of the name that follows
+
+# editors often write a file several times in a row (or write and rename it),
+# so events that arrive this soon after the first one are handled together
+BATCH_DELAY = 0.01
+
+class PollingWatcher:
+    # finds changed sources by comparing the (mtime, size) of every source
+    # under root with the previous scan
+    root: str
+    interval: float
+
+    def __init__(self, root, interval: float = 0.1):
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self) -> dict:
+        stats = {}
+        for source in discover(self.root):
+            stat = file_stat(source)
+            if stat != None:
+                stats[source] = stat
+        return stats
+
+    def changes(self, timeout: float = None) -> set[str]:
+        # blocks until a source was added, changed or removed, or until timeout
+        deadline = None if timeout == None else time.monotonic() + timeout
+        while True:
+            stats = self._scan()
+            changed = {source for source in stats.keys() | self._stats.keys() if stats.get(source) != self._stats.get(source)}
+            self._stats = stats
+            if changed:
+                return changed
+            if deadline != None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    # asks the kernel for the changes instead of scanning, so a change is seen
+    # straight away no matter how many sources there are
+    # every directory under root gets its own watch, directories created
+    # later are watched as soon as they appear
+    root: str
+
+    def __init__(self, root, libc):
+        self.root = os.path.abspath(root)
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._directories = {} # wd -> directory
+        try:
+            self._start()
+        except OSError:
+            self.close()
+            raise
+
+    def _start(self):
+        if os.path.isfile(self.root):
+            self._watch(os.path.dirname(self.root))
+        else:
+            self._watch_tree(self.root)
+
+    def _watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f'Could not watch {directory}: {os.strerror(errno)}')
+        self._directories[wd] = directory
+
+    def _watch_tree(self, directory: str) -> list[str]:
+        # watches directory and everything below it and returns the sources
+        # that are already in there
+        # the watch is added before the directory is listed, so a file created
+        # in between is never missed
+        self._watch(directory)
+        sources = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return sources
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                sources.extend(self._watch_tree(entry.path))
+            elif entry.name.endswith(SOURCE_EXTENSIONS):
+                sources.append(entry.path)
+        return sources
+
+    def _restart(self):
+        for wd in list(self._directories):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._directories = {}
+        self._start()
+
+    def _is_source(self, path: str) -> bool:
+        if path.endswith(SOURCE_EXTENSIONS):
+            return os.path.isdir(self.root) or path == self.root
+        return False
+
+    def _read(self, changed: set) -> bool:
+        # adds the sources of every pending event to changed, returns False
+        # when events were lost and the caller has to check everything
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return True
+        offset = 0
+        complete = True
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                complete = False
+                continue
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory = self._directories.get(wd)
+            if directory == None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._watch_tree(path))
+                elif mask & IN_MOVED_FROM:
+                    # the watches below it still carry the old path
+                    complete = False
+            elif self._is_source(path):
+                changed.add(path)
+        return complete
+
+    def changes(self, timeout: float = None) -> set[str]:
+        # blocks until something happened under root, or until timeout
+        # returns None when events were lost (the kernel queue overflowed or a
+        # directory was moved away), then every source has to be checked again
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        complete = True
+        while ready:
+            complete = self._read(changed) and complete
+            ready, _, _ = select.select([self._fd], [], [], BATCH_DELAY)
+        if not complete:
+            self._restart()
+            return None
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def _libc():
+    # the C library, if it has inotify
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+def watcher_for(root, polling: bool = False, interval: float = 0.1):
+    # inotify where it is available, polling everywhere else (and when the
+    # kernel refuses more watches)
+    libc = None if polling else _libc()
+    if libc != None:
+        try:
+            return InotifyWatcher(root, libc)
+        except OSError:
+            pass
+    return PollingWatcher(root, interval)
+
+class PreviewPage:
+    source: str
+    path: str
+    markdown: str
+    error: str
+    seconds: float
+
+    def __init__(self, source: str, path: str, markdown: str = None, error: str = None, seconds: float = 0.0):
+        self.source = source
+        self.path = path
+        self.markdown = markdown
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error == None
+
+    def __repr__(self) -> str:
+        # <PreviewPage: "teams/list.md" in 1.2 ms>
+        # <PreviewPage: "teams/list.md" failed: KeyError: 'title'>
+        if self.ok:
+            return f'<PreviewPage: "{self.path}" in {self.seconds * 1000:.1f} ms>'
+        return f'<PreviewPage: "{self.path}" failed: {self.error}>'
+
+class PreviewSite:
+    # the rendered markdown of every source under src, kept in memory
+    # pages are rendered the first time they are asked for, and rendered
+    # again as soon as their source changes
+    # with out, every page that is rendered again is also written to out,
+    # like build would
+    src: str
+    out: str
+    version: int
+
+    def __init__(self, src, out = None):
+        self.src = os.path.abspath(src)
+        self.out = out
+        self.version = 0
+        self._sources = {} # page path -> source
+        self._pages = {} # page path -> PreviewPage
+        self._changed = threading.Condition()
+        for source in discover(self.src):
+            self._sources[self.page_path(source)] = source
+
+    def page_path(self, source: str) -> str:
+        # teams/list.json in src is served as teams/list.md
+        return output_path(source, self.src, '').replace(os.sep, '/')
+
+    @property
+    def paths(self) -> list[str]:
+        with self._changed:
+            return sorted(self._sources)
+
+    def _render(self, source: str, path: str) -> PreviewPage:
+        start = time.perf_counter()
+        try:
+            markdown = Section.load_file(source).render_to_string()
+        except Exception as e:
+            return PreviewPage(source, path, error=f'{type(e).__name__}: {e}', seconds=time.perf_counter() - start)
+        if self.out != None:
+            output = output_path(source, self.src, self.out)
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            with atomic_write(output) as f:
+                f.write(markdown)
+        return PreviewPage(source, path, markdown, seconds=time.perf_counter() - start)
+
+    def page(self, path: str) -> PreviewPage:
+        # None if there is no source for path
+        with self._changed:
+            page = self._pages.get(path)
+            source = self._sources.get(path)
+        if page != None or source == None:
+            return page
+        page = self._render(source, path)
+        with self._changed:
+            if self._sources.get(path) == source:
+                self._pages.setdefault(path, page)
+        return page
+
+    def update(self, source: str) -> PreviewPage:
+        # renders source again, or forgets it (and returns None) if it is gone
+        path = self.page_path(source)
+        if file_stat(source) == None:
+            page = None
+        else:
+            page = self._render(source, path)
+        with self._changed:
+            if page == None:
+                self._sources.pop(path, None)
+                self._pages.pop(path, None)
+            else:
+                self._sources[path] = source
+                self._pages[path] = page
+            self.version += 1
+            self._changed.notify_all()
+        return page
+
+    def refresh(self, sources = None) -> list[tuple]:
+        # updates every source in sources, None checks every source there is
+        # returns (source, page) pairs, page is None for removed sources
+        if sources == None:
+            with self._changed:
+                sources = set(self._sources.values())
+            sources.update(discover(self.src))
+        return [(source, self.update(source)) for source in sorted(sources)]
+
+    def wait(self, version: int, timeout: float = None) -> int:
+        # blocks until the site is newer than version, returns the new version
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{content}
+<script>
+// reloads as soon as the watcher has rendered something new
+(async () => {{
+    while (true) {{
+        try {{
+            const response = await fetch('/_wait?version={version}');
+            if (await response.text() != '{version}') {{
+                location.reload();
+                return;
+            }}
+        }} catch (e) {{
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }}
+    }}
+}})();
+</script>
+</body>
+</html>
+'''
+
+class PreviewHandler(http.server.BaseHTTPRequestHandler):
+    # GET /                   every page
+    # GET /teams/list.md      the page, reloaded in the browser when anything changes
+    # GET /raw/teams/list.md  the markdown itself
+    # GET /_wait?version=N    answers with the site version once it is newer than N
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_text(self, status: int, content_type: str, text: str):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        site = self.server.site
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path).lstrip('/')
+
+        if path == '_wait':
+            query = urllib.parse.parse_qs(url.query)
+            try:
+                version = int(query['version'][0])
+            except (KeyError, ValueError):
+                self.send_text(400, 'text/plain', 'version must be an integer\n')
+                return
+            self.send_text(200, 'text/plain', str(site.wait(version, timeout=30)))
+            return
+
+        version = site.version
+        if path == '':
+            links = ''.join(f'<li><a href="/{html.escape(page)}">{html.escape(page)}</a></li>\n' for page in site.paths)
+            self.send_text(200, 'text/html', PAGE_TEMPLATE.format(title='doccreator', content=f'<ul>\n{links}</ul>', version=version))
+            return
+
+        raw = path.startswith('raw/')
+        if raw:
+            path = path[len('raw/'):]
+        page = site.page(path)
+        if page == None:
+            self.send_text(404, 'text/plain', f'No source for {path}\n')
+        elif raw:
+            if page.ok:
+                self.send_text(200, 'text/markdown', page.markdown)
+            else:
+                self.send_text(500, 'text/plain', page.error + '\n')
+        else:
+            text = page.markdown if page.ok else f'{page.source} failed to render:\n{page.error}'
+            content = f'<p><a href="/">index</a> | <a href="/raw/{html.escape(path)}">raw</a></p>\n<pre>{html.escape(text)}</pre>'
+            self.send_text(200 if page.ok else 500, 'text/html', PAGE_TEMPLATE.format(title=html.escape(path), content=content, version=version))
+
+class PreviewServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, site: PreviewSite):
+        self.site = site
+        super().__init__(address, PreviewHandler)
+
+def watch(src, port: int = 8000, out = None, polling: bool = False, interval: float = 0.1, report = None, ready = None):
+    # serves a preview of src on localhost and renders changed sources again
+    # until interrupted
+    # report is called with (source, page) for every source that changed (page
+    # is None when the source was removed), ready is called with the server
+    # once it is listening
+    site = PreviewSite(src, out)
+    watcher = watcher_for(src, polling, interval)
+    server = PreviewServer(('127.0.0.1', port), site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        if ready != None:
+            ready(server)
+        while True:
+            changed = watcher.changes()
+            if changed == set():
+                continue
+            for source, page in site.refresh(changed):
+                if report != None:
+                    report(source, page)
+    finally:
+        server.shutdown()
+        server.server_close()
+        watcher.close()